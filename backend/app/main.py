@@ -1,9 +1,15 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routes import scriptures
-from .services.database import DatabaseService
+from .routes import admin, scriptures
+from .services.database import get_database_service
+from .utils.compression import CompressionMiddleware
 from .utils.config import API_DESCRIPTION, API_TITLE, API_VERSION, CORS_ORIGINS
+from .utils.environment import get_settings
+from .utils.metrics import METRICS, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware
+from .utils.profiling import REQUEST_PROFILER, ProfilingMiddleware
 
 # Initialize New Relic agent (optional)
 try:
@@ -14,10 +20,22 @@ try:
 except ImportError:
     NEW_RELIC_AVAILABLE = False
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the database service and close connections on shutdown"""
+    db_service = get_database_service()
+    # No requests are served yet, so blocking here is fine
+    db_service.warm_up()
+    yield
+    db_service.close()
+
+
 app = FastAPI(
     title=API_TITLE,
     description=API_DESCRIPTION,
     version=API_VERSION,
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -29,6 +47,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress dynamic responses; cached corpus payloads arrive precompressed
+if get_settings().compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=get_settings().compression_min_size
+    )
+
+# Admin profiling: off by default, and never mounted without an admin token
+if get_settings().profiling_enabled and get_settings().admin_token:
+    app.add_middleware(ProfilingMiddleware, profiler=REQUEST_PROFILER)
+    app.include_router(admin.router, include_in_schema=False)
+
+# Slow query details, behind the same admin token
+if get_settings().admin_token:
+    app.include_router(admin.debug_router, include_in_schema=False)
+
+# Outermost, so request latency includes compression
+if get_settings().metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(scriptures.router)
 
@@ -47,16 +84,20 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint with database warm-up"""
+    db_service = get_database_service()
     try:
-        # Warm up database connection and test a simple query
-        db_service = DatabaseService()
-        volumes = db_service.get_volumes()
+        # Warm up a pooled database connection and test a simple query
+        volumes = await db_service.run(db_service.get_volumes)
 
         return {
             "status": "healthy",
             "warmed_up": True,
             "database": "connected",
             "volumes_count": len(volumes),
+            "database_pool": db_service.pool_stats(),
+            "result_cache": db_service.result_cache_stats(),
+            "corpus_engine": db_service.corpus_engine,
+            "memory_corpus": db_service.corpus_stats(),
             "timestamp": "2025-01-05T00:00:00Z",
         }
     except Exception as e:
@@ -65,10 +106,20 @@ async def health_check():
             "warmed_up": False,
             "database": "error",
             "error": str(e),
+            "database_pool": db_service.pool_stats(),
             "timestamp": "2025-01-05T00:00:00Z",
         }
 
 
+if get_settings().metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics: latency histograms, DB time, caches, pool"""
+        get_database_service().publish_metrics()
+        return Response(METRICS.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
 
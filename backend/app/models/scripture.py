@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from pydantic import BaseModel
 
@@ -63,8 +63,91 @@ class ScriptureSearch(BaseModel):
     offset: int = 0
 
 
+class FacetCount(BaseModel):
+    id: int
+    title: str
+    count: int
+
+
+class SearchFacets(BaseModel):
+    volume: Optional[List[FacetCount]] = None
+    book: Optional[List[FacetCount]] = None
+
+
+class ReferenceQuery(BaseModel):
+    book_title: str
+    chapter: int
+    verse: Optional[int] = None
+
+
+class ReferenceBatchRequest(BaseModel):
+    references: List[ReferenceQuery]
+
+
+class ReferenceResult(ReferenceQuery):
+    scriptures: List[Scripture] = []
+    error: Optional[str] = None
+
+
+class PassageResult(BaseModel):
+    reference: str
+    start_verse_id: Optional[int] = None
+    end_verse_id: Optional[int] = None
+    scriptures: List[Scripture] = []
+    error: Optional[str] = None
+
+
+class VerseRangeResponse(BaseModel):
+    scriptures: List[Scripture]
+    next_verse_id: Optional[int] = None
+
+
+class NavigationBook(BaseModel):
+    id: int
+    book_title: str
+    book_short_title: str
+    chapter_count: int
+    verse_count: int
+    # [id, chapter_number, verse_count] per chapter
+    chapters: List[List[int]]
+
+
+class NavigationVolume(BaseModel):
+    id: int
+    volume_title: str
+    volume_short_title: str
+    chapter_count: int
+    verse_count: int
+    books: List[NavigationBook]
+
+
+class NavigationTree(BaseModel):
+    version: str
+    chapter_columns: List[str]
+    volumes: List[NavigationVolume]
+
+
+class CompactScriptures(BaseModel):
+    """Verse rows with the volumes and books they reference listed once"""
+
+    columns: List[str]
+    rows: List[List[Union[int, str]]]
+    volumes: List[Volume]
+    books: List[Book]
+
+
+class CompactScriptureResponse(CompactScriptures):
+    total: int
+    limit: int
+    offset: int
+    next_cursor: Optional[str] = None
+    facets: Optional[SearchFacets] = None
+
+
 class ScriptureResponse(BaseModel):
     scriptures: List[Scripture]
     total: int
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
+    facets: Optional[SearchFacets] = None
@@ -0,0 +1,106 @@
+import hmac
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from ..services.database import get_database_service
+from ..utils.environment import get_settings
+from ..utils.profiling import ALLOCATION_TRACKER, REQUEST_PROFILER
+
+
+def require_admin(authorization: Optional[str] = Header(None)) -> None:
+    """Reject requests without "Authorization: Bearer <ADMIN_TOKEN>" """
+    token = get_settings().admin_token
+    if (
+        not token
+        or authorization is None
+        or not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Admin token required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+debug_router = APIRouter(
+    prefix="/debug", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+@router.post("/profile")
+async def start_request_profile(
+    route: str = Query(..., description="Regex matched against request paths"),
+    count: int = Query(10, ge=1, le=1000, description="Requests to profile"),
+):
+    """Profile the next count requests whose path matches route"""
+    try:
+        REQUEST_PROFILER.arm(route, count)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return REQUEST_PROFILER.report(limit=0)
+
+
+@router.get("/profile")
+async def get_request_profile(
+    limit: int = Query(30, ge=1, le=500, description="Functions to list"),
+    sort: Literal["cumulative", "tottime", "calls"] = Query("cumulative"),
+    format: Literal["json", "text"] = Query("json", description="json or pstats"),
+):
+    """Merged cProfile stats for the requests profiled so far"""
+    if format == "text":
+        return PlainTextResponse(REQUEST_PROFILER.report_text(limit, sort))
+    return REQUEST_PROFILER.report(limit, sort)
+
+
+@router.delete("/profile")
+async def stop_request_profile():
+    """Stop profiling and discard the results"""
+    REQUEST_PROFILER.disarm()
+    return {"status": "stopped"}
+
+
+@router.post("/allocations")
+def start_allocation_tracing(
+    frames: int = Query(1, ge=1, le=50, description="Stack frames per allocation"),
+):
+    """Start tracemalloc and take the baseline snapshot"""
+    ALLOCATION_TRACKER.start(frames)
+    return {"status": "tracing"}
+
+
+@router.get("/allocations")
+def get_allocation_hotspots(
+    limit: int = Query(20, ge=1, le=500, description="Source lines to list"),
+    reset: bool = Query(False, description="Make this snapshot the new baseline"),
+):
+    """Allocation growth per source line since the baseline snapshot"""
+    try:
+        return ALLOCATION_TRACKER.diff(limit, reset)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.delete("/allocations")
+def stop_allocation_tracing():
+    """Stop tracemalloc"""
+    ALLOCATION_TRACKER.stop()
+    return {"status": "stopped"}
+
+
+@debug_router.get("/slow-queries")
+async def slow_queries():
+    """Recent slow SQL statements with query plans, and totals per shape"""
+    query_log = get_database_service().query_log
+    if query_log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is disabled")
+    return {
+        "threshold_ms": query_log.threshold * 1000,
+        "shapes": query_log.shapes(),
+        # Bound parameters are users' search terms; they stay in the log file
+        "recent": query_log.entries(include_params=False),
+    }
@@ -1,107 +1,669 @@
-from typing import List, Optional
+import asyncio
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from ..models.scripture import (
     Book,
     Chapter,
+    CompactScriptureResponse,
+    CompactScriptures,
+    NavigationTree,
+    PassageResult,
+    ReferenceBatchRequest,
+    ReferenceResult,
     Scripture,
     ScriptureResponse,
     Verse,
+    VerseRangeResponse,
     Volume,
 )
-from ..services.database import DatabaseService
+from ..services.database import (
+    MAX_RANGE_VERSES,
+    QueryTimeoutError,
+    get_database_service,
+)
+from ..services.pool import PoolTimeoutError
+from ..services.references import MAX_CITATION_LENGTH
+from ..services.rows import (
+    COMPACT_COLUMNS,
+    SCRIPTURE_COLUMNS,
+    SCRIPTURE_FIELD_PRESETS,
+    scripture_fields,
+)
+from ..services.serialization import (
+    compact_json,
+    csv_lines,
+    ndjson_lines,
+    scripture_json,
+    scripture_response_json,
+    scripture_results_json,
+    scriptures_json,
+)
+from ..utils.compression import Payload
+from ..utils.environment import get_settings
+from ..utils.http_cache import IMMUTABLE_CACHE_CONTROL
 
 router = APIRouter(prefix="/api/scriptures", tags=["scriptures"])
-db_service = DatabaseService()
+db_service = get_database_service()
+
+# How often a pending database call checks whether the client has gone away
+DISCONNECT_POLL_INTERVAL = 0.1
+
+T = TypeVar("T")
+
+
+def http_cache(max_age: int) -> Any:
+    """Dependency adding corpus validators and answering conditional requests
+
+    Responses only change when the database file does, so a matching
+    If-None-Match / If-Modified-Since gets a 304 before any query runs.
+    """
+
+    def dependency(request: Request, response: Response) -> None:
+        validators = db_service.cache_validators()
+        headers = validators.headers(max_age)
+        if validators.is_not_modified(request.headers):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return Depends(dependency)
+
+
+def raw_json(payload: bytes, response: Response) -> Response:
+    """Return pre-serialized JSON, keeping headers set by dependencies"""
+    headers = {
+        key: value for key, value in response.headers.items() if key != "content-length"
+    }
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+async def payload_json(
+    payload: Payload, request: Request, response: Response
+) -> Response:
+    """Return a cached corpus payload, precompressed if the client accepts it"""
+    settings = get_settings()
+    if not settings.compression_enabled:
+        return raw_json(payload.body, response)
+
+    encoding = payload.encoding_for(
+        request.headers.get("accept-encoding"), settings.compression_min_size
+    )
+    if encoding is None:
+        content = payload.body
+    elif encoding in payload.variants:
+        content = payload.variants[encoding]
+    else:
+        # First request for this variant: best-level compression is too slow
+        # to run on the event loop
+        content = await run_in_threadpool(payload.encoded, encoding)
+    result = raw_json(content, response)
+    if len(payload.body) >= settings.compression_min_size:
+        result.headers.add_vary_header("Accept-Encoding")
+    if encoding is not None:
+        result.headers["Content-Encoding"] = encoding
+    return result
+
+
+corpus_cache = http_cache(get_settings().http_cache_max_age)
+search_cache = http_cache(get_settings().search_cache_max_age)
+
+
+def field_selection(
+    fields: Optional[str] = Query(
+        None,
+        description=(
+            "Comma-separated Scripture fields to return, or a preset: "
+            + ", ".join(SCRIPTURE_FIELD_PRESETS)
+        ),
+    ),
+) -> Optional[Tuple[str, ...]]:
+    """Dependency parsing the fields= projection (None selects every field)"""
+    try:
+        return scripture_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def row_selection(
+    format: Literal["full", "compact"] = Query(
+        "full",
+        description=(
+            "full: one Scripture object per verse; compact: verse rows plus "
+            "volume and book lookup tables"
+        ),
+    ),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection),
+) -> Tuple[bool, Optional[Tuple[str, ...]]]:
+    """Dependency resolving format= and fields= into (compact, fields)"""
+    if format == "compact":
+        if fields is not None:
+            raise HTTPException(
+                status_code=400, detail="fields cannot be combined with format=compact"
+            )
+        return True, COMPACT_COLUMNS
+    return False, fields
 
 
-@router.get("/volumes", response_model=List[Volume])
-async def get_volumes():
+async def compact_payload(
+    request: Request, rows: List[Any], extra: Optional[dict] = None
+) -> bytes:
+    """Serialize COMPACT_COLUMNS rows with the volumes and books they reference"""
+    # COMPACT_COLUMNS rows are (verse_id, volume_id, book_id, ...)
+    volumes, books = await run_query(
+        request,
+        db_service.get_lookup_tables,
+        [row[1] for row in rows],
+        [row[2] for row in rows],
+    )
+    return compact_json(rows, volumes, books, extra)
+
+
+async def run_query(
+    request: Request, method: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Run a DatabaseService call off the event loop
+
+    The call is cancelled (and its SQLite statement interrupted) if the
+    client disconnects before it finishes.
+    """
+    task = asyncio.ensure_future(db_service.run(method, *args, **kwargs))
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                break
+            if await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client closed request")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+    try:
+        return task.result()
+    except QueryTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/navigation", response_model=NavigationTree, dependencies=[corpus_cache])
+async def get_navigation_tree(
+    request: Request,
+    response: Response,
+    v: Optional[str] = Query(
+        None, description="Tree version; the current version is cached as immutable"
+    ),
+):
+    """Get every volume, book and chapter with counts in one precomputed payload"""
+    try:
+        payload = await run_query(request, db_service.navigation_tree)
+        if v is not None and v == db_service.cache_validators().version:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return await payload_json(payload, request, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/volumes", response_model=List[Volume], dependencies=[corpus_cache])
+async def get_volumes(request: Request, response: Response):
     """Get all volumes"""
     try:
-        return db_service.get_volumes()
+        if db_service.corpus_payloads_enabled:
+            payload = await run_query(request, db_service.get_volumes_json)
+            return await payload_json(payload, request, response)
+        return await run_query(request, db_service.get_volumes)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/volumes/{volume_id}/books", response_model=List[Book])
-async def get_books_by_volume(volume_id: int):
+@router.get(
+    "/volumes/{volume_id}/books", response_model=List[Book], dependencies=[corpus_cache]
+)
+async def get_books_by_volume(request: Request, response: Response, volume_id: int):
     """Get all books for a specific volume"""
     try:
-        return db_service.get_books_by_volume(volume_id)
+        if db_service.corpus_payloads_enabled:
+            payload = await run_query(
+                request, db_service.get_books_by_volume_json, volume_id
+            )
+            return await payload_json(payload, request, response)
+        return await run_query(request, db_service.get_books_by_volume, volume_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/books/{book_id}/chapters", response_model=List[Chapter])
-async def get_chapters_by_book(book_id: int):
+@router.get(
+    "/books/{book_id}/chapters",
+    response_model=List[Chapter],
+    dependencies=[corpus_cache],
+)
+async def get_chapters_by_book(request: Request, response: Response, book_id: int):
     """Get all chapters for a specific book"""
     try:
-        return db_service.get_chapters_by_book(book_id)
+        if db_service.corpus_payloads_enabled:
+            payload = await run_query(
+                request, db_service.get_chapters_by_book_json, book_id
+            )
+            return await payload_json(payload, request, response)
+        return await run_query(request, db_service.get_chapters_by_book, book_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/chapters/{chapter_id}/verses", response_model=List[Verse])
-async def get_verses_by_chapter(chapter_id: int):
+@router.get(
+    "/chapters/{chapter_id}/verses",
+    response_model=List[Verse],
+    dependencies=[corpus_cache],
+)
+async def get_verses_by_chapter(request: Request, response: Response, chapter_id: int):
     """Get all verses for a specific chapter"""
     try:
-        return db_service.get_verses_by_chapter(chapter_id)
+        if db_service.corpus_payloads_enabled:
+            payload = await run_query(
+                request, db_service.get_verses_by_chapter_json, chapter_id
+            )
+            return await payload_json(payload, request, response)
+        return await run_query(request, db_service.get_verses_by_chapter, chapter_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/search", response_model=ScriptureResponse)
+@router.get(
+    "/verses",
+    response_model=Union[VerseRangeResponse, CompactScriptures],
+    dependencies=[corpus_cache],
+)
+async def get_verse_range(
+    request: Request,
+    response: Response,
+    from_verse_id: int = Query(..., ge=1, description="First verse id to read"),
+    to_verse_id: Optional[int] = Query(
+        None, ge=1, description="Last verse id to read (inclusive)"
+    ),
+    count: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_RANGE_VERSES,
+        description="Number of verses to read (default 100)",
+    ),
+    selection: Tuple[bool, Optional[Tuple[str, ...]]] = Depends(row_selection),
+):
+    """Read a contiguous run of verses across chapter and book boundaries"""
+    compact, fields = selection
+    try:
+        scriptures, next_verse_id = await run_query(
+            request,
+            db_service.get_verse_range,
+            from_verse_id,
+            to_verse_id,
+            count,
+            fields=fields,
+        )
+        if compact:
+            extra = {"next_verse_id": next_verse_id}
+            payload = await compact_payload(request, scriptures, extra)
+            return raw_json(payload, response)
+
+        range_response = VerseRangeResponse.model_construct(
+            scriptures=scriptures, next_verse_id=next_verse_id
+        )
+        return raw_json(scripture_response_json(range_response, fields), response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get(
+    "/search",
+    response_model=Union[ScriptureResponse, CompactScriptureResponse],
+    dependencies=[search_cache],
+)
 async def search_scriptures(
+    request: Request,
+    response: Response,
     q: str = Query(..., description="Search query"),
     limit: int = Query(50, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
     volume_id: Optional[int] = Query(None, description="Filter by volume ID"),
+    engine: Literal["like", "fts"] = Query(
+        "like", description="Search engine: substring LIKE or FTS5 full-text index"
+    ),
+    order: Literal["canonical", "relevance"] = Query(
+        "canonical", description="Result ordering (relevance requires engine=fts)"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from a previous page's next_cursor"
+    ),
+    facets: Optional[str] = Query(
+        None, description="Comma-separated facet counts to include: volume, book"
+    ),
+    selection: Tuple[bool, Optional[Tuple[str, ...]]] = Depends(row_selection),
 ):
     """Search scriptures by text content with optional volume filter"""
+    compact, fields = selection
     try:
-        scriptures, total = db_service.search_scriptures(q, limit, offset, volume_id)
-        return ScriptureResponse(
-            scriptures=scriptures, total=total, limit=limit, offset=offset
+        search_facets = None
+        if facets:
+            facet_names = [name.strip() for name in facets.split(",") if name.strip()]
+            scriptures, total, next_cursor, search_facets = await run_query(
+                request,
+                db_service.search_with_facets,
+                q,
+                facet_names,
+                limit,
+                offset,
+                volume_id,
+                engine=engine,
+                order=order,
+                cursor=cursor,
+                fields=fields,
+            )
+        else:
+            scriptures, total, next_cursor = await run_query(
+                request,
+                db_service.search_scriptures,
+                q,
+                limit,
+                offset,
+                volume_id,
+                engine=engine,
+                order=order,
+                cursor=cursor,
+                fields=fields,
+            )
+        if compact:
+            extra = {
+                "total": total,
+                "limit": limit,
+                "offset": offset,
+                "next_cursor": next_cursor,
+                "facets": search_facets.model_dump() if search_facets else None,
+            }
+            payload = await compact_payload(request, scriptures, extra)
+            return raw_json(payload, response)
+
+        # Rows are trusted, so skip response_model re-validation
+        search_response = ScriptureResponse.model_construct(
+            scriptures=scriptures,
+            total=total,
+            limit=limit,
+            offset=offset,
+            next_cursor=next_cursor,
+            facets=search_facets,
         )
+        return raw_json(scripture_response_json(search_response, fields), response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/search/volumes", response_model=List[dict])
-async def get_search_volume_counts(q: str = Query(..., description="Search query")):
+@router.get("/search/volumes", response_model=List[dict], dependencies=[search_cache])
+async def get_search_volume_counts(
+    request: Request,
+    q: str = Query(..., description="Search query"),
+    engine: Literal["like", "fts"] = Query(
+        "like", description="Search engine: substring LIKE or FTS5 full-text index"
+    ),
+):
     """Get search result counts grouped by volume"""
     try:
-        volume_counts = db_service.get_search_counts_by_volume(q)
+        volume_counts = await run_query(
+            request, db_service.get_search_counts_by_volume, q, engine=engine
+        )
         return [{"volume": volume, "count": count} for volume, count in volume_counts]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/reference/{book_title}/{chapter}", response_model=List[Scripture])
+@router.get(
+    "/reference/{book_title}/{chapter}",
+    response_model=Union[List[Scripture], CompactScriptures],
+    dependencies=[corpus_cache],
+)
 async def get_scripture_by_reference(
+    request: Request,
+    response: Response,
     book_title: str,
     chapter: int,
     verse: Optional[int] = Query(None, description="Specific verse number"),
+    selection: Tuple[bool, Optional[Tuple[str, ...]]] = Depends(row_selection),
 ):
     """Get scripture by book, chapter, and optional verse"""
+    compact, fields = selection
+    try:
+        scriptures = await run_query(
+            request,
+            db_service.get_scripture_by_reference,
+            book_title,
+            chapter,
+            verse,
+            fields=fields,
+        )
+        if compact:
+            return raw_json(await compact_payload(request, scriptures), response)
+        return raw_json(scriptures_json(scriptures, fields), response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.post("/reference/batch", response_model=List[ReferenceResult])
+async def get_scriptures_by_references(
+    request: Request,
+    batch: ReferenceBatchRequest,
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection),
+):
+    """Resolve many references in one request, returned in request order"""
+    max_references = get_settings().max_batch_references
+    if len(batch.references) > max_references:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {max_references} references are allowed per batch",
+        )
+
+    try:
+        found = await run_query(
+            request,
+            db_service.get_scriptures_by_references,
+            [(ref.book_title, ref.chapter, ref.verse) for ref in batch.references],
+            fields=fields,
+        )
+        results = [
+            ReferenceResult.model_construct(
+                book_title=ref.book_title,
+                chapter=ref.chapter,
+                verse=ref.verse,
+                scriptures=scriptures,
+                error=None if scriptures else "Reference not found",
+            )
+            for ref, scriptures in zip(batch.references, found)
+        ]
+        return Response(
+            content=scripture_results_json(ReferenceResult, results, fields),
+            media_type="application/json",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get(
+    "/passages", response_model=List[PassageResult], dependencies=[corpus_cache]
+)
+async def get_passages(
+    request: Request,
+    response: Response,
+    q: str = Query(
+        ...,
+        max_length=MAX_CITATION_LENGTH,
+        description='Citations, e.g. "John 3:16-18; Alma 32:21,27; D&C 4"',
+    ),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection),
+):
+    """Resolve citation strings with ranges and book abbreviations"""
     try:
-        return db_service.get_scripture_by_reference(book_title, chapter, verse)
+        passages = await run_query(
+            request,
+            db_service.get_passages,
+            q,
+            fields,
+            max_references=get_settings().max_batch_references,
+        )
+        results = [
+            PassageResult.model_construct(
+                reference=reference.reference,
+                start_verse_id=reference.start,
+                end_verse_id=reference.end,
+                scriptures=scriptures,
+                error=reference.error,
+            )
+            for reference, scriptures in passages
+        ]
+        return raw_json(
+            scripture_results_json(PassageResult, results, fields), response
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/random", response_model=Scripture)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[corpus_cache],
+    responses={
+        200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}
+    },
+)
+def export_scriptures(
+    response: Response,
+    format: Literal["ndjson", "csv"] = Query(
+        "ndjson", description="ndjson: one JSON object per line; csv: header + rows"
+    ),
+    volume_id: Optional[int] = Query(None, description="Only export this volume"),
+    book_id: Optional[int] = Query(None, description="Only export this book"),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection),
+):
+    """Stream verses in canonical order for bulk export
+
+    Rows are streamed from a database cursor in fixed-size batches, so the
+    whole corpus can be exported with constant memory.
+    """
+    columns = fields or SCRIPTURE_COLUMNS
+    batches = db_service.export_rows(volume_id, book_id, fields)
+
+    def ndjson_chunks() -> Iterator[bytes]:
+        for rows in batches:
+            yield ndjson_lines(columns, rows)
+
+    def csv_chunks() -> Iterator[bytes]:
+        yield csv_lines([columns])
+        for rows in batches:
+            yield csv_lines(rows)
+
+    scope = "all"
+    if book_id is not None:
+        scope = f"book-{book_id}"
+    elif volume_id is not None:
+        scope = f"volume-{volume_id}"
+    headers = {
+        key: value for key, value in response.headers.items() if key != "content-length"
+    }
+    headers["Content-Disposition"] = (
+        f'attachment; filename="scriptures-{scope}.{format}"'
+    )
+    return StreamingResponse(
+        ndjson_chunks() if format == "ndjson" else csv_chunks(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+@router.get("/random", response_model=Union[Scripture, List[Scripture]])
 async def get_random_scripture(
+    request: Request,
+    response: Response,
     include_lds: bool = Query(
         False, description="Include LDS scriptures (BoM, D&C, PGP)"
-    )
+    ),
+    volume_id: Optional[int] = Query(
+        None, description="Only pick from this volume (overrides include_lds)"
+    ),
+    count: Optional[int] = Query(
+        None, ge=1, le=100, description="Return a list of this many distinct verses"
+    ),
+    seed: Optional[str] = Query(
+        None, description="Seed for a deterministic pick, e.g. a date"
+    ),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection),
 ):
     """Get a random scripture verse with optional LDS filtering"""
     try:
-        return db_service.get_random_scripture(include_lds=include_lds)
+        if count is not None:
+            scriptures = await run_query(
+                request,
+                db_service.get_random_scriptures,
+                count,
+                include_lds=include_lds,
+                volume_id=volume_id,
+                seed=seed,
+                fields=fields,
+            )
+            return raw_json(scriptures_json(scriptures, fields), response)
+        scripture = await run_query(
+            request,
+            db_service.get_random_scripture,
+            include_lds=include_lds,
+            volume_id=volume_id,
+            seed=seed,
+            fields=fields,
+        )
+        return raw_json(scripture_json(scripture, fields), response)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
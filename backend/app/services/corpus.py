@@ -0,0 +1,291 @@
+import sqlite3
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from ..models.scripture import Book, Chapter, Scripture, Verse, Volume
+from .rows import build_book, build_volume
+from .sampling import VerseSampler
+
+
+class ChapterSpan:
+    """A chapter and the contiguous run of its verses in the corpus arrays"""
+
+    __slots__ = ("id", "book_id", "chapter_number", "start", "stop")
+
+    def __init__(
+        self, id: int, book_id: int, chapter_number: int, start: int, stop: int
+    ):
+        self.id = id
+        self.book_id = book_id
+        self.chapter_number = chapter_number
+        self.start = start
+        self.stop = stop
+
+
+class TextBuffer:
+    """Many strings packed into one UTF-8 buffer with an offsets array"""
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self, values: List[str]):
+        encoded = [value.encode("utf-8") for value in values]
+        self.offsets = array("q", [0])
+        total = 0
+        for chunk in encoded:
+            total += len(chunk)
+            self.offsets.append(total)
+        self.data = b"".join(encoded)
+
+    def __getitem__(self, index: int) -> str:
+        """Decode the string at an index"""
+        return self.data[self.offsets[index] : self.offsets[index + 1]].decode("utf-8")
+
+    def nbytes(self) -> int:
+        """Bytes held by the buffer and its offsets"""
+        return sys.getsizeof(self.data) + sys.getsizeof(self.offsets)
+
+
+class InMemoryCorpus:
+    """Read-only copy of the whole scripture corpus held in compact arrays
+
+    Verses are stored in (chapter_id, verse_number) order, so every chapter is
+    a contiguous index range. Per-verse data lives in parallel typed arrays
+    plus packed text buffers instead of one Python object per verse.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT * FROM volumes ORDER BY id")
+        self.volumes: List[Volume] = [build_volume(row) for row in cursor]
+        self.volumes_by_id = {volume.id: volume for volume in self.volumes}
+
+        cursor.execute("SELECT * FROM books ORDER BY id")
+        self.books: List[Book] = [build_book(row) for row in cursor]
+        self.books_by_id = {book.id: book for book in self.books}
+        self.books_by_title = {book.book_title: book for book in self.books}
+        self.books_by_volume: Dict[int, List[Book]] = {}
+        for book in self.books:
+            self.books_by_volume.setdefault(book.volume_id, []).append(book)
+
+        cursor.execute(
+            """
+            SELECT verse_id, chapter_id, verse_number, scripture_text,
+                   verse_title, verse_short_title
+            FROM scriptures
+            ORDER BY chapter_id, verse_number
+        """
+        )
+        rows = cursor.fetchall()
+
+        self.verse_ids = array("l", (row[0] for row in rows))
+        self.verse_numbers = array("i", (row[2] for row in rows))
+        self.texts = TextBuffer([row[3] for row in rows])
+        self.titles = TextBuffer([row[4] for row in rows])
+        self.short_titles = TextBuffer([row[5] for row in rows])
+
+        cursor.execute("SELECT id, book_id, chapter_number FROM chapters ORDER BY id")
+        self.chapters: List[ChapterSpan] = []
+        self.chapters_by_id: Dict[int, ChapterSpan] = {}
+        self.chapters_by_book: Dict[int, List[ChapterSpan]] = {}
+        self.chapters_by_ref: Dict[Tuple[int, int], ChapterSpan] = {}
+        # Index into self.chapters for every verse
+        self.verse_chapter = array("H")
+        position = 0
+        for chapter_id, book_id, chapter_number in cursor.fetchall():
+            start = position
+            while position < len(rows) and rows[position][1] == chapter_id:
+                position += 1
+            span = ChapterSpan(chapter_id, book_id, chapter_number, start, position)
+            self.verse_chapter.extend([len(self.chapters)] * (position - start))
+            self.chapters.append(span)
+            self.chapters_by_id[chapter_id] = span
+            self.chapters_by_book.setdefault(book_id, []).append(span)
+            self.chapters_by_ref[(book_id, chapter_number)] = span
+        if position != len(rows):
+            raise ValueError("Verses reference chapters missing from the database")
+        for spans in self.chapters_by_book.values():
+            spans.sort(key=lambda span: span.chapter_number)
+
+        # Random selection draws array indexes from per-filter pools
+        self.sampler = VerseSampler(
+            (index, self._volume_id(index)) for index in range(len(self.verse_ids))
+        )
+
+    def _volume_id(self, index: int) -> int:
+        """Volume id of the verse at an array index"""
+        span = self.chapters[self.verse_chapter[index]]
+        return self.books_by_id[span.book_id].volume_id
+
+    def scripture(self, index: int) -> Scripture:
+        """Build the Scripture for the verse at an array index"""
+        span = self.chapters[self.verse_chapter[index]]
+        book = self.books_by_id[span.book_id]
+        volume = self.volumes_by_id[book.volume_id]
+        return Scripture.model_construct(
+            volume_id=volume.id,
+            book_id=book.id,
+            chapter_id=span.id,
+            verse_id=self.verse_ids[index],
+            volume_title=volume.volume_title,
+            book_title=book.book_title,
+            volume_long_title=volume.volume_long_title,
+            book_long_title=book.book_long_title,
+            volume_subtitle=volume.volume_subtitle,
+            book_subtitle=book.book_subtitle,
+            volume_short_title=volume.volume_short_title,
+            book_short_title=book.book_short_title,
+            volume_lds_url=volume.volume_lds_url,
+            book_lds_url=book.book_lds_url,
+            chapter_number=span.chapter_number,
+            verse_number=self.verse_numbers[index],
+            scripture_text=self.texts[index],
+            verse_title=self.titles[index],
+            verse_short_title=self.short_titles[index],
+        )
+
+    def get_volumes(self) -> List[Volume]:
+        """Get all volumes"""
+        return list(self.volumes)
+
+    def get_books_by_volume(self, volume_id: int) -> List[Book]:
+        """Get all books for a specific volume"""
+        return list(self.books_by_volume.get(volume_id, []))
+
+    def get_chapters_by_book(self, book_id: int) -> List[Chapter]:
+        """Get all chapters for a specific book"""
+        return [
+            Chapter.model_construct(
+                id=span.id, book_id=span.book_id, chapter_number=span.chapter_number
+            )
+            for span in self.chapters_by_book.get(book_id, [])
+        ]
+
+    def get_verses_by_chapter(self, chapter_id: int) -> List[Verse]:
+        """Get all verses for a specific chapter"""
+        span = self.chapters_by_id.get(chapter_id)
+        if span is None:
+            return []
+        return [
+            Verse.model_construct(
+                id=self.verse_ids[index],
+                chapter_id=chapter_id,
+                verse_number=self.verse_numbers[index],
+                scripture_text=self.texts[index],
+            )
+            for index in range(span.start, span.stop)
+        ]
+
+    def verse_rows(self, chapter_id: int) -> List[Tuple[int, int, int, str]]:
+        """(id, chapter_id, verse_number, scripture_text) rows for a chapter"""
+        span = self.chapters_by_id.get(chapter_id)
+        if span is None:
+            return []
+        return [
+            (
+                self.verse_ids[index],
+                chapter_id,
+                self.verse_numbers[index],
+                self.texts[index],
+            )
+            for index in range(span.start, span.stop)
+        ]
+
+    def get_scripture_by_reference(
+        self, book_title: str, chapter: int, verse: Optional[int] = None
+    ) -> List[Scripture]:
+        """Get scripture by book, chapter, and optional verse"""
+        book = self.books_by_title.get(book_title)
+        span = self.chapters_by_ref.get((book.id, chapter)) if book else None
+        if span is None:
+            return []
+        if not verse:
+            return [self.scripture(index) for index in range(span.start, span.stop)]
+
+        index = bisect_left(self.verse_numbers, verse, span.start, span.stop)
+        if index < span.stop and self.verse_numbers[index] == verse:
+            return [self.scripture(index)]
+        return []
+
+    def get_scriptures_by_verse_range(self, start: int, end: int) -> List[Scripture]:
+        """Get verses with start <= verse_id <= end
+
+        Verse ids ascend in corpus (canonical) order, so the range is one
+        contiguous slice of the arrays.
+        """
+        low = bisect_left(self.verse_ids, start)
+        high = bisect_right(self.verse_ids, end)
+        return [self.scripture(index) for index in range(low, high)]
+
+    def get_verse_range(
+        self, from_verse_id: int, to_verse_id: Optional[int], count: int
+    ) -> Tuple[List[Scripture], Optional[int]]:
+        """Get up to count verses from from_verse_id (through to_verse_id)
+
+        Returns the verses and the verse_id that follows them, if any.
+        """
+        low = bisect_left(self.verse_ids, from_verse_id)
+        high = min(low + count, len(self.verse_ids))
+        if to_verse_id is not None:
+            high = min(high, bisect_right(self.verse_ids, to_verse_id))
+        next_verse_id = self.verse_ids[high] if high < len(self.verse_ids) else None
+        return [self.scripture(index) for index in range(low, high)], next_verse_id
+
+    def get_random_scriptures(
+        self,
+        count: int = 1,
+        include_lds: bool = False,
+        volume_id: Optional[int] = None,
+        seed: Optional[str] = None,
+    ) -> List[Scripture]:
+        """Get distinct random scripture verses"""
+        indexes = self.sampler.sample(count, include_lds, volume_id, seed)
+        return [self.scripture(index) for index in indexes]
+
+    def memory_report(self) -> Dict[str, int]:
+        """Approximate bytes held by each structure, plus row counts"""
+        verse_arrays = sum(
+            sys.getsizeof(values)
+            for values in (
+                self.verse_ids,
+                self.verse_numbers,
+                self.verse_chapter,
+                self.sampler.all_verses,
+                self.sampler.non_lds_verses,
+                *self.sampler.by_volume.values(),
+            )
+        )
+        text = self.texts.nbytes() + self.titles.nbytes() + self.short_titles.nbytes()
+        chapters = sys.getsizeof(self.chapters) + sum(
+            sys.getsizeof(span) for span in self.chapters
+        )
+        indexes = sum(
+            sys.getsizeof(mapping)
+            for mapping in (
+                self.chapters_by_id,
+                self.chapters_by_book,
+                self.chapters_by_ref,
+                self.books_by_id,
+                self.books_by_title,
+                self.books_by_volume,
+                self.volumes_by_id,
+            )
+        )
+        metadata = sum(
+            sys.getsizeof(model) + sys.getsizeof(model.__dict__)
+            for model in [*self.volumes, *self.books]
+        )
+        return {
+            "volumes": len(self.volumes),
+            "books": len(self.books),
+            "chapters": len(self.chapters),
+            "verses": len(self.verse_ids),
+            "verse_array_bytes": verse_arrays,
+            "text_bytes": text,
+            "chapter_bytes": chapters,
+            "index_bytes": indexes,
+            "metadata_bytes": metadata,
+            "total_bytes": verse_arrays + text + chapters + indexes + metadata,
+        }
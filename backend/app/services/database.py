@@ -1,101 +1,512 @@
+import asyncio
+import logging
 import sqlite3
-from typing import List, Optional, Tuple
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
-from ..models.scripture import Book, Chapter, Scripture, Verse, Volume
-from ..utils.config import DATABASE_PATH
+from ..models.scripture import (
+    Book,
+    Chapter,
+    FacetCount,
+    SearchFacets,
+    Verse,
+    Volume,
+)
+from ..utils.compression import Payload
+from ..utils.config import API_VERSION, DATABASE_PATH
+from ..utils.environment import get_settings
+from ..utils.http_cache import CacheValidators, corpus_validators
+from ..utils.metrics import (
+    CACHE_ENTRIES,
+    CACHE_HIT_RATIO,
+    CACHE_HITS,
+    CACHE_MISSES,
+    DB_METHOD_ERRORS,
+    DB_METHOD_LATENCY,
+    DB_ROWS,
+    POOL_CONNECTIONS,
+    POOL_EVENTS,
+    result_rows,
+)
+from ..utils.profiling import active_profiler
+from .cache import TTLCache
+from .corpus import InMemoryCorpus
+from .navigation import build_navigation_tree
+from .pool import ConnectionPool
+from .query_log import SlowQueryLog
+from .references import PassageReference, ReferenceIndex
+from .rows import (
+    SCRIPTURE_COLUMNS,
+    book_rows,
+    chapter_rows,
+    project_scriptures,
+    scripture_key,
+    scripture_records,
+    scripture_select,
+    verse_rows,
+    volume_rows,
+)
+from .sampling import VerseSampler
+from .search import (
+    FTS_TABLE,
+    decode_cursor,
+    encode_cursor,
+    has_search_index,
+    to_fts_query,
+)
+from .serialization import model_json, models_json, verses_json
+
+logger = logging.getLogger("fast_scriptures.database")
+
+SEARCH_ENGINES = ("like", "fts")
+SEARCH_ORDERS = ("canonical", "relevance")
+SEARCH_FACETS = ("volume", "book")
+CORPUS_ENGINES = ("sqlite", "memory")
+# Most verses returned by one verse range read
+MAX_RANGE_VERSES = 1000
+# Rows fetched from the export cursor per streamed chunk
+EXPORT_BATCH_SIZE = 500
+# Bound parameters per statement; SQLite builds before 3.32 allow only 999
+MAX_SQL_VARIABLES = 999
+
+# Number of SQLite VM instructions between cancellation checks
+CANCEL_CHECK_INTERVAL = 1000
+
+T = TypeVar("T")
+
+# Cancellation flag of the query running on the current executor thread
+_query_cancel: ContextVar[Optional[threading.Event]] = ContextVar(
+    "query_cancel", default=None
+)
+
+
+class QueryTimeoutError(TimeoutError):
+    """Raised when a database call exceeds its time budget"""
 
 
 class DatabaseService:
     def __init__(self):
-        self.db_path = DATABASE_PATH
+        # config raises at import time when no database file is found
+        assert DATABASE_PATH is not None
+        self.db_path: Path = DATABASE_PATH
+        self._search_index_ready: Optional[bool] = None
+        self._search_index_lock = threading.Lock()
+
+        settings = get_settings()
+        self.query_log: Optional[SlowQueryLog] = None
+        if settings.slow_query_log_enabled:
+            self.query_log = SlowQueryLog(
+                threshold_ms=settings.slow_query_threshold_ms,
+                log_file=settings.slow_query_log_file,
+                max_bytes=settings.slow_query_log_max_bytes,
+                backup_count=settings.slow_query_log_backups,
+            )
+        self.pool = ConnectionPool(
+            self.db_path,
+            max_size=settings.db_pool_size,
+            timeout=settings.db_pool_timeout,
+            statement_cache_size=settings.db_statement_cache_size,
+            query_log=self.query_log,
+        )
+        self.query_timeout = settings.db_query_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        if settings.corpus_engine not in CORPUS_ENGINES:
+            raise ValueError(f"Unknown corpus engine: {settings.corpus_engine}")
+        self.corpus_engine = settings.corpus_engine
+        self._corpus: Optional[InMemoryCorpus] = None
+        self._corpus_lock = threading.Lock()
+        self._sampler: Optional[VerseSampler] = None
+        self._sampler_lock = threading.Lock()
+        self._lookups: Optional[Tuple[Dict[int, Volume], Dict[int, Book]]] = None
+        self._lookups_lock = threading.Lock()
+        self._reference_index: Optional[ReferenceIndex] = None
+        self._reference_index_lock = threading.Lock()
+        self._navigation: Optional[Payload] = None
+        self._navigation_lock = threading.Lock()
+        self._validators: Optional[CacheValidators] = None
+        self.result_cache = TTLCache(settings.cache_max_entries, settings.cache_ttl)
+        # The corpus never changes, so rendered payloads never expire
+        self.corpus_payloads = TTLCache(
+            settings.corpus_payload_cache_size, float("inf")
+        )
+        self.metrics_enabled = settings.metrics_enabled
+
+    @contextmanager
+    def get_connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a pooled read-only database connection
+
+        Inside run(), the connection aborts its current statement as soon as
+        the call is cancelled or times out.
+        """
+        cancel = _query_cancel.get()
+        with self.pool.connection() as conn:
+            if cancel is None:
+                yield conn
+                return
+            conn.set_progress_handler(cancel.is_set, CANCEL_CHECK_INTERVAL)
+            try:
+                yield conn
+            finally:
+                conn.set_progress_handler(None, 0)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Bounded thread pool that runs blocking database calls"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.pool.max_size, thread_name_prefix="scripture-db"
+            )
+        return self._executor
+
+    async def run(
+        self,
+        method: Callable[..., T],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> T:
+        """Run a blocking DatabaseService method without blocking the event loop
+
+        The call runs on the database executor. If it exceeds the timeout (the
+        DB_QUERY_TIMEOUT setting by default) or the awaiting task is cancelled,
+        the in-flight SQLite statement is interrupted and the worker is freed.
+        """
+        cancel = threading.Event()
+        loop = asyncio.get_running_loop()
+        job = partial(self._run_cancellable, cancel, method, *args, **kwargs)
+        profiler = active_profiler()
+        if profiler is not None:
+            # The request is being profiled: profile its database work too
+            job = partial(profiler.profile_call, job)
+        future = loop.run_in_executor(self.executor, job)
+        budget = self.query_timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(future, budget)
+        except asyncio.TimeoutError:
+            cancel.set()
+            raise QueryTimeoutError(f"Database query exceeded {budget}s")
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    def _run_cancellable(
+        self,
+        cancel: threading.Event,
+        method: Callable[..., T],
+        *args: Any,
+        **kwargs: Any,
+    ) -> T:
+        """Executor job: expose the cancel flag to get_connection()
+
+        Also records the method's time and rows returned when metrics are on.
+        """
+        token = _query_cancel.set(cancel)
+        try:
+            if not self.metrics_enabled:
+                return method(*args, **kwargs)
+            name = method.__name__
+            started = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                DB_METHOD_ERRORS.inc(1, name)
+                raise
+            finally:
+                DB_METHOD_LATENCY.observe(time.perf_counter() - started, name)
+            rows = result_rows(result)
+            if rows is not None:
+                DB_ROWS.inc(rows, name)
+            return result
+        finally:
+            _query_cancel.reset(token)
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Get connection pool usage counters"""
+        return self.pool.stats()
+
+    def close(self) -> None:
+        """Stop the database executor and close pooled connections"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.pool.close()
+
+    def warm_up(self) -> None:
+        """Prepare startup state: validators, corpus, parser
+
+        The navigation tree and volumes payloads are also precompressed, so
+        no request waits on their best-level encodes.
+        """
+        self.cache_validators()
+        self.memory_corpus()
+        self.reference_index()
+        hot_payloads = [self.navigation_tree()]
+        if self.corpus_payloads_enabled:
+            hot_payloads.append(self.get_volumes_json())
+        settings = get_settings()
+        if settings.compression_enabled:
+            for payload in hot_payloads:
+                payload.precompress(settings.compression_min_size)
+
+    def cache_validators(self) -> CacheValidators:
+        """HTTP validators for responses, computed once from the database and release"""
+        if self._validators is None:
+            release = f"{API_VERSION}+{get_settings().build_id or ''}"
+            self._validators = corpus_validators(self.db_path, release)
+        return self._validators
+
+    def memory_corpus(self) -> Optional[InMemoryCorpus]:
+        """Get the in-memory corpus, loading it on first use; None for sqlite"""
+        if self.corpus_engine != "memory":
+            return None
+        with self._corpus_lock:
+            if self._corpus is None:
+                with self.get_connection() as conn:
+                    self._corpus = InMemoryCorpus(conn)
+        return self._corpus
+
+    def corpus_stats(self) -> Optional[Dict[str, int]]:
+        """Memory footprint of the in-memory corpus, if that engine is enabled"""
+        corpus = self.memory_corpus()
+        return corpus.memory_report() if corpus is not None else None
 
-    def get_connection(self):
-        """Get a database connection"""
-        return sqlite3.connect(self.db_path)
+    def search_index_available(self) -> bool:
+        """Whether the FTS5 search index exists, checked once on first fts use
+
+        The index is built by setup_database.py, never at runtime: the
+        database is only opened read-only. Without it, fts searches fall back
+        to LIKE.
+        """
+        with self._search_index_lock:
+            if self._search_index_ready is None:
+                with self.get_connection() as conn:
+                    self._search_index_ready = has_search_index(conn)
+                if not self._search_index_ready:
+                    logger.warning(
+                        "No FTS5 search index in %s; engine=fts falls back to "
+                        "LIKE. Build it with `python setup_database.py`.",
+                        self.db_path,
+                    )
+        return self._search_index_ready
+
+    def _fts_match(self, query: str, engine: str, order: str) -> Optional[str]:
+        """Resolve the FTS5 MATCH expression for a search, or None for LIKE"""
+        if engine not in SEARCH_ENGINES:
+            raise ValueError(f"Unknown search engine: {engine}")
+        if order not in SEARCH_ORDERS:
+            raise ValueError(f"Unknown search order: {order}")
+
+        match = None
+        if engine == "fts" and self.search_index_available():
+            match = to_fts_query(query)
+
+        if order == "relevance" and match is None:
+            raise ValueError("Relevance ordering requires a full-text (fts) query")
+        return match
+
+    @staticmethod
+    def _cache_query(query: str) -> str:
+        """Normalize a search query for use in a cache key
+
+        LIKE and the FTS5 tokenizer both ignore ASCII case, so "Love" and
+        "love" share an entry. Non-ASCII queries are kept as-is because LIKE
+        is case-sensitive outside ASCII.
+        """
+        return query.lower() if query.isascii() else query
+
+    def result_cache_stats(self) -> Dict[str, float]:
+        """Get result cache counters"""
+        return self.result_cache.stats()
+
+    def publish_metrics(self) -> None:
+        """Copy cache and pool counters into the metrics registry"""
+        for name, cache in (
+            ("result", self.result_cache),
+            ("corpus_payload", self.corpus_payloads),
+        ):
+            stats = cache.stats()
+            CACHE_HITS.set(stats["hits"], name)
+            CACHE_MISSES.set(stats["misses"], name)
+            CACHE_HIT_RATIO.set(stats["hit_ratio"], name)
+            CACHE_ENTRIES.set(stats["size"], name)
+
+        pool = self.pool_stats()
+        for state in ("in_use", "idle"):
+            POOL_CONNECTIONS.set(pool[state], state)
+        for event in ("checkouts", "waits", "timeouts"):
+            POOL_EVENTS.set(pool[event], event)
+
+    def get_lookup_tables(
+        self, volume_ids: Iterable[int], book_ids: Iterable[int]
+    ) -> Tuple[List[Volume], List[Book]]:
+        """Volumes and books referenced by compact rows, each ordered by id"""
+        volumes_by_id, books_by_id = self._lookup_tables()
+        return (
+            [volumes_by_id[i] for i in sorted(set(volume_ids))],
+            [books_by_id[i] for i in sorted(set(book_ids))],
+        )
+
+    def _lookup_tables(self) -> Tuple[Dict[int, Volume], Dict[int, Book]]:
+        """Load every volume and book by id on first use"""
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return corpus.volumes_by_id, corpus.books_by_id
+
+        with self._lookups_lock:
+            if self._lookups is None:
+                with self.get_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.row_factory = volume_rows
+                    volumes = cursor.execute("SELECT * FROM volumes").fetchall()
+                    cursor = conn.cursor()
+                    cursor.row_factory = book_rows
+                    books = cursor.execute("SELECT * FROM books").fetchall()
+                self._lookups = (
+                    {volume.id: volume for volume in volumes},
+                    {book.id: book for book in books},
+                )
+        return self._lookups
+
+    def navigation_tree(self) -> Payload:
+        """Get the volume/book/chapter tree payload, built once per process"""
+        with self._navigation_lock:
+            if self._navigation is None:
+                version = self.cache_validators().version
+                with self.get_connection() as conn:
+                    tree = build_navigation_tree(conn, version)
+                self._navigation = Payload(model_json(tree))
+        return self._navigation
 
     def get_volumes(self) -> List[Volume]:
         """Get all volumes"""
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return corpus.get_volumes()
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = volume_rows
             cursor.execute("SELECT * FROM volumes ORDER BY id")
-            rows = cursor.fetchall()
-
-            volumes = []
-            for row in rows:
-                volumes.append(
-                    Volume(
-                        id=row[0],
-                        volume_title=row[1],
-                        volume_long_title=row[2],
-                        volume_subtitle=row[3],
-                        volume_short_title=row[4],
-                        volume_lds_url=row[5],
-                    )
-                )
-            return volumes
+            return cursor.fetchall()
 
     def get_books_by_volume(self, volume_id: int) -> List[Book]:
         """Get all books for a specific volume"""
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return corpus.get_books_by_volume(volume_id)
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = book_rows
             cursor.execute(
                 "SELECT * FROM books WHERE volume_id = ? ORDER BY id", (volume_id,)
             )
-            rows = cursor.fetchall()
-
-            books = []
-            for row in rows:
-                books.append(
-                    Book(
-                        id=row[0],
-                        volume_id=row[1],
-                        book_title=row[2],
-                        book_long_title=row[3],
-                        book_subtitle=row[4],
-                        book_short_title=row[5],
-                        book_lds_url=row[6],
-                    )
-                )
-            return books
+            return cursor.fetchall()
 
     def get_chapters_by_book(self, book_id: int) -> List[Chapter]:
         """Get all chapters for a specific book"""
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return corpus.get_chapters_by_book(book_id)
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = chapter_rows
             cursor.execute(
                 "SELECT * FROM chapters WHERE book_id = ? ORDER BY chapter_number",
                 (book_id,),
             )
-            rows = cursor.fetchall()
-
-            chapters = []
-            for row in rows:
-                chapters.append(
-                    Chapter(id=row[0], book_id=row[1], chapter_number=row[2])
-                )
-            return chapters
+            return cursor.fetchall()
 
     def get_verses_by_chapter(self, chapter_id: int) -> List[Verse]:
         """Get all verses for a specific chapter"""
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return corpus.get_verses_by_chapter(chapter_id)
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = verse_rows
             cursor.execute(
                 "SELECT * FROM verses WHERE chapter_id = ? ORDER BY verse_number",
                 (chapter_id,),
             )
-            rows = cursor.fetchall()
-
-            verses = []
-            for row in rows:
-                verses.append(
-                    Verse(
-                        id=row[0],
-                        chapter_id=row[1],
-                        verse_number=row[2],
-                        scripture_text=row[3],
-                    )
-                )
-            return verses
+            return cursor.fetchall()
+
+    @property
+    def corpus_payloads_enabled(self) -> bool:
+        """Whether navigation and chapter reads use cached, pre-rendered JSON"""
+        return self.corpus_payloads.max_entries > 0
+
+    def _corpus_payload(self, key: Tuple, render: Callable[[], bytes]) -> Payload:
+        """Render a corpus payload once and keep it with its compressed variants"""
+        return self.corpus_payloads.get_or_compute(key, lambda: Payload(render()))
+
+    def get_volumes_json(self) -> Payload:
+        """Get all volumes as a cached JSON payload"""
+        return self._corpus_payload(
+            ("volumes",), lambda: models_json(Volume, self.get_volumes())
+        )
+
+    def get_books_by_volume_json(self, volume_id: int) -> Payload:
+        """Get a volume's books as a cached JSON payload"""
+        return self._corpus_payload(
+            ("books", volume_id),
+            lambda: models_json(Book, self.get_books_by_volume(volume_id)),
+        )
+
+    def get_chapters_by_book_json(self, book_id: int) -> Payload:
+        """Get a book's chapters as a cached JSON payload"""
+        return self._corpus_payload(
+            ("chapters", book_id),
+            lambda: models_json(Chapter, self.get_chapters_by_book(book_id)),
+        )
+
+    def get_verses_by_chapter_json(self, chapter_id: int) -> Payload:
+        """Get a chapter's verses as a cached JSON payload
+
+        The payload matches the List[Verse] response schema but is built
+        straight from rows, skipping per-verse model validation and response
+        re-serialization.
+        """
+        return self._corpus_payload(
+            ("verses", chapter_id), lambda: verses_json(self._verse_rows(chapter_id))
+        )
+
+    def _verse_rows(self, chapter_id: int) -> List[Tuple[int, int, int, str]]:
+        """Raw verse rows for a chapter, ordered by verse number"""
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return corpus.verse_rows(chapter_id)
+
+        with self.get_connection() as conn:
+            return conn.execute(
+                """
+                SELECT id, chapter_id, verse_number, scripture_text FROM verses
+                WHERE chapter_id = ? ORDER BY verse_number
+            """,
+                (chapter_id,),
+            ).fetchall()
 
     def search_scriptures(
         self,
@@ -103,74 +514,394 @@ class DatabaseService:
         limit: int = 50,
         offset: int = 0,
         volume_id: Optional[int] = None,
-    ) -> Tuple[List[Scripture], int]:
-        """Search scriptures by text content with optional volume filter"""
+        engine: str = "like",
+        order: str = "canonical",
+        cursor: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[Any], int, Optional[str]]:
+        """Search scriptures by text content with optional volume filter
+
+        engine="like" does substring matching on the scriptures view;
+        engine="fts" uses the FTS5 index (word-prefix matching) and supports
+        order="relevance" for BM25 ranking.
+
+        Pages are selected either by offset or by a cursor returned from a
+        previous call; cursors seek past the last verse instead of re-reading
+        and discarding every earlier match. Returns the page, the total match
+        count and the cursor for the next page (None on the last page).
+
+        With fields set, only those columns are read and the page holds
+        field-aligned tuples instead of Scripture models.
+        """
+        key = (
+            "search",
+            self._cache_query(query),
+            limit,
+            offset,
+            volume_id,
+            engine,
+            order,
+            cursor,
+            fields,
+        )
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self._search_scriptures(
+                query, limit, offset, volume_id, engine, order, cursor, fields
+            ),
+        )
+
+    def _search_scriptures(
+        self,
+        query: str,
+        limit: int,
+        offset: int,
+        volume_id: Optional[int],
+        engine: str,
+        order: str,
+        cursor: Optional[str],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[Any], int, Optional[str]]:
+        """Uncached search_scriptures"""
+        match = self._fts_match(query, engine, order)
+        after = self._resolve_cursor(cursor, offset, order)
+        if match is not None:
+            return self._search_fts(
+                match, limit, offset, volume_id, order, after, fields
+            )
+
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cur = conn.cursor()
 
             # Build WHERE clause
             where_clause = "WHERE (scripture_text LIKE ? OR verse_title LIKE ?)"
-            params: List[str] = [f"%{query}%", f"%{query}%"]
+            params: List[object] = [f"%{query}%", f"%{query}%"]
 
             if volume_id is not None:
                 where_clause += " AND volume_id = ?"
-                params.append(str(volume_id))
+                params.append(volume_id)
 
-            # Count total results
-            cursor.execute(
+            total = self._search_total(
+                cur,
+                ("like", self._cache_query(query), volume_id),
+                f"SELECT COUNT(*) FROM scriptures {where_clause}",
+                params,
+            )
+
+            # Verse ids are assigned in canonical order, so ordering by
+            # verse_id alone walks the verses primary key without a sort and
+            # stops at the limit; seeking past the last returned verse_id
+            # continues the same ordering
+            page_params = list(params)
+            if after is not None:
+                where_clause += " AND verse_id > ?"
+                page_params.append(after[0])
+
+            # Get paginated results, plus one row to detect a further page
+            cur.execute(
                 f"""
-                SELECT COUNT(*) FROM scriptures
+                SELECT {scripture_select(fields)} FROM scriptures
+                {where_clause}
+                ORDER BY verse_id
+                LIMIT ? OFFSET ?
+            """,
+                page_params + [limit + 1, offset],
+            )
+            rows = cur.fetchall()
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1][scripture_key(fields)])
+
+            return scripture_records(rows, fields), total, next_cursor
+
+    def _search_total(
+        self, cur: sqlite3.Cursor, key: Tuple, sql: str, params: List[object]
+    ) -> int:
+        """Count a search's matches once; later pages reuse the cached total"""
+        total = self.result_cache.get_or_compute(
+            ("search_total",) + key, lambda: cur.execute(sql, params).fetchone()[0]
+        )
+        return int(total)
+
+    @staticmethod
+    def _resolve_cursor(
+        cursor: Optional[str], offset: int, order: str
+    ) -> Optional[Tuple[int, Optional[float]]]:
+        """Validate a search cursor against the requested paging and order"""
+        if cursor is None:
+            return None
+        if offset:
+            raise ValueError("Use either cursor or offset for pagination, not both")
+
+        verse_id, rank = decode_cursor(cursor)
+        if (rank is not None) != (order == "relevance"):
+            raise ValueError("Pagination cursor does not match the search order")
+        return verse_id, rank
+
+    def _search_fts(
+        self,
+        match: str,
+        limit: int,
+        offset: int,
+        volume_id: Optional[int],
+        order: str,
+        after: Optional[Tuple[int, Optional[float]]] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[Any], int, Optional[str]]:
+        """Search through the FTS5 index, ordered canonically or by BM25 rank"""
+        relevance = order == "relevance"
+
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+
+            # bm25() is only evaluated when the results are ranked by it
+            rank = f"bm25({FTS_TABLE})" if relevance else "0"
+            hits = f"""
+                SELECT rowid AS verse_id, {rank} AS rank
+                FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?
+            """
+            conditions: List[str] = []
+            params: List[object] = [match]
+
+            if volume_id is not None:
+                conditions.append("s.volume_id = ?")
+                params.append(volume_id)
+
+            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            total = self._search_total(
+                cur,
+                ("fts", match, volume_id),
+                f"""
+                SELECT COUNT(*) FROM (
+                    SELECT rowid AS verse_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?
+                ) AS h
+                JOIN scriptures s ON s.verse_id = h.verse_id
                 {where_clause}
             """,
                 params,
             )
-            total = cursor.fetchone()[0]
 
-            # Get paginated results
-            cursor.execute(
+            page_params = list(params)
+            if after is not None and relevance:
+                conditions.append("(h.rank > ? OR (h.rank = ? AND h.verse_id > ?))")
+                page_params += [after[1], after[1], after[0]]
+            elif after is not None:
+                conditions.append("h.verse_id > ?")
+                page_params.append(after[0])
+
+            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            order_by = "h.rank, h.verse_id" if relevance else "h.verse_id"
+            cur.execute(
                 f"""
-                SELECT * FROM scriptures
+                SELECT {scripture_select(fields, "s")}, h.rank FROM ({hits}) AS h
+                JOIN scriptures s ON s.verse_id = h.verse_id
                 {where_clause}
-                ORDER BY volume_id, book_id, chapter_id, verse_id
+                ORDER BY {order_by}
                 LIMIT ? OFFSET ?
             """,
-                params + [limit, offset],
+                page_params + [limit + 1, offset],
             )
-            rows = cursor.fetchall()
-
-            scriptures = []
-            for row in rows:
-                scriptures.append(
-                    Scripture(
-                        volume_id=row[0],
-                        book_id=row[1],
-                        chapter_id=row[2],
-                        verse_id=row[3],
-                        volume_title=row[4],
-                        book_title=row[5],
-                        volume_long_title=row[6],
-                        book_long_title=row[7],
-                        volume_subtitle=row[8],
-                        book_subtitle=row[9],
-                        volume_short_title=row[10],
-                        book_short_title=row[11],
-                        volume_lds_url=row[12],
-                        book_lds_url=row[13],
-                        chapter_number=row[14],
-                        verse_number=row[15],
-                        scripture_text=row[16],
-                        verse_title=row[17],
-                        verse_short_title=row[18],
-                    )
+            rows = cur.fetchall()
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                key = scripture_key(fields)
+                next_cursor = encode_cursor(
+                    last[key], last[key + 1] if relevance else None
                 )
 
-            return scriptures, total
+            return scripture_records(rows, fields), total, next_cursor
 
-    def get_search_counts_by_volume(self, query: str) -> List[Tuple[str, int]]:
+    def search_with_facets(
+        self,
+        query: str,
+        facets: Sequence[str],
+        limit: int = 50,
+        offset: int = 0,
+        volume_id: Optional[int] = None,
+        engine: str = "like",
+        order: str = "canonical",
+        cursor: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[Any], int, Optional[str], SearchFacets]:
+        """Search and count facets from a single evaluation of the match set
+
+        The matching (verse_id, volume_id, book_id, rank) tuples are read once;
+        the total, the facet counts and the page boundaries are all computed
+        from them, and only the page's rows are then fetched in full. Volume
+        counts ignore the volume filter so clients can offer every volume;
+        book counts respect it.
+        """
+        key = (
+            "facets",
+            self._cache_query(query),
+            tuple(sorted(set(facets))),
+            limit,
+            offset,
+            volume_id,
+            engine,
+            order,
+            cursor,
+            fields,
+        )
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self._search_with_facets(
+                query, facets, limit, offset, volume_id, engine, order, cursor, fields
+            ),
+        )
+
+    def _search_with_facets(
+        self,
+        query: str,
+        facets: Sequence[str],
+        limit: int,
+        offset: int,
+        volume_id: Optional[int],
+        engine: str,
+        order: str,
+        cursor: Optional[str],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[Any], int, Optional[str], SearchFacets]:
+        """Uncached search_with_facets"""
+        unknown = set(facets) - set(SEARCH_FACETS)
+        if unknown:
+            raise ValueError(f"Unknown search facets: {', '.join(sorted(unknown))}")
+
+        match = self._fts_match(query, engine, order)
+        after = self._resolve_cursor(cursor, offset, order)
+        relevance = order == "relevance"
+
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+
+            if match is not None:
+                rank = f"bm25({FTS_TABLE})" if relevance else "0"
+                order_by = "h.rank, h.verse_id" if relevance else "h.verse_id"
+                cur.execute(
+                    f"""
+                    SELECT s.verse_id, s.volume_id, s.book_id, h.rank
+                    FROM (
+                        SELECT rowid AS verse_id, {rank} AS rank
+                        FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?
+                    ) AS h
+                    JOIN scriptures s ON s.verse_id = h.verse_id
+                    ORDER BY {order_by}
+                """,
+                    (match,),
+                )
+            else:
+                cur.execute(
+                    """
+                    SELECT verse_id, volume_id, book_id, 0 FROM scriptures
+                    WHERE (scripture_text LIKE ? OR verse_title LIKE ?)
+                    ORDER BY verse_id
+                """,
+                    (f"%{query}%", f"%{query}%"),
+                )
+            matches = cur.fetchall()
+
+            result_facets = SearchFacets()
+            if "volume" in facets:
+                counts = Counter(m[1] for m in matches)
+                result_facets.volume = self._facet_counts(
+                    cur, "volumes", "volume_short_title", counts
+                )
+
+            if volume_id is not None:
+                matches = [m for m in matches if m[1] == volume_id]
+            total = len(matches)
+
+            if "book" in facets:
+                counts = Counter(m[2] for m in matches)
+                result_facets.book = self._facet_counts(
+                    cur, "books", "book_short_title", counts
+                )
+
+            start = offset
+            if after is not None:
+                if relevance:
+                    keys = [(m[3], m[0]) for m in matches]
+                    start = bisect_right(keys, (after[1], after[0]))
+                else:
+                    start = bisect_right([m[0] for m in matches], after[0])
+
+            page = matches[start : start + limit]
+            next_cursor = None
+            if page and start + limit < total:
+                last = page[-1]
+                next_cursor = encode_cursor(last[0], last[3] if relevance else None)
+
+            page_ids = [m[0] for m in page]
+            rows_by_id: Dict[int, tuple] = {}
+            if page_ids:
+                placeholders = ",".join("?" * len(page_ids))
+                cur.execute(
+                    f"""
+                    SELECT {scripture_select(fields)} FROM scriptures
+                    WHERE verse_id IN ({placeholders})
+                """,
+                    page_ids,
+                )
+                key = scripture_key(fields)
+                rows_by_id = {row[key]: row for row in cur.fetchall()}
+
+            rows = [rows_by_id[i] for i in page_ids]
+            return scripture_records(rows, fields), total, next_cursor, result_facets
+
+    @staticmethod
+    def _facet_counts(
+        cursor: sqlite3.Cursor, table: str, title_column: str, counts: Counter
+    ) -> List[FacetCount]:
+        """Attach short titles to facet counts, ordered by id"""
+        if not counts:
+            return []
+        ids = sorted(counts)
+        placeholders = ",".join("?" * len(ids))
+        cursor.execute(
+            f"SELECT id, {title_column} FROM {table} WHERE id IN ({placeholders})",
+            ids,
+        )
+        titles = dict(cursor.fetchall())
+        return [FacetCount(id=i, title=titles[i], count=counts[i]) for i in ids]
+
+    def get_search_counts_by_volume(
+        self, query: str, engine: str = "like"
+    ) -> List[Tuple[str, int]]:
         """Get search result counts grouped by volume"""
+        key = ("volume_counts", self._cache_query(query), engine)
+        return self.result_cache.get_or_compute(
+            key, lambda: self._get_search_counts_by_volume(query, engine)
+        )
+
+    def _get_search_counts_by_volume(
+        self, query: str, engine: str
+    ) -> List[Tuple[str, int]]:
+        """Uncached get_search_counts_by_volume"""
+        match = self._fts_match(query, engine, "canonical")
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
+            if match is not None:
+                cursor.execute(
+                    f"""
+                    SELECT v.volume_short_title, COUNT(*) as count
+                    FROM {FTS_TABLE} f
+                    JOIN scriptures s ON s.verse_id = f.rowid
+                    JOIN volumes v ON s.volume_id = v.id
+                    WHERE {FTS_TABLE} MATCH ?
+                    GROUP BY v.id, v.volume_short_title
+                    ORDER BY v.id
+                """,
+                    (match,),
+                )
+                return cursor.fetchall()
+
             cursor.execute(
                 """
                 SELECT v.volume_short_title, COUNT(*) as count
@@ -186,16 +917,47 @@ class DatabaseService:
             return cursor.fetchall()
 
     def get_scripture_by_reference(
-        self, book_title: str, chapter: int, verse: Optional[int] = None
-    ) -> List[Scripture]:
-        """Get scripture by book, chapter, and optional verse"""
+        self,
+        book_title: str,
+        chapter: int,
+        verse: Optional[int] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Any]:
+        """Get scripture by book, chapter, and optional verse
+
+        With fields set, returns field-aligned tuples instead of models.
+        """
+        # A falsy verse (None or 0) selects the whole chapter
+        key = ("reference", book_title, chapter, verse or None, fields)
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self._get_scripture_by_reference(
+                book_title, chapter, verse, fields
+            ),
+        )
+
+    def _get_scripture_by_reference(
+        self,
+        book_title: str,
+        chapter: int,
+        verse: Optional[int],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Any]:
+        """Uncached get_scripture_by_reference"""
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return project_scriptures(
+                corpus.get_scripture_by_reference(book_title, chapter, verse), fields
+            )
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            select = scripture_select(fields)
 
             if verse:
                 cursor.execute(
-                    """
-                    SELECT * FROM scriptures
+                    f"""
+                    SELECT {select} FROM scriptures
                     WHERE book_title = ? AND chapter_number = ? AND verse_number = ?
                     ORDER BY verse_id
                 """,
@@ -203,104 +965,337 @@ class DatabaseService:
                 )
             else:
                 cursor.execute(
-                    """
-                    SELECT * FROM scriptures
+                    f"""
+                    SELECT {select} FROM scriptures
                     WHERE book_title = ? AND chapter_number = ?
                     ORDER BY verse_number
                 """,
                     (book_title, chapter),
                 )
 
-            rows = cursor.fetchall()
-
-            scriptures = []
-            for row in rows:
-                scriptures.append(
-                    Scripture(
-                        volume_id=row[0],
-                        book_id=row[1],
-                        chapter_id=row[2],
-                        verse_id=row[3],
-                        volume_title=row[4],
-                        book_title=row[5],
-                        volume_long_title=row[6],
-                        book_long_title=row[7],
-                        volume_subtitle=row[8],
-                        book_subtitle=row[9],
-                        volume_short_title=row[10],
-                        book_short_title=row[11],
-                        volume_lds_url=row[12],
-                        book_lds_url=row[13],
-                        chapter_number=row[14],
-                        verse_number=row[15],
-                        scripture_text=row[16],
-                        verse_title=row[17],
-                        verse_short_title=row[18],
-                    )
+            return scripture_records(cursor.fetchall(), fields)
+
+    def get_scriptures_by_references(
+        self,
+        references: Sequence[Tuple[str, int, Optional[int]]],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[List[Any]]:
+        """Resolve many (book_title, chapter, verse) references at once
+
+        Each reference is resolved to its verse_id span through the reference
+        index, and all spans are read in one primary key scan, so a batch
+        costs one connection checkout. Returns one list per reference, in
+        request order; unknown references get [].
+        """
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return [
+                project_scriptures(
+                    corpus.get_scripture_by_reference(book_title, chapter, verse),
+                    fields,
                 )
+                for book_title, chapter, verse in references
+            ]
 
-            return scriptures
+        index = self.reference_index()
+        # A falsy verse (None or 0) selects the whole chapter
+        spans = [
+            index.verse_span(book_title, chapter, verse or None)
+            for book_title, chapter, verse in references
+        ]
+        found = iter(
+            self.get_scriptures_by_verse_ranges(
+                [span for span in spans if span is not None], fields
+            )
+        )
+        return [next(found) if span is not None else [] for span in spans]
 
-    def get_random_scripture(self, include_lds: bool = False) -> Scripture:
-        """Get a truly random scripture verse with optional LDS filtering"""
+    def reference_index(self) -> ReferenceIndex:
+        """Get the citation parser's book and chapter lookup, built once"""
+        with self._reference_index_lock:
+            if self._reference_index is None:
+                with self.get_connection() as conn:
+                    self._reference_index = ReferenceIndex(conn)
+        return self._reference_index
+
+    def get_passages(
+        self,
+        text: str,
+        fields: Optional[Tuple[str, ...]] = None,
+        max_references: Optional[int] = None,
+    ) -> List[Tuple[PassageReference, List[Any]]]:
+        """Parse citations like "John 3:16-18; Alma 32:21,27; D&C 4" and
+        fetch every range
+
+        Returns (reference, scriptures) pairs in citation order; references
+        that failed to parse carry an error and no scriptures. Raises
+        ValueError when there are no citations or more than max_references.
+        """
+        key = ("passages", text, fields, max_references)
+        return self.result_cache.get_or_compute(
+            key, lambda: self._get_passages(text, fields, max_references)
+        )
+
+    def _get_passages(
+        self,
+        text: str,
+        fields: Optional[Tuple[str, ...]],
+        max_references: Optional[int],
+    ) -> List[Tuple[PassageReference, List[Any]]]:
+        """Uncached get_passages"""
+        references = self.reference_index().parse(text)
+        if not references:
+            raise ValueError("No citations found")
+        if max_references is not None and len(references) > max_references:
+            raise ValueError(f"At most {max_references} references are allowed")
+
+        resolved: List[PassageReference] = []
+        ranges: List[Tuple[int, int]] = []
+        for ref in references:
+            if ref.start is not None and ref.end is not None:
+                resolved.append(ref)
+                ranges.append((ref.start, ref.end))
+        found = self.get_scriptures_by_verse_ranges(ranges, fields)
+        scriptures = {id(ref): rows for ref, rows in zip(resolved, found)}
+        return [(ref, scriptures.get(id(ref), [])) for ref in references]
+
+    def get_scriptures_by_verse_ranges(
+        self,
+        ranges: Sequence[Tuple[int, int]],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[List[Any]]:
+        """Get the verses of each inclusive (start, end) verse_id range
+
+        All ranges are read in one verse_id-ordered scan of the primary key.
+        Returns one list per range, in the order given.
+        """
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return [
+                project_scriptures(
+                    corpus.get_scriptures_by_verse_range(start, end), fields
+                )
+                for start, end in ranges
+            ]
+
+        if not ranges:
+            return []
+
+        results: List[List[Any]] = []
+        key = scripture_key(fields)
+        # Two parameters per range; chunks keep each statement under the limit
+        chunk_size = MAX_SQL_VARIABLES // 2
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            for begin in range(0, len(ranges), chunk_size):
+                chunk = ranges[begin : begin + chunk_size]
+                conditions = " OR ".join(["verse_id BETWEEN ? AND ?"] * len(chunk))
+                rows = conn.execute(
+                    f"""
+                    SELECT {scripture_select(fields)} FROM scriptures
+                    WHERE {conditions}
+                    ORDER BY verse_id
+                """,
+                    [bound for verse_range in chunk for bound in verse_range],
+                ).fetchall()
 
-            # Build WHERE clause for LDS filtering
-            where_clause = ""
-            params: List[str] = []
+                # Rows are ordered by verse_id, so each range is a contiguous
+                # slice
+                verse_ids = [row[key] for row in rows]
+                records = scripture_records(rows, fields)
+                results += [
+                    records[
+                        bisect_left(verse_ids, start) : bisect_right(verse_ids, end)
+                    ]
+                    for start, end in chunk
+                ]
+        return results
 
-            if not include_lds:
-                # Exclude LDS volumes (BoM, D&C, PGP) - only include OT and NT
-                where_clause = "WHERE volume_id IN (1, 2)"
+    def get_verse_range(
+        self,
+        from_verse_id: int,
+        to_verse_id: Optional[int] = None,
+        count: Optional[int] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[Any], Optional[int]]:
+        """Read a contiguous run of verses in canonical order
 
-            # Get total count of scriptures with filter
-            cursor.execute(f"SELECT COUNT(*) FROM scriptures {where_clause}", params)
-            result = cursor.fetchone()
-            total_count = result[0] if result else 0
+        The run starts at from_verse_id and ends at to_verse_id (inclusive)
+        or after count verses, crossing chapter and book boundaries. Verse
+        ids are canonical, so this is a primary key range scan. Returns the
+        verses and the verse_id of the next verse (None at the end), for
+        continuous reading.
+        """
+        if to_verse_id is not None and count is not None:
+            raise ValueError("Use either to_verse_id or count, not both")
+        if to_verse_id is not None:
+            if to_verse_id < from_verse_id:
+                raise ValueError("to_verse_id must not be before from_verse_id")
+            if to_verse_id - from_verse_id >= MAX_RANGE_VERSES:
+                raise ValueError(f"A range may span at most {MAX_RANGE_VERSES} verses")
+            count = to_verse_id - from_verse_id + 1
+        elif count is None:
+            count = 100
+        elif not 1 <= count <= MAX_RANGE_VERSES:
+            raise ValueError(f"count must be between 1 and {MAX_RANGE_VERSES}")
 
-            if total_count == 0:
-                raise ValueError("No scriptures found in database with current filter")
+        key = ("range", from_verse_id, to_verse_id, count, fields)
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self._get_verse_range(from_verse_id, to_verse_id, count, fields),
+        )
 
-            # Generate random offset
-            import random
+    def _get_verse_range(
+        self,
+        from_verse_id: int,
+        to_verse_id: Optional[int],
+        count: int,
+        fields: Optional[Tuple[str, ...]],
+    ) -> Tuple[List[Any], Optional[int]]:
+        """Uncached get_verse_range"""
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            scriptures, next_verse_id = corpus.get_verse_range(
+                from_verse_id, to_verse_id, count
+            )
+            return project_scriptures(scriptures, fields), next_verse_id
 
-            random_offset = random.randint(0, int(total_count) - 1)
+        where_clause = "WHERE verse_id >= ?"
+        params: List[object] = [from_verse_id]
+        if to_verse_id is not None:
+            where_clause += " AND verse_id <= ?"
+            params.append(to_verse_id)
 
-            # Get random scripture with filter
-            cursor.execute(
+        with self.get_connection() as conn:
+            # One extra row tells us where the next read starts
+            rows = conn.execute(
                 f"""
-                SELECT * FROM scriptures
+                SELECT {scripture_select(fields)} FROM scriptures
                 {where_clause}
                 ORDER BY verse_id
-                LIMIT 1 OFFSET ?
+                LIMIT ?
             """,
-                params + [random_offset],
+                params + [count + 1],
+            ).fetchall()
+
+            next_verse_id = None
+            if len(rows) > count:
+                next_verse_id = rows.pop()[scripture_key(fields)]
+            elif to_verse_id is not None:
+                next_verse_id = conn.execute(
+                    "SELECT MIN(id) FROM verses WHERE id > ?", (to_verse_id,)
+                ).fetchone()[0]
+
+        return scripture_records(rows, fields), next_verse_id
+
+    def export_rows(
+        self,
+        volume_id: Optional[int] = None,
+        book_id: Optional[int] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> Iterator[List[tuple]]:
+        """Yield scripture rows in canonical order, batch_size at a time
+
+        Rows come straight from an SQLite cursor on a dedicated connection,
+        so memory use is constant however much is exported. Each row holds
+        the selected fields (all Scripture fields by default), in order.
+        """
+        conditions: List[str] = []
+        params: List[object] = []
+        if volume_id is not None:
+            conditions.append("volume_id = ?")
+            params.append(volume_id)
+        if book_id is not None:
+            conditions.append("book_id = ?")
+            params.append(book_id)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self.pool.dedicated() as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT {", ".join(fields or SCRIPTURE_COLUMNS)} FROM scriptures
+                {where_clause}
+                ORDER BY verse_id
+            """,
+                params,
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if self.metrics_enabled:
+                    DB_ROWS.inc(len(rows), "export_rows")
+                yield rows
+
+    def get_random_scripture(
+        self,
+        include_lds: bool = False,
+        volume_id: Optional[int] = None,
+        seed: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Any:
+        """Get a truly random scripture verse with optional LDS filtering"""
+        return self.get_random_scriptures(1, include_lds, volume_id, seed, fields)[0]
+
+    def get_random_scriptures(
+        self,
+        count: int = 1,
+        include_lds: bool = False,
+        volume_id: Optional[int] = None,
+        seed: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Any]:
+        """Get up to count distinct random verses
+
+        Verses are drawn by index from precomputed verse_id pools (OT/NT only,
+        all volumes, or one volume when volume_id is given), so no query has
+        to count or skip rows. A seed makes the draw deterministic, e.g. a
+        date string for a verse of the day. With fields set, returns
+        field-aligned tuples instead of models.
+        """
+        corpus = self.memory_corpus()
+        if corpus is not None:
+            return project_scriptures(
+                corpus.get_random_scriptures(count, include_lds, volume_id, seed),
+                fields,
             )
 
-            row = cursor.fetchone()
-
-            if not row:
-                raise ValueError("Failed to fetch random scripture")
-
-            return Scripture(
-                volume_id=row[0],
-                book_id=row[1],
-                chapter_id=row[2],
-                verse_id=row[3],
-                volume_title=row[4],
-                book_title=row[5],
-                volume_long_title=row[6],
-                book_long_title=row[7],
-                volume_subtitle=row[8],
-                book_subtitle=row[9],
-                volume_short_title=row[10],
-                book_short_title=row[11],
-                volume_lds_url=row[12],
-                book_lds_url=row[13],
-                chapter_number=row[14],
-                verse_number=row[15],
-                scripture_text=row[16],
-                verse_title=row[17],
-                verse_short_title=row[18],
+        verse_ids = self._verse_sampler().sample(count, include_lds, volume_id, seed)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ",".join("?" * len(verse_ids))
+            cursor.execute(
+                f"""
+                SELECT {scripture_select(fields)} FROM scriptures
+                WHERE verse_id IN ({placeholders})
+            """,
+                verse_ids,
             )
+            key = scripture_key(fields)
+            rows_by_id = {row[key]: row for row in cursor.fetchall()}
+
+        if len(rows_by_id) != len(verse_ids):
+            raise ValueError("Failed to fetch random scripture")
+        return scripture_records([rows_by_id[i] for i in verse_ids], fields)
+
+    def _verse_sampler(self) -> VerseSampler:
+        """Load the random selection pools on first use"""
+        with self._sampler_lock:
+            if self._sampler is None:
+                with self.get_connection() as conn:
+                    cursor = conn.execute(
+                        "SELECT verse_id, volume_id FROM scriptures ORDER BY verse_id"
+                    )
+                    self._sampler = VerseSampler(cursor)
+        return self._sampler
+
+
+_db_service: Optional[DatabaseService] = None
+
+
+def get_database_service() -> DatabaseService:
+    """Get the shared database service"""
+    global _db_service
+    if _db_service is None:
+        _db_service = DatabaseService()
+    return _db_service
@@ -0,0 +1,63 @@
+import sqlite3
+from typing import Dict, List
+
+from ..models.scripture import NavigationBook, NavigationTree, NavigationVolume
+
+# Layout of each entry in NavigationBook.chapters
+CHAPTER_COLUMNS = ("id", "chapter_number", "verse_count")
+
+
+def build_navigation_tree(conn: sqlite3.Connection, version: str) -> NavigationTree:
+    """Build the whole volume/book/chapter hierarchy with counts in three queries
+
+    Chapters are compact [id, chapter_number, verse_count] rows so the full
+    tree stays small enough to fetch before the first navigation.
+    """
+    chapters: Dict[int, List[List[int]]] = {}
+    for chapter_id, book_id, chapter_number, verse_count in conn.execute(
+        """
+        SELECT c.id, c.book_id, c.chapter_number, COUNT(x.id)
+        FROM chapters c LEFT JOIN verses x ON x.chapter_id = c.id
+        GROUP BY c.id
+        ORDER BY c.book_id, c.chapter_number
+    """
+    ):
+        chapters.setdefault(book_id, []).append(
+            [chapter_id, chapter_number, verse_count]
+        )
+
+    books: Dict[int, List[NavigationBook]] = {}
+    for book_id, volume_id, title, short_title in conn.execute(
+        "SELECT id, volume_id, book_title, book_short_title FROM books ORDER BY id"
+    ):
+        book_chapters = chapters.get(book_id, [])
+        books.setdefault(volume_id, []).append(
+            NavigationBook.model_construct(
+                id=book_id,
+                book_title=title,
+                book_short_title=short_title,
+                chapter_count=len(book_chapters),
+                verse_count=sum(chapter[2] for chapter in book_chapters),
+                chapters=book_chapters,
+            )
+        )
+
+    volumes = []
+    for volume_id, title, short_title in conn.execute(
+        "SELECT id, volume_title, volume_short_title FROM volumes ORDER BY id"
+    ):
+        volume_books = books.get(volume_id, [])
+        volumes.append(
+            NavigationVolume.model_construct(
+                id=volume_id,
+                volume_title=title,
+                volume_short_title=short_title,
+                chapter_count=sum(book.chapter_count for book in volume_books),
+                verse_count=sum(book.verse_count for book in volume_books),
+                books=volume_books,
+            )
+        )
+
+    return NavigationTree.model_construct(
+        version=version, chapter_columns=list(CHAPTER_COLUMNS), volumes=volumes
+    )
@@ -0,0 +1,154 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+from .query_log import InstrumentedConnection, SlowQueryLog
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection becomes free within the timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived, read-only SQLite connections
+
+    The scripture database never changes at runtime, so connections are opened
+    once in read-only mode and reused. Keeping them open preserves SQLite's
+    page cache and parsed schema, and lets the sqlite3 module's per-connection
+    statement cache reuse prepared statements across requests.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        max_size: int = 4,
+        timeout: float = 5.0,
+        statement_cache_size: int = 128,
+        query_log: Optional[SlowQueryLog] = None,
+    ):
+        if max_size < 1:
+            raise ValueError("Connection pool size must be at least 1")
+        self.db_path = Path(db_path)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.statement_cache_size = statement_cache_size
+        self.query_log = query_log
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new read-only connection, instrumented if there is a query log"""
+        conn = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+            factory=(
+                InstrumentedConnection
+                if self.query_log is not None
+                else sqlite3.Connection
+            ),
+        )
+        if isinstance(conn, InstrumentedConnection):
+            conn.query_log = self.query_log
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection, opening one if the pool is not yet full"""
+        conn: Optional[sqlite3.Connection] = None
+        create = False
+        with self._lock:
+            self._checkouts += 1
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                create = self._open < self.max_size
+                if create:
+                    self._open += 1
+                else:
+                    self._waits += 1
+
+        if conn is None and create:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._open -= 1
+                raise
+        elif conn is None:
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._timeouts += 1
+                raise PoolTimeoutError(
+                    f"No database connection available within {self.timeout}s"
+                )
+
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a checked-out connection to the pool"""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager that checks a connection out and back in"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def dedicated(self) -> Iterator[sqlite3.Connection]:
+        """Open an unpooled read-only connection for long-lived work
+
+        Streaming responses may be consumed slowly; giving them their own
+        connection keeps them from starving the pool.
+        """
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        """Close all idle connections (e.g. on application shutdown)"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._open -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Pool usage counters for monitoring"""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "open": self._open,
+                "in_use": self._in_use,
+                "idle": self._open - self._in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+            }
@@ -0,0 +1,224 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, TypeVar
+
+from ..utils.metrics import DB_SLOW_QUERIES
+
+logger = logging.getLogger("fast_scriptures.slow_queries")
+
+T = TypeVar("T")
+
+_WHITESPACE = re.compile(r"\s+")
+# Variable-length parts of generated SQL, collapsed so that every call site
+# has one shape: "IN (?,?,?)", "VALUES (?, ?), (?, ?)", "x BETWEEN ? AND ? OR
+# x BETWEEN ? AND ?"
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"\(\?, \.\.\.\)(?:\s*,\s*\(\?, \.\.\.\))+")
+_BETWEEN_LIST = re.compile(r"([\w.]+ BETWEEN \? AND \?)(?:\s+OR\s+\1)+")
+
+# Longest string parameter kept in a log entry
+MAX_PARAM_LENGTH = 200
+# Most distinct query shapes tracked in the summary
+MAX_SHAPES = 256
+
+
+def query_shape(sql: str) -> str:
+    """Normalize SQL to its shape: one line, placeholder lists collapsed"""
+    shape = _WHITESPACE.sub(" ", sql).strip()
+    shape = _PLACEHOLDER_LIST.sub("?, ...", shape)
+    shape = _ROW_LIST.sub("(?, ...), ...", shape)
+    return _BETWEEN_LIST.sub(r"\1 OR ...", shape)
+
+
+def _loggable(params: Any) -> Any:
+    """Parameters as JSON-friendly values, long strings truncated"""
+    if isinstance(params, dict):
+        return {key: _loggable(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_loggable(value) for value in params]
+    if isinstance(params, str) and len(params) > MAX_PARAM_LENGTH:
+        return params[:MAX_PARAM_LENGTH] + "..."
+    if isinstance(params, bytes):
+        return f"<{len(params)} bytes>"
+    return params
+
+
+def explain_query_plan(
+    conn: sqlite3.Connection, sql: str, params: Any = ()
+) -> List[str]:
+    """EXPLAIN QUERY PLAN output as indented lines, one per plan step"""
+    keyword = sql.lstrip()[:6].upper()
+    if not keyword.startswith(("SELECT", "WITH")):
+        return []
+    try:
+        # A plain cursor, so the EXPLAIN itself is not instrumented
+        rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        depth: Dict[int, int] = {0: -1}
+        lines = []
+        for step_id, parent, _, detail in rows:
+            depth[step_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[step_id] + detail)
+        return lines
+    except sqlite3.Error as e:
+        return [f"EXPLAIN QUERY PLAN failed: {e}"]
+
+
+class SlowQueryLog:
+    """Record statements slower than a threshold with their query plans
+
+    Each slow statement is logged (to a rotating file when log_file is set),
+    kept in a bounded list of recent entries and summarized per query shape,
+    so a full scan introduced by a data or schema change shows up at once.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 100.0,
+        max_entries: int = 100,
+        log_file: Optional[str] = None,
+        max_bytes: int = 1_000_000,
+        backup_count: int = 3,
+    ):
+        self.threshold = threshold_ms / 1000
+        self._lock = threading.Lock()
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        if log_file and not any(
+            isinstance(handler, RotatingFileHandler)
+            and handler.baseFilename.endswith(log_file)
+            for handler in logger.handlers
+        ):
+            handler = RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.WARNING)
+
+    def record(
+        self, conn: sqlite3.Connection, sql: str, params: Any, elapsed: float
+    ) -> None:
+        """Capture a statement that took elapsed seconds, if it was slow"""
+        if elapsed < self.threshold:
+            return
+        shape = query_shape(sql)
+        plan = explain_query_plan(conn, sql, params)
+        entry = {
+            "timestamp": time.time(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "sql": shape,
+            "params": _loggable(params),
+            "plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            summary = self._shapes.get(shape)
+            if summary is None and len(self._shapes) < MAX_SHAPES:
+                summary = self._shapes[shape] = {
+                    "sql": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                }
+            if summary is not None:
+                summary["count"] += 1
+                summary["total_ms"] += entry["duration_ms"]
+                summary["max_ms"] = max(summary["max_ms"], entry["duration_ms"])
+                summary["plan"] = plan
+        DB_SLOW_QUERIES.inc()
+        logger.warning(
+            "slow query %.1fms: %s params=%r plan=%s",
+            entry["duration_ms"],
+            shape,
+            entry["params"],
+            " | ".join(line.strip() for line in plan),
+        )
+
+    def entries(self, include_params: bool = True) -> List[Dict[str, Any]]:
+        """Recent slow statements, newest first, optionally without params"""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        if include_params:
+            return entries
+        return [
+            {key: value for key, value in entry.items() if key != "params"}
+            for entry in entries
+        ]
+
+    def shapes(self) -> List[Dict[str, Any]]:
+        """Per-shape totals, slowest total time first"""
+        with self._lock:
+            summaries = [dict(summary) for summary in self._shapes.values()]
+        return sorted(summaries, key=lambda s: s["total_ms"], reverse=True)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports slow statements to its connection's query log
+
+    A statement's time is execute() (SQLite runs to the first row there) plus
+    fetchall()/fetchmany()/fetchone() calls made on the same cursor. Rows
+    consumed by iterating the cursor are not timed.
+    """
+
+    _sql: Optional[str] = None
+    _params: Any = ()
+    _elapsed = 0.0
+    _reported = False
+
+    def execute(self, sql: str, parameters: Any = (), /) -> "InstrumentedCursor":
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._sql, self._params = sql, parameters
+        self._elapsed = time.perf_counter() - started
+        self._reported = False
+        self._check()
+        return self
+
+    def fetchall(self) -> List[Any]:
+        return self._timed(super().fetchall)
+
+    def fetchmany(self, size: int = -1) -> List[Any]:  # type: ignore[override]
+        if size < 0:
+            size = self.arraysize
+        return self._timed(lambda: super(InstrumentedCursor, self).fetchmany(size))
+
+    def fetchone(self) -> Any:
+        return self._timed(super().fetchone)
+
+    def _timed(self, fetch: Callable[[], T]) -> T:
+        started = time.perf_counter()
+        result = fetch()
+        self._elapsed += time.perf_counter() - started
+        self._check()
+        return result
+
+    def _check(self) -> None:
+        query_log: Optional[SlowQueryLog] = getattr(self.connection, "query_log", None)
+        if (
+            query_log is not None
+            and not self._reported
+            and self._sql is not None
+            and self._elapsed >= query_log.threshold
+        ):
+            self._reported = True
+            query_log.record(self.connection, self._sql, self._params, self._elapsed)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose statements all run on InstrumentedCursor"""
+
+    query_log: Optional[SlowQueryLog] = None
+
+    def cursor(self, factory: Any = InstrumentedCursor) -> Any:
+        return super().cursor(factory)
+
+    def execute(  # type: ignore[override]
+        self, sql: str, parameters: Sequence[Any] = (), /
+    ) -> InstrumentedCursor:
+        cursor: InstrumentedCursor = self.cursor()
+        return cursor.execute(sql, parameters)
@@ -0,0 +1,207 @@
+import re
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+# One comma-separated part of a citation: "3", "3:16", "3:16-18", "3-4",
+# "3:16-4:2"
+_PART_PATTERN = re.compile(
+    r"^(\d+)(?:\s*:\s*(\d+))?(?:\s*[-–—]\s*(\d+)(?:\s*:\s*(\d+))?)?$"
+)
+# A citation is an optional book name followed by its chapter/verse parts.
+# Book names may start with a number ("1 Ne."), so a name is optional digits,
+# a letter, then digit-free words. Words and the whitespace between them never
+# overlap, so a non-matching citation fails in linear time.
+_CITATION_PATTERN = re.compile(
+    r"^(?P<book>(?:\d+\s*)?[^\W\d_][^\s\d]*(?:\s+[^\s\d]+)*)?"
+    r"\s*(?P<spec>\d[\d\s:,\-–—]*)?$"
+)
+# Longest citation string accepted by the passages endpoint
+MAX_CITATION_LENGTH = 2000
+
+
+def book_key(name: str) -> str:
+    """Normalize a book name for lookup: "1 Ne." and "1ne" share a key"""
+    return re.sub(r"[\s.]+", "", name).lower()
+
+
+class ChapterRange:
+    """A chapter's verse_id span; verse n has verse_id first + n - 1"""
+
+    __slots__ = ("first", "count")
+
+    def __init__(self, first: int, count: int):
+        self.first = first
+        self.count = count
+
+
+class PassageReference:
+    """One resolved citation range, or the error that prevented it"""
+
+    __slots__ = ("reference", "start", "end", "error")
+
+    def __init__(
+        self,
+        reference: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        self.reference = reference
+        self.start = start
+        self.end = end
+        self.error = error
+
+
+class ReferenceIndex:
+    """Precompiled book-name and chapter lookup for parsing citations
+
+    Built once from the database, so parsing "John 3:16-18; Alma 32:21,27;
+    D&C 4" into verse_id ranges is a handful of dictionary hits.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.book_titles: Dict[int, str] = {}
+        self.books_by_title: Dict[str, int] = {}
+        self.books_by_key: Dict[str, int] = {}
+        for book_id, title, short_title in conn.execute(
+            "SELECT id, book_title, book_short_title FROM books ORDER BY id"
+        ):
+            self.book_titles[book_id] = title
+            self.books_by_title.setdefault(title, book_id)
+            for name in (title, short_title):
+                self.books_by_key.setdefault(book_key(name), book_id)
+
+        self.chapters: Dict[Tuple[int, int], ChapterRange] = {}
+        for book_id, chapter_number, first, last, count in conn.execute(
+            """
+            SELECT c.book_id, c.chapter_number, MIN(x.id), MAX(x.id), COUNT(*)
+            FROM chapters c JOIN verses x ON x.chapter_id = c.id
+            GROUP BY c.id
+        """
+        ):
+            if last - first + 1 != count:
+                raise ValueError(
+                    f"Verse ids are not contiguous in book {book_id} "
+                    f"chapter {chapter_number}"
+                )
+            self.chapters[(book_id, chapter_number)] = ChapterRange(first, count)
+
+    def parse(self, text: str) -> List[PassageReference]:
+        """Parse ";"-separated citations into verse_id ranges
+
+        Each comma-separated part becomes its own range. A citation without a
+        book name continues the previous citation's book, and bare numbers
+        after a chapter:verse part are verses of that chapter ("Alma
+        32:21,27").
+        """
+        references: List[PassageReference] = []
+        book_id: Optional[int] = None
+        for citation in text.split(";"):
+            citation = citation.strip()
+            if not citation:
+                continue
+            match = _CITATION_PATTERN.match(citation)
+            if match is None or not match.group("spec"):
+                references.append(PassageReference(citation, error="Invalid reference"))
+                continue
+
+            if match.group("book"):
+                book_id = self.books_by_key.get(book_key(match.group("book")))
+                if book_id is None:
+                    references.append(
+                        PassageReference(
+                            citation, error=f"Unknown book: {match.group('book')}"
+                        )
+                    )
+                    continue
+            elif book_id is None:
+                references.append(PassageReference(citation, error="Missing book"))
+                continue
+
+            context: Optional[int] = None
+            for part in match.group("spec").split(","):
+                part = part.strip()
+                if not part:
+                    continue
+                reference, context = self._resolve(book_id, part, context)
+                references.append(reference)
+        return references
+
+    def verse_span(
+        self, book_title: str, chapter: int, verse: Optional[int] = None
+    ) -> Optional[Tuple[int, int]]:
+        """verse_id span of a chapter, or of one verse, by exact book title"""
+        book_id = self.books_by_title.get(book_title)
+        if book_id is None:
+            return None
+        start = self._verse_id(book_id, chapter, verse, first=True)
+        end = self._verse_id(book_id, chapter, verse, first=False)
+        if start is None or end is None:
+            return None
+        return start, end
+
+    def _resolve(
+        self, book_id: int, part: str, context: Optional[int]
+    ) -> Tuple[PassageReference, Optional[int]]:
+        """Resolve one citation part; returns it and the new chapter context"""
+        title = self.book_titles[book_id]
+        match = _PART_PATTERN.match(part)
+        if match is None:
+            return (
+                PassageReference(f"{title} {part}", error="Invalid reference"),
+                context,
+            )
+
+        a = int(match.group(1))
+        b, c, d = (int(g) if g is not None else None for g in match.group(2, 3, 4))
+        # Start: "C:V", or a verse of the current chapter, or a whole chapter
+        start_chapter: int
+        start_verse: Optional[int]
+        if b is not None:
+            start_chapter, start_verse = a, b
+        elif context is not None:
+            start_chapter, start_verse = context, a
+        else:
+            start_chapter, start_verse = a, None
+        # End: same as start, "…-C:V", "…-V" in the same chapter, or "…-C"
+        end_chapter, end_verse = start_chapter, start_verse
+        if c is not None and d is not None:
+            end_chapter, end_verse = c, d
+        elif c is not None and start_verse is not None:
+            end_verse = c
+        elif c is not None:
+            end_chapter, end_verse = c, None
+        if end_verse is not None:
+            context = end_chapter
+
+        label = f"{title} {self._label(start_chapter, start_verse)}"
+        if (end_chapter, end_verse) != (start_chapter, start_verse):
+            if end_chapter == start_chapter and end_verse is not None:
+                label += f"-{end_verse}"
+            else:
+                label += f"-{self._label(end_chapter, end_verse)}"
+
+        start = self._verse_id(book_id, start_chapter, start_verse, first=True)
+        end = self._verse_id(book_id, end_chapter, end_verse, first=False)
+        if start is None or end is None:
+            return PassageReference(label, error="Reference not found"), context
+        if end < start:
+            return PassageReference(label, error="Range ends before it starts"), context
+        return PassageReference(label, start, end), context
+
+    @staticmethod
+    def _label(chapter: int, verse: Optional[int]) -> str:
+        return str(chapter) if verse is None else f"{chapter}:{verse}"
+
+    def _verse_id(
+        self, book_id: int, chapter: int, verse: Optional[int], first: bool
+    ) -> Optional[int]:
+        """verse_id of a verse, or of a whole chapter's first/last verse"""
+        span = self.chapters.get((book_id, chapter))
+        if span is None:
+            return None
+        if verse is None:
+            return span.first if first else span.first + span.count - 1
+        if not 1 <= verse <= span.count:
+            return None
+        return span.first + verse - 1
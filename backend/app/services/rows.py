@@ -0,0 +1,145 @@
+import sqlite3
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from ..models.scripture import Book, Chapter, Scripture, Verse, Volume
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def columns(model: Type[BaseModel]) -> Tuple[str, ...]:
+    """Field names of a model, which match its table/view columns in order"""
+    return tuple(model.model_fields)
+
+
+VOLUME_COLUMNS = columns(Volume)
+BOOK_COLUMNS = columns(Book)
+CHAPTER_COLUMNS = columns(Chapter)
+VERSE_COLUMNS = columns(Verse)
+SCRIPTURE_COLUMNS = columns(Scripture)
+
+
+def builder(model: Type[M]) -> Callable[[Sequence[Any]], M]:
+    """Make a function that builds a model from a row without validation
+
+    Rows come from our own read-only database, so the per-field validation
+    pass is skipped with model_construct(). Extra trailing columns (such as a
+    search rank) are ignored.
+    """
+    fields = columns(model)
+    construct = model.model_construct
+
+    def build(row: Sequence[Any]) -> M:
+        return construct(**dict(zip(fields, row)))
+
+    return build
+
+
+def row_factory(model: Type[M]) -> Callable[[sqlite3.Cursor, Sequence[Any]], M]:
+    """Make a sqlite3 row_factory that yields unvalidated models"""
+    build = builder(model)
+
+    def factory(cursor: sqlite3.Cursor, row: Sequence[Any]) -> M:
+        return build(row)
+
+    return factory
+
+
+build_volume = builder(Volume)
+build_book = builder(Book)
+build_chapter = builder(Chapter)
+build_verse = builder(Verse)
+build_scripture = builder(Scripture)
+
+volume_rows = row_factory(Volume)
+book_rows = row_factory(Book)
+chapter_rows = row_factory(Chapter)
+verse_rows = row_factory(Verse)
+scripture_rows = row_factory(Scripture)
+
+
+# Named fields= selections for endpoints that return Scripture rows
+SCRIPTURE_FIELD_PRESETS = {
+    "all": SCRIPTURE_COLUMNS,
+    "compact": (
+        "volume_id",
+        "book_id",
+        "chapter_id",
+        "verse_id",
+        "book_short_title",
+        "chapter_number",
+        "verse_number",
+        "scripture_text",
+        "verse_short_title",
+    ),
+}
+
+
+# Row columns of format=compact responses; titles, subtitles and URLs are
+# served once per volume/book in lookup tables instead of on every verse
+COMPACT_COLUMNS = (
+    "verse_id",
+    "volume_id",
+    "book_id",
+    "chapter_id",
+    "chapter_number",
+    "verse_number",
+    "scripture_text",
+)
+
+
+def scripture_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a fields= selector into Scripture columns, in model order
+
+    Accepts a preset name or a comma-separated list of field names. Returns
+    None when the full model is selected. Raises ValueError for unknown
+    fields.
+    """
+    if value is None or not value.strip():
+        return None
+    name = value.strip()
+    if name in SCRIPTURE_FIELD_PRESETS:
+        requested = set(SCRIPTURE_FIELD_PRESETS[name])
+    else:
+        requested = {field.strip() for field in name.split(",") if field.strip()}
+        unknown = requested - set(SCRIPTURE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if requested >= set(SCRIPTURE_COLUMNS):
+        return None
+    return tuple(field for field in SCRIPTURE_COLUMNS if field in requested)
+
+
+def scripture_select(fields: Optional[Sequence[str]], alias: str = "") -> str:
+    """SQL select list for Scripture rows, with verse_id appended as a key
+
+    The appended verse_id sits at index scripture_key(fields) of every row.
+    """
+    prefix = f"{alias}." if alias else ""
+    selected = [*(fields or SCRIPTURE_COLUMNS), "verse_id"]
+    return ", ".join(f"{prefix}{column}" for column in selected)
+
+
+def scripture_key(fields: Optional[Sequence[str]]) -> int:
+    """Index of the verse_id key in rows selected with scripture_select"""
+    return len(fields or SCRIPTURE_COLUMNS)
+
+
+def scripture_records(
+    rows: Sequence[Sequence[Any]], fields: Optional[Sequence[str]]
+) -> List[Any]:
+    """Scripture models for full rows, or field-aligned tuples for a projection"""
+    if fields is None:
+        return [build_scripture(row) for row in rows]
+    width = len(fields)
+    return [tuple(row[:width]) for row in rows]
+
+
+def project_scriptures(
+    scriptures: Sequence[Scripture], fields: Optional[Sequence[str]]
+) -> List[Any]:
+    """Apply a projection to Scripture models built outside SQL"""
+    if fields is None:
+        return list(scriptures)
+    return [tuple(getattr(s, field) for field in fields) for s in scriptures]
@@ -0,0 +1,50 @@
+import random
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Volumes served by random selection unless LDS scriptures are included
+# (Old Testament and New Testament)
+NON_LDS_VOLUME_IDS = (1, 2)
+
+
+class VerseSampler:
+    """Precomputed pools of verse keys for O(1) random selection
+
+    Keys are whatever identifies a verse to the caller (verse ids for SQLite,
+    array indexes for the in-memory corpus). Pools are built once, in
+    canonical order, so a seeded draw is reproducible across processes.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, int]]):
+        """Build pools from (key, volume_id) pairs in canonical order"""
+        self.all_verses = array("l")
+        self.non_lds_verses = array("l")
+        self.by_volume: Dict[int, array] = {}
+        for key, volume_id in rows:
+            self.all_verses.append(key)
+            if volume_id in NON_LDS_VOLUME_IDS:
+                self.non_lds_verses.append(key)
+            self.by_volume.setdefault(volume_id, array("l")).append(key)
+
+    def pool(self, include_lds: bool = False, volume_id: Optional[int] = None) -> array:
+        """Eligible keys for a filter; volume_id takes precedence over include_lds"""
+        if volume_id is not None:
+            return self.by_volume.get(volume_id, array("l"))
+        return self.all_verses if include_lds else self.non_lds_verses
+
+    def sample(
+        self,
+        count: int = 1,
+        include_lds: bool = False,
+        volume_id: Optional[int] = None,
+        seed: Optional[str] = None,
+    ) -> List[int]:
+        """Pick up to count distinct keys; the same seed gives the same keys"""
+        pool = self.pool(include_lds, volume_id)
+        if not pool:
+            raise ValueError("No scriptures found in database with current filter")
+
+        rng = random.Random(seed) if seed is not None else random
+        if count == 1:
+            return [pool[rng.randrange(len(pool))]]
+        return [pool[i] for i in rng.sample(range(len(pool)), min(count, len(pool)))]
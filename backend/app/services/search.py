@@ -0,0 +1,96 @@
+import base64
+import binascii
+import json
+import re
+import sqlite3
+from typing import Optional, Tuple
+
+# FTS5 index over verse titles and text. The table is contentless: rowid is the
+# verse_id and row data is always read back from the scriptures view.
+FTS_TABLE = "scriptures_fts"
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    """Check whether the FTS5 search index exists"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (FTS_TABLE,),
+    ).fetchone()
+    return row is not None
+
+
+def build_search_index(conn: sqlite3.Connection) -> bool:
+    """Create and populate the FTS5 search index if it is missing.
+
+    Returns True when the index is ready, False when it cannot be built
+    (SQLite compiled without FTS5 or a read-only database file).
+    """
+    if has_search_index(conn):
+        return True
+
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if not has_search_index(conn):
+            conn.execute(
+                f"""
+                CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                    verse_title,
+                    scripture_text,
+                    content='',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """
+            )
+            conn.execute(
+                f"""
+                INSERT INTO {FTS_TABLE} (rowid, verse_title, scripture_text)
+                SELECT verse_id, verse_title, scripture_text FROM scriptures
+            """
+            )
+            conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        conn.commit()
+    except sqlite3.OperationalError:
+        if conn.in_transaction:
+            conn.rollback()
+        return False
+
+    return True
+
+
+def to_fts_query(query: str) -> Optional[str]:
+    """Convert free text into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term ("love"* matches love, loved,
+    lovely) and terms are ANDed together. Returns None when the query has no
+    searchable words, in which case callers should fall back to LIKE.
+    """
+    tokens = _TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def encode_cursor(verse_id: int, rank: Optional[float] = None) -> str:
+    """Encode the position after a result row as an opaque pagination cursor"""
+    payload: dict = {"v": verse_id}
+    if rank is not None:
+        payload["r"] = rank
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, Optional[float]]:
+    """Decode a pagination cursor into (verse_id, rank)
+
+    Raises ValueError for cursors that were not produced by encode_cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        verse_id = int(payload["v"])
+        rank = payload.get("r")
+        return verse_id, (float(rank) if rank is not None else None)
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor")
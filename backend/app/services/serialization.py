@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, TypeAdapter
+
+from ..models.scripture import (
+    Book,
+    PassageResult,
+    ReferenceResult,
+    Scripture,
+    ScriptureResponse,
+    VerseRangeResponse,
+    Volume,
+)
+from .rows import COMPACT_COLUMNS, VERSE_COLUMNS
+
+
+def json_bytes(content: Any) -> bytes:
+    """Encode JSON exactly as Starlette's JSONResponse does"""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def rows_json(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """Serialize rows straight to a JSON array of objects, with no models"""
+    return json_bytes([dict(zip(columns, row)) for row in rows])
+
+
+def verses_json(rows: Iterable[Tuple[int, int, int, str]]) -> bytes:
+    """Serialize (id, chapter_id, verse_number, scripture_text) rows as Verse JSON"""
+    return rows_json(VERSE_COLUMNS, rows)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])  # type: ignore[valid-type]
+
+
+def model_json(model: BaseModel) -> bytes:
+    """Serialize a model (including unvalidated ones) with pydantic-core"""
+    return model.model_dump_json().encode("utf-8")
+
+
+def models_json(model: type, items: Sequence[Any]) -> bytes:
+    """Serialize a list of models of one type in a single pydantic-core pass"""
+    return _list_adapter(model).dump_json(items)
+
+
+def scriptures_json(records: List[Any], fields: Optional[Sequence[str]]) -> bytes:
+    """Serialize scripture_records() output, full or projected"""
+    if fields is None:
+        return models_json(Scripture, records)
+    return rows_json(fields, records)
+
+
+def scripture_json(record: Any, fields: Optional[Sequence[str]]) -> bytes:
+    """Serialize a single scripture record, full or projected"""
+    if fields is None:
+        return model_json(record)
+    return json_bytes(dict(zip(fields, record)))
+
+
+def scripture_response_json(
+    response: Union[ScriptureResponse, VerseRangeResponse],
+    fields: Optional[Sequence[str]],
+) -> bytes:
+    """Serialize a response model whose "scriptures" list may be projected"""
+    if fields is None:
+        return model_json(response)
+    content = response.model_dump(exclude={"scriptures"})
+    scriptures = [dict(zip(fields, record)) for record in response.scriptures]
+    return json_bytes({"scriptures": scriptures, **content})
+
+
+def compact_json(
+    rows: List[Any],
+    volumes: List[Volume],
+    books: List[Book],
+    extra: Optional[Dict[str, Any]] = None,
+) -> bytes:
+    """Serialize COMPACT_COLUMNS rows with their volume and book lookup tables"""
+    content = {
+        "columns": list(COMPACT_COLUMNS),
+        "rows": rows,
+        "volumes": [volume.model_dump() for volume in volumes],
+        "books": [book.model_dump() for book in books],
+    }
+    if extra:
+        content.update(extra)
+    return json_bytes(content)
+
+
+def scripture_results_json(
+    model: type,
+    results: Union[Sequence[ReferenceResult], Sequence[PassageResult]],
+    fields: Optional[Sequence[str]],
+) -> bytes:
+    """Serialize result models holding a "scriptures" list that may be projected"""
+    if fields is None:
+        return models_json(model, results)
+    content = []
+    for result in results:
+        item = result.model_dump(exclude={"scriptures"})
+        item["scriptures"] = [dict(zip(fields, r)) for r in result.scriptures]
+        content.append(item)
+    return json_bytes(content)
+
+
+def ndjson_lines(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """Serialize rows as newline-delimited JSON objects"""
+    return b"".join(json_bytes(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def csv_lines(rows: Iterable[Sequence[Any]]) -> bytes:
+    """Serialize rows (or a header) as RFC 4180 CSV lines"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Iterator, Sequence, Tuple
+
+from ..utils.compression import ENCODINGS, Payload
+from .database import DatabaseService
+from .serialization import scriptures_json
+
+API_PREFIX = "/api/scriptures"
+# Every URL becomes a directory holding index.json and its compressed variants,
+# so "/volumes" and "/volumes/1/books" can both exist on disk
+STATIC_INDEX = "index.json"
+ENCODING_SUFFIXES = {"br": ".br", "zstd": ".zst", "gzip": ".gz"}
+
+
+def static_pages(service: DatabaseService) -> Iterator[Tuple[str, Payload]]:
+    """Yield (URL path, payload) for every immutable corpus response
+
+    Bodies are byte-for-byte what the live endpoints return: navigation,
+    volumes, books per volume, chapters per book, verses per chapter and the
+    whole-chapter reference response for every chapter of every book.
+    """
+    yield f"{API_PREFIX}/navigation", service.navigation_tree()
+    yield f"{API_PREFIX}/volumes", service.get_volumes_json()
+    for volume in service.get_volumes():
+        yield (
+            f"{API_PREFIX}/volumes/{volume.id}/books",
+            service.get_books_by_volume_json(volume.id),
+        )
+        for book in service.get_books_by_volume(volume.id):
+            if "/" in book.book_title:
+                raise ValueError(f"Book title cannot be a path: {book.book_title}")
+            yield (
+                f"{API_PREFIX}/books/{book.id}/chapters",
+                service.get_chapters_by_book_json(book.id),
+            )
+            for chapter in service.get_chapters_by_book(book.id):
+                yield (
+                    f"{API_PREFIX}/chapters/{chapter.id}/verses",
+                    service.get_verses_by_chapter_json(chapter.id),
+                )
+                scriptures = service.get_scripture_by_reference(
+                    book.book_title, chapter.chapter_number
+                )
+                yield (
+                    f"{API_PREFIX}/reference/{book.book_title}/"
+                    f"{chapter.chapter_number}",
+                    Payload(scriptures_json(scriptures, None)),
+                )
+
+
+def export_static_api(
+    service: DatabaseService,
+    output_dir: Path,
+    encodings: Sequence[str] = ENCODINGS,
+) -> int:
+    """Write every static page and its precompressed variants; returns pages
+
+    Variants are compressed at each encoding's best level, since they are
+    rendered once and served many times.
+    """
+    for encoding in encodings:
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    pages = 0
+    for path, payload in static_pages(service):
+        directory = output_dir / path.lstrip("/")
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / STATIC_INDEX).write_bytes(payload.body)
+        for encoding in encodings:
+            variant = directory / f"{STATIC_INDEX}{ENCODING_SUFFIXES[encoding]}"
+            variant.write_bytes(payload.encoded(encoding))
+        pages += 1
+    return pages
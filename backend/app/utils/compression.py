@@ -0,0 +1,284 @@
+import gzip
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Optional codecs (pip install fast-scriptures-backend[compression])
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Preference order when a client accepts several encodings equally
+SUPPORTED_ENCODINGS = ("br", "zstd", "gzip")
+
+# (per-request level, precompressed level) for each encoding: responses built
+# per request use a fast level, cached payloads are compressed once at the
+# highest level
+COMPRESSION_LEVELS = {"br": (4, 11), "zstd": (3, 19), "gzip": (6, 9)}
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodings whose codec is installed, in preference order"""
+    installed = {"br": brotli is not None, "zstd": zstandard is not None}
+    return tuple(name for name in SUPPORTED_ENCODINGS if installed.get(name, True))
+
+
+ENCODINGS = available_encodings()
+
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    """Compress data with an encoding at its per-request or best level"""
+    level = COMPRESSION_LEVELS[encoding][1 if best else 0]
+    if encoding == "gzip":
+        # mtime=0 keeps output identical for identical input
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    compressed: bytes
+    if encoding == "br" and brotli is not None:
+        compressed = brotli.compress(data, quality=level)
+        return compressed
+    if encoding == "zstd" and zstandard is not None:
+        compressed = zstandard.ZstdCompressor(level=level).compress(data)
+        return compressed
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def stream_compressor(
+    encoding: str,
+) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """Incremental (compress, finish) functions for a streamed body"""
+    level = COMPRESSION_LEVELS[encoding][0]
+    if encoding == "gzip":
+        gzip_stream = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return gzip_stream.compress, gzip_stream.flush
+    if encoding == "br" and brotli is not None:
+        brotli_stream = brotli.Compressor(quality=level)
+        return brotli_stream.process, brotli_stream.finish
+    if encoding == "zstd" and zstandard is not None:
+        zstd_stream = zstandard.ZstdCompressor(level=level).compressobj()
+        return zstd_stream.compress, zstd_stream.flush
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def negotiate(
+    accept_encoding: Optional[str], encodings: Sequence[str] = ENCODINGS
+) -> Optional[str]:
+    """Pick the best encoding allowed by an Accept-Encoding header
+
+    The highest q-value wins, ties go to the order of encodings, and q=0
+    excludes an encoding. Returns None when only identity is acceptable.
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if name:
+            weights[name.strip().lower()] = weight
+
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class Payload:
+    """Pre-rendered response bytes with memoized compressed variants
+
+    Each encoding is compressed once, at its best level, at warm-up or the
+    first time a client asks for it. Best-level brotli and zstd take tens of
+    milliseconds on large bodies, so callers on the event loop should run a
+    missing variant's first encode in a thread.
+    """
+
+    __slots__ = ("body", "variants")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.variants: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        """Get the body compressed with an encoding"""
+        variant = self.variants.get(encoding)
+        if variant is None:
+            # Concurrent first requests may both compress; the result is equal
+            variant = compress(self.body, encoding, best=True)
+            self.variants[encoding] = variant
+        return variant
+
+    def precompress(
+        self, minimum_size: int, encodings: Sequence[str] = ENCODINGS
+    ) -> None:
+        """Compress every encoding now, if the body is large enough to be"""
+        if len(self.body) >= minimum_size:
+            for encoding in encodings:
+                self.encoded(encoding)
+
+    def encoding_for(
+        self, accept_encoding: Optional[str], minimum_size: int
+    ) -> Optional[str]:
+        """The encoding to send a request, or None for the plain body"""
+        if len(self.body) < minimum_size:
+            return None
+        return negotiate(accept_encoding)
+
+    def select(
+        self, accept_encoding: Optional[str], minimum_size: int
+    ) -> Tuple[bytes, Optional[str]]:
+        """Pick the body variant for a request: (content, content encoding)"""
+        encoding = self.encoding_for(accept_encoding, minimum_size)
+        if encoding is None:
+            return self.body, None
+        return self.encoded(encoding), encoding
+
+
+class CompressionMiddleware:
+    """Compress responses the client accepts
+
+    Complete bodies below the size threshold and responses that already
+    carry a Content-Encoding (precompressed payloads) are passed through
+    unchanged. Streamed bodies are compressed chunk by chunk.
+
+    Only responses that can be sent compressed get Vary: Accept-Encoding.
+    A 304 has no body to judge by, so it repeats the Vary of the last full
+    response for its URL; a 304 without Vary leaves the cached one in place.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: Sequence[str] = ENCODINGS,
+        max_remembered: int = 4096,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(encodings)
+        self.max_remembered = max_remembered
+        # URL -> whether its last 200 response varied by Accept-Encoding
+        self._varies: "OrderedDict[str, bool]" = OrderedDict()
+
+    def _remember_vary(self, url: str, message: Message) -> None:
+        """Record a full response's Vary, or repeat it on a 304"""
+        headers = MutableHeaders(raw=message["headers"])
+        if message["status"] == 304:
+            if self._varies.get(url):
+                headers.add_vary_header("Accept-Encoding")
+        elif message["status"] == 200:
+            self._varies[url] = "accept-encoding" in headers.get("vary", "").lower()
+            self._varies.move_to_end(url)
+            if len(self._varies) > self.max_remembered:
+                self._varies.popitem(last=False)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        url = scope["path"] + "?" + scope.get("query_string", b"").decode("latin-1")
+
+        async def forward(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._remember_vary(url, message)
+            await send(message)
+
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding"), self.encodings
+        )
+        start: Optional[Message] = None
+        started = False
+        stream: Optional[Tuple[Callable[[bytes], bytes], Callable[[], bytes]]] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, started, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await forward(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is not None:
+                process, finish = stream
+                chunk = process(body) + (b"" if more_body else finish())
+                await forward(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": more_body,
+                    }
+                )
+                return
+            if started:
+                await forward(message)
+                return
+
+            started = True
+            headers = MutableHeaders(raw=start["headers"])
+            if "content-encoding" in headers or not headers.get(
+                "content-type", ""
+            ).startswith(COMPRESSIBLE_TYPES):
+                await forward(start)
+                await forward(message)
+                return
+
+            if more_body:
+                # Streamed: size unknown, so always compress incrementally
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    await forward(start)
+                    await forward(message)
+                    return
+                stream = stream_compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                del headers["Content-Length"]
+                await forward(start)
+                await forward(
+                    {
+                        "type": "http.response.body",
+                        "body": stream[0](body),
+                        "more_body": True,
+                    }
+                )
+                return
+
+            if len(body) < self.minimum_size:
+                await forward(start)
+                await forward(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                compressed = compress(body, encoding)
+                if len(compressed) < len(body):
+                    body = compressed
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+            await forward(start)
+            await forward({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
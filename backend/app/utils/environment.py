@@ -1,7 +1,12 @@
 import os
 from typing import Optional
 
-from pydantic import BaseSettings, Field
+from pydantic import Field
+
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:  # pydantic v1
+    from pydantic import BaseSettings
 
 
 class Settings(BaseSettings):
@@ -14,6 +19,13 @@ class Settings(BaseSettings):
 
     # Database
     database_url: Optional[str] = Field(default=None, env="DATABASE_URL")
+    db_pool_size: int = Field(default=4, env="DB_POOL_SIZE")
+    db_pool_timeout: float = Field(default=5.0, env="DB_POOL_TIMEOUT")  # seconds
+    db_statement_cache_size: int = Field(default=128, env="DB_STATEMENT_CACHE_SIZE")
+    db_query_timeout: float = Field(default=10.0, env="DB_QUERY_TIMEOUT")  # seconds
+    # "sqlite" queries the database per request; "memory" loads the corpus
+    # into compact in-process arrays at startup
+    corpus_engine: str = Field(default="sqlite", env="CORPUS_ENGINE")
 
     # Security
     cors_origins: list[str] = Field(
@@ -42,9 +54,43 @@ class Settings(BaseSettings):
     api_prefix: str = Field(default="/api", env="API_PREFIX")
     max_search_results: int = Field(default=100, env="MAX_SEARCH_RESULTS")
     default_search_limit: int = Field(default=50, env="DEFAULT_SEARCH_LIMIT")
+    max_batch_references: int = Field(default=200, env="MAX_BATCH_REFERENCES")
 
     # Performance
     cache_ttl: int = Field(default=300, env="CACHE_TTL")  # 5 minutes
+    cache_max_entries: int = Field(default=2048, env="CACHE_MAX_ENTRIES")
+    # Pre-rendered corpus JSON payloads (volumes, books, chapters, chapter
+    # verses) kept in memory with their compressed variants; 0 disables them
+    corpus_payload_cache_size: int = Field(
+        default=2048, env="CORPUS_PAYLOAD_CACHE_SIZE"
+    )
+    # Response compression (gzip, plus brotli/zstd when installed)
+    compression_enabled: bool = Field(default=True, env="COMPRESSION_ENABLED")
+    # Responses smaller than this many bytes are sent uncompressed
+    compression_min_size: int = Field(default=1024, env="COMPRESSION_MIN_SIZE")
+    # Deploy identifier hashed into ETags with the app version, so a deploy
+    # that changes response bodies invalidates cached ones
+    build_id: Optional[str] = Field(default=None, env="BUILD_ID")
+    # Cache-Control max-age for corpus responses (navigation, reference)
+    http_cache_max_age: int = Field(default=86400, env="HTTP_CACHE_MAX_AGE")
+    # Cache-Control max-age for search responses
+    search_cache_max_age: int = Field(default=300, env="SEARCH_CACHE_MAX_AGE")
+    # Slow query log: statements over the threshold are logged with their
+    # EXPLAIN QUERY PLAN (rotating file when set) and listed on
+    # /debug/slow-queries
+    slow_query_log_enabled: bool = Field(default=True, env="SLOW_QUERY_LOG_ENABLED")
+    slow_query_threshold_ms: float = Field(default=100.0, env="SLOW_QUERY_THRESHOLD_MS")
+    slow_query_log_file: Optional[str] = Field(default=None, env="SLOW_QUERY_LOG_FILE")
+    slow_query_log_max_bytes: int = Field(
+        default=1_000_000, env="SLOW_QUERY_LOG_MAX_BYTES"
+    )
+    slow_query_log_backups: int = Field(default=3, env="SLOW_QUERY_LOG_BACKUPS")
+    # Admin-only cProfile/tracemalloc endpoints under /admin; off by default
+    # and only mounted when ADMIN_TOKEN is set ("Authorization: Bearer ...")
+    profiling_enabled: bool = Field(default=False, env="PROFILING_ENABLED")
+    admin_token: Optional[str] = Field(default=None, env="ADMIN_TOKEN")
+    # In-process Prometheus metrics on /metrics
+    metrics_enabled: bool = Field(default=True, env="METRICS_ENABLED")
     rate_limit_requests: int = Field(default=100, env="RATE_LIMIT_REQUESTS")
     rate_limit_window: int = Field(default=60, env="RATE_LIMIT_WINDOW")  # 1 minute
 
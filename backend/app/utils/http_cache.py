@@ -0,0 +1,73 @@
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Union
+
+# Cache-Control for URLs that embed the corpus version, e.g. ?v=<version>
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# The application package, whose code shapes every response body
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+class CacheValidators:
+    """HTTP validators for responses derived from the read-only corpus"""
+
+    __slots__ = ("version", "etag", "last_modified", "last_modified_ts")
+
+    def __init__(self, version: str, last_modified_ts: int):
+        self.version = version
+        # Weak: the same content may be sent with different encodings
+        self.etag = f'W/"{version}"'
+        self.last_modified_ts = last_modified_ts
+        self.last_modified = formatdate(last_modified_ts, usegmt=True)
+
+    def headers(self, max_age: int) -> Dict[str, str]:
+        """Response headers for a cacheable corpus response"""
+        return {
+            "ETag": self.etag,
+            "Last-Modified": self.last_modified,
+            "Cache-Control": f"public, max-age={max_age}",
+        }
+
+    def is_not_modified(self, request_headers: Mapping[str, str]) -> bool:
+        """Evaluate If-None-Match / If-Modified-Since (RFC 9110 precedence)"""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            # Weak comparison: W/"x" matches "x"
+            return "*" in tags or any(
+                tag.removeprefix("W/") == self.etag.removeprefix("W/") for tag in tags
+            )
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified_ts <= since
+        return False
+
+
+def corpus_validators(
+    db_path: Union[str, Path], release: str = "", code_dir: Optional[Path] = APP_DIR
+) -> CacheValidators:
+    """Derive the response version from the database file and the release
+
+    Response formats change with the code as well as with the corpus, so the
+    release (app version and build id) is hashed in with the database
+    contents, and Last-Modified is the newer of the database file and the
+    application code.
+    """
+    path = Path(db_path)
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(release.encode())
+    last_modified = path.stat().st_mtime
+    if code_dir is not None:
+        last_modified = max(
+            [last_modified] + [p.stat().st_mtime for p in code_dir.rglob("*.py")]
+        )
+    return CacheValidators(digest.hexdigest()[:16], int(last_modified))
@@ -0,0 +1,303 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds, from sub-millisecond cache hits to slow searches
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = Tuple[str, ...]
+M = TypeVar("M", bound="Metric")
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """A named metric family with fixed label names
+
+    Samples are keyed by label values passed positionally, in the order of
+    label_names. Updates take a per-metric lock since database methods run on
+    executor threads.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"'
+            for name, value in zip(self.label_names, values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Sample lines in the text exposition format"""
+
+    def render(self) -> str:
+        """HELP and TYPE lines followed by the samples"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A monotonically increasing value per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        """Add amount to the value for a label set"""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, value: float, *labels: str) -> None:
+        """Mirror a counter kept elsewhere (e.g. cache hit totals)"""
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        """Current value for a label set"""
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{self._labels(labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """A value per label set that can go up and down"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, *labels: str) -> None:
+        """Subtract amount from the value for a label set"""
+        self.inc(-amount, *labels)
+
+
+class Histogram(Metric):
+    """Observation counts in cumulative buckets, plus their sum and count"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last)], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for a label set"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        """Observations recorded for a label set"""
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._series.items()
+            )
+        lines = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{self._labels(labels, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{self._labels(labels)} {total!r}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """All metric families exposed on /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        """Add a metric family; names must be unique"""
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+REQUEST_LATENCY = METRICS.register(
+    Histogram(
+        "scriptures_http_request_duration_seconds",
+        "HTTP request latency by route template",
+        ("method", "route", "status"),
+    )
+)
+REQUESTS_IN_FLIGHT = METRICS.register(
+    Gauge("scriptures_http_requests_in_flight", "HTTP requests being served")
+)
+DB_METHOD_LATENCY = METRICS.register(
+    Histogram(
+        "scriptures_db_method_duration_seconds",
+        "Time spent in DatabaseService methods on the database executor",
+        ("method",),
+    )
+)
+DB_METHOD_ERRORS = METRICS.register(
+    Counter(
+        "scriptures_db_method_errors_total",
+        "DatabaseService method calls that raised",
+        ("method",),
+    )
+)
+DB_ROWS = METRICS.register(
+    Counter(
+        "scriptures_db_rows_returned_total",
+        "Rows returned by DatabaseService methods",
+        ("method",),
+    )
+)
+CACHE_HITS = METRICS.register(
+    Counter("scriptures_cache_hits_total", "Cache hits", ("cache",))
+)
+CACHE_MISSES = METRICS.register(
+    Counter("scriptures_cache_misses_total", "Cache misses", ("cache",))
+)
+CACHE_HIT_RATIO = METRICS.register(
+    Gauge("scriptures_cache_hit_ratio", "Cache hits / lookups", ("cache",))
+)
+CACHE_ENTRIES = METRICS.register(
+    Gauge("scriptures_cache_entries", "Entries held by a cache", ("cache",))
+)
+DB_SLOW_QUERIES = METRICS.register(
+    Counter(
+        "scriptures_db_slow_queries_total",
+        "SQL statements slower than the slow query threshold",
+    )
+)
+POOL_CONNECTIONS = METRICS.register(
+    Gauge(
+        "scriptures_db_pool_connections",
+        "Pooled database connections by state",
+        ("state",),
+    )
+)
+POOL_EVENTS = METRICS.register(
+    Counter(
+        "scriptures_db_pool_events_total",
+        "Connection pool checkouts, waits and timeouts",
+        ("event",),
+    )
+)
+
+
+def result_rows(result: object) -> Optional[int]:
+    """Rows in a DatabaseService result: a list, or a tuple led by one"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    return None
+
+
+class MetricsMiddleware:
+    """Record request latency per route template and in-flight requests
+
+    Routes are labelled by their template ("/chapters/{chapter_id}/verses"),
+    never the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started, scope["method"], route, status
+            )
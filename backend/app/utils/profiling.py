@@ -0,0 +1,278 @@
+import cProfile
+import io
+import pstats
+import re
+import threading
+import tracemalloc
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Pattern, TypeVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+T = TypeVar("T")
+
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "calls")
+
+# The profiler collecting the current request, if it is being profiled
+_active_profiler: ContextVar[Optional["RequestProfiler"]] = ContextVar(
+    "active_profiler", default=None
+)
+
+
+def active_profiler() -> Optional["RequestProfiler"]:
+    """The RequestProfiler for the current request, or None"""
+    return _active_profiler.get()
+
+
+class RequestProfiler:
+    """Profile the next N requests whose path matches a pattern with cProfile
+
+    One request is profiled at a time; matching requests that arrive while
+    another is being profiled are served normally. Work the request hands to
+    the database executor is profiled on that thread and merged in. Other
+    requests interleaved on the event loop meanwhile are included too, so
+    results are clearest under light traffic.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pattern: Optional[Pattern[str]] = None
+        self._requested = 0
+        self._pending = 0
+        self._active = False
+        self._paths: List[str] = []
+        self._stats: Optional[pstats.Stats] = None
+
+    @property
+    def armed(self) -> bool:
+        """Whether requests are waiting to be profiled"""
+        return self._pending > 0
+
+    def arm(self, pattern: str, count: int) -> None:
+        """Profile the next count requests whose path matches pattern
+
+        Raises ValueError for an invalid pattern or count. Discards the
+        previous results.
+        """
+        if count < 1:
+            raise ValueError("Request count must be at least 1")
+        try:
+            compiled = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid route pattern: {e}")
+        with self._lock:
+            self._pattern = compiled
+            self._requested = self._pending = count
+            self._paths = []
+            self._stats = None
+
+    def disarm(self) -> None:
+        """Stop profiling further requests and discard the results"""
+        with self._lock:
+            self._pattern = None
+            self._requested = self._pending = 0
+            self._paths = []
+            self._stats = None
+
+    def claim(self, path: str) -> bool:
+        """Reserve a profiling slot for a request path, if it matches"""
+        if not self.armed:
+            return False
+        with self._lock:
+            if (
+                self._pending < 1
+                or self._active
+                or self._pattern is None
+                or not self._pattern.search(path)
+            ):
+                return False
+            self._pending -= 1
+            self._active = True
+            return True
+
+    def add(self, profile: cProfile.Profile) -> None:
+        """Merge a finished profile into the results"""
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+
+    def finish(self, path: str, profile: Optional[cProfile.Profile]) -> None:
+        """Merge a profiled request and free the slot for the next one"""
+        if profile is not None:
+            self.add(profile)
+        with self._lock:
+            self._paths.append(path)
+            self._active = False
+
+    def profile_call(self, call: Callable[[], T]) -> T:
+        """Run call on this thread under its own profile and merge it"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process, and it
+            # already sees this thread
+            return call()
+        try:
+            return call()
+        finally:
+            profile.disable()
+            self.add(profile)
+
+    def report(self, limit: int = 30, sort: str = "cumulative") -> Dict[str, Any]:
+        """Progress and the top functions by the sort key"""
+        if sort not in PROFILE_SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        with self._lock:
+            report: Dict[str, Any] = {
+                "pattern": self._pattern.pattern if self._pattern else None,
+                "requested": self._requested,
+                "profiled": len(self._paths),
+                "pending": self._pending,
+                "paths": list(self._paths),
+                "functions": [],
+            }
+            if self._stats is None:
+                return report
+            rows = []
+            for (filename, line, name), (
+                _,
+                calls,
+                tottime,
+                cumtime,
+                _,
+            ) in self._stats.stats.items():  # type: ignore[attr-defined]
+                rows.append(
+                    {
+                        "function": f"{filename}:{line}({name})",
+                        "calls": calls,
+                        "tottime": tottime,
+                        "cumulative": cumtime,
+                    }
+                )
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        report["functions"] = rows[:limit]
+        return report
+
+    def report_text(self, limit: int = 30, sort: str = "cumulative") -> str:
+        """pstats output for the merged profiles"""
+        if sort not in PROFILE_SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        buffer = io.StringIO()
+        with self._lock:
+            if self._stats is None:
+                return "No requests profiled yet\n"
+            self._stats.stream = buffer  # type: ignore[attr-defined]
+            self._stats.sort_stats(sort).print_stats(limit)
+        return buffer.getvalue()
+
+
+class ProfilingMiddleware:
+    """Profile requests claimed by a RequestProfiler
+
+    Only installed when profiling is enabled; unclaimed requests cost one
+    attribute check.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.claim(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        profile = cProfile.Profile()
+        token = _active_profiler.set(self.profiler)
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active (Python 3.12+): serve unprofiled
+            _active_profiler.reset(token)
+            self.profiler.finish(scope["path"], None)
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.disable()
+            _active_profiler.reset(token)
+            self.profiler.finish(scope["path"], profile)
+
+
+class AllocationTracker:
+    """tracemalloc snapshots diffed against a baseline
+
+    Tracing slows every allocation, so it only runs between start() and
+    stop().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        """Whether tracing is running with a baseline"""
+        return tracemalloc.is_tracing() and self._baseline is not None
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+
+    def start(self, frames: int = 1) -> None:
+        """Start tracing and take the baseline snapshot"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._baseline = self._snapshot()
+
+    def diff(self, limit: int = 20, reset: bool = False) -> Dict[str, Any]:
+        """Allocation growth per source line since the baseline
+
+        Raises RuntimeError when tracing was not started. With reset, the new
+        snapshot becomes the baseline.
+        """
+        with self._lock:
+            if self._baseline is None or not tracemalloc.is_tracing():
+                raise RuntimeError("Allocation tracing is not running")
+            snapshot = self._snapshot()
+            differences = snapshot.compare_to(self._baseline, "lineno")
+            if reset:
+                self._baseline = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "hotspots": [
+                {
+                    "location": f"{diff.traceback[0].filename}:"
+                    f"{diff.traceback[0].lineno}",
+                    "size_diff": diff.size_diff,
+                    "size": diff.size,
+                    "count_diff": diff.count_diff,
+                    "count": diff.count,
+                }
+                for diff in differences[:limit]
+            ],
+        }
+
+    def stop(self) -> None:
+        """Stop tracing and drop the baseline"""
+        with self._lock:
+            self._baseline = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+REQUEST_PROFILER = RequestProfiler()
+ALLOCATION_TRACKER = AllocationTracker()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: CPU cost vs bytes saved for response compression.
+
+Compresses representative payloads (a chapter's verses, a 100-row search
+page) with every available encoding at its per-request and precompressed
+levels, and reports size, ratio and compression time. Precompressed corpus
+payloads pay the "best" cost once; per-request responses pay the "fast"
+cost on every request.
+
+Usage (from backend/):
+    python -m benchmarks.compression [--number 50]
+"""
+
+import argparse
+import sqlite3
+import timeit
+from typing import Dict
+
+from app.services.rows import SCRIPTURE_COLUMNS, VERSE_COLUMNS
+from app.services.serialization import rows_json
+from app.utils.compression import COMPRESSION_LEVELS, ENCODINGS, compress
+from app.utils.config import DATABASE_PATH
+
+
+def load_payloads() -> Dict[str, bytes]:
+    assert DATABASE_PATH is not None
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        # Largest chapter, as served by /chapters/{id}/verses
+        chapter_id = conn.execute(
+            """
+            SELECT chapter_id FROM verses
+            GROUP BY chapter_id ORDER BY COUNT(*) DESC LIMIT 1
+        """
+        ).fetchone()[0]
+        verses = conn.execute(
+            """
+            SELECT id, chapter_id, verse_number, scripture_text FROM verses
+            WHERE chapter_id = ? ORDER BY verse_number
+        """,
+            (chapter_id,),
+        ).fetchall()
+        scriptures = conn.execute(
+            "SELECT * FROM scriptures ORDER BY verse_id LIMIT 100"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return {
+        f"chapter verses ({len(verses)})": rows_json(VERSE_COLUMNS, verses),
+        "search page (100)": rows_json(SCRIPTURE_COLUMNS, scriptures),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=50, help="Iterations")
+    args = parser.parse_args()
+
+    print(f"encodings: {', '.join(ENCODINGS)}; {args.number} iterations")
+    for name, body in load_payloads().items():
+        print(f"\n{name}: {len(body)} bytes")
+        for encoding in ENCODINGS:
+            for best, label in ((False, "fast"), (True, "best")):
+                level = COMPRESSION_LEVELS[encoding][1 if best else 0]
+                size = len(compress(body, encoding, best))
+                seconds = min(
+                    timeit.repeat(
+                        lambda: compress(body, encoding, best),
+                        number=args.number,
+                        repeat=3,
+                    )
+                )
+                per_call = seconds / args.number * 1e6
+                print(
+                    f"  {encoding:<5} {label} (level {level:>2})"
+                    f" {size:8d} bytes  {len(body) / size:5.1f}x smaller"
+                    f"  {per_call:9.1f} µs"
+                )
+
+
+if __name__ == "__main__":
+    main()
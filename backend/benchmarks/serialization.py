@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: scripture rows -> JSON response bytes.
+
+Compares the original path (validated pydantic models per row, then FastAPI's
+response_model validation and serialization) with the unvalidated
+model_construct() + pydantic-core path and with JSON written straight from
+rows.
+
+Usage (from backend/):
+    python -m benchmarks.serialization [--rows 100] [--number 200]
+"""
+
+import argparse
+import sqlite3
+import timeit
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.scripture import Scripture, ScriptureResponse
+from app.services.rows import SCRIPTURE_COLUMNS, build_scripture
+from app.services.serialization import json_bytes, model_json, rows_json
+from app.utils.config import DATABASE_PATH
+
+_response_adapter = TypeAdapter(ScriptureResponse)
+
+
+def validated_path(rows: List[tuple]) -> bytes:
+    """Original path: Scripture(...) per row, then response_model round trip"""
+    scriptures = [Scripture(**dict(zip(SCRIPTURE_COLUMNS, row))) for row in rows]
+    response = ScriptureResponse(
+        scriptures=scriptures, total=len(rows), limit=len(rows), offset=0
+    )
+    # What FastAPI does with a response_model: dump, re-validate, encode
+    validated = _response_adapter.validate_python(response.model_dump())
+    return json_bytes(jsonable_encoder(validated))
+
+
+def constructed_path(rows: List[tuple]) -> bytes:
+    """Unvalidated models serialized by pydantic-core"""
+    response = ScriptureResponse.model_construct(
+        scriptures=[build_scripture(row) for row in rows],
+        total=len(rows),
+        limit=len(rows),
+        offset=0,
+        next_cursor=None,
+        facets=None,
+    )
+    return model_json(response)
+
+
+def rows_path(rows: List[tuple]) -> bytes:
+    """JSON written straight from rows"""
+    scriptures = rows_json(SCRIPTURE_COLUMNS, rows)
+    return b'{"scriptures":%s,"total":%d,"limit":%d,"offset":0}' % (
+        scriptures,
+        len(rows),
+        len(rows),
+    )
+
+
+PATHS: Dict[str, Callable[[List[tuple]], bytes]] = {
+    "validated (original)": validated_path,
+    "model_construct + pydantic-core": constructed_path,
+    "rows -> json": rows_path,
+}
+
+
+def load_rows(count: int) -> List[Any]:
+    assert DATABASE_PATH is not None
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        return conn.execute(
+            "SELECT * FROM scriptures ORDER BY verse_id LIMIT ?", (count,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100, help="Rows per response")
+    parser.add_argument("--number", type=int, default=200, help="Iterations")
+    args = parser.parse_args()
+
+    rows = load_rows(args.rows)
+    print(f"{len(rows)} rows per response, {args.number} iterations")
+    baseline = None
+    for name, path in PATHS.items():
+        seconds = min(timeit.repeat(lambda: path(rows), number=args.number, repeat=3))
+        per_call = seconds / args.number * 1e6
+        baseline = baseline or per_call
+        print(f"  {name:<34} {per_call:10.1f} µs/response  {baseline / per_call:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
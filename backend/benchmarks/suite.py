@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: every DatabaseService method and every API route.
+
+Service cases call the shared DatabaseService directly. Route cases go
+through the ASGI app in-process (TestClient), so they include routing,
+validation, serialization and middleware. Each case is timed warm (caches
+primed); cached cases are also timed cold, with the result cache and corpus
+payloads cleared before every call. Search covers narrow and broad terms,
+both engines, deep offset and deep cursor pagination.
+
+Baselines depend on the machine and the database: record them with --save
+where --check will run (e.g. before and after a change), not on a laptop
+for CI.
+
+Usage (from backend/):
+    python -m benchmarks.suite [--filter search] [--number 30]
+    python -m benchmarks.suite --save [--baseline benchmarks/baselines.json]
+    python -m benchmarks.suite --check [--tolerance 0.25]
+
+--check exits 1 on regressions and 2 when there is no baseline to compare.
+"""
+
+import argparse
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.database import DatabaseService, get_database_service
+from app.utils.environment import get_settings
+
+DEFAULT_BASELINE = Path(__file__).with_name("baselines.json")
+# --check exit codes: 1 for regressions, 2 when there is nothing to compare
+EXIT_REGRESSION = 1
+EXIT_NO_BASELINE = 2
+
+# A term in few verses and one in nearly all of them
+NARROW_TERM = "charity"
+BROAD_TERM = "the"
+PAGE_SIZE = 50
+
+
+class Case:
+    """One benchmarked call; cached calls are also timed cold"""
+
+    __slots__ = ("name", "call", "cached", "route")
+
+    def __init__(
+        self,
+        name: str,
+        call: Callable[[], Any],
+        cached: bool = False,
+        route: Optional[str] = None,
+    ):
+        self.name = name
+        self.call = call
+        self.cached = cached
+        # Route template covered by this case, for the coverage check
+        self.route = route
+
+
+def reset_caches(service: DatabaseService) -> None:
+    """Drop cached results and rendered payloads (lazy indexes are kept)"""
+    service.result_cache.clear()
+    service.corpus_payloads.clear()
+
+
+def measure(
+    call: Callable[[], Any], number: int, reset: Optional[Callable[[], None]] = None
+) -> float:
+    """Median seconds per call; warm runs are primed, cold runs reset first"""
+    if reset is None:
+        call()
+    samples = []
+    for _ in range(number):
+        if reset is not None:
+            reset()
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def load_fixture(service: DatabaseService) -> Dict[str, Any]:
+    """Ids and parameters drawn from the database, so any corpus works"""
+    with service.get_connection() as conn:
+        volume_id, book_id, book_title = conn.execute(
+            "SELECT volume_id, id, book_title FROM books ORDER BY id LIMIT 1"
+        ).fetchone()
+        chapter_id, chapter_number = conn.execute(
+            """
+            SELECT id, chapter_number FROM chapters
+            WHERE book_id = ? ORDER BY chapter_number LIMIT 1
+        """,
+            (book_id,),
+        ).fetchone()
+        (verse_count,) = conn.execute("SELECT COUNT(*) FROM verses").fetchone()
+        (middle_verse_id,) = conn.execute(
+            "SELECT id FROM verses ORDER BY id LIMIT 1 OFFSET ?", (verse_count // 2,)
+        ).fetchone()
+
+    _, broad_total, _ = service.search_scriptures(BROAD_TERM, limit=1)
+    deep_offset = max(0, min(broad_total - PAGE_SIZE, 2000))
+    _, _, deep_cursor = service.search_scriptures(
+        BROAD_TERM, limit=PAGE_SIZE, offset=max(0, deep_offset - PAGE_SIZE)
+    )
+    return {
+        "volume_id": volume_id,
+        "book_id": book_id,
+        "book_title": book_title,
+        "chapter_id": chapter_id,
+        "chapter_number": chapter_number,
+        "middle_verse_id": middle_verse_id,
+        "deep_offset": deep_offset,
+        "deep_cursor": deep_cursor,
+        "references": [(book_title, chapter_number, None), (book_title, 1, 1)] * 10,
+        "passages": f"{book_title} {chapter_number}; {book_title} 1:1-3",
+    }
+
+
+def service_cases(service: DatabaseService, f: Dict[str, Any]) -> List[Case]:
+    """Cases calling every DatabaseService read method"""
+    s = service
+    like: Dict[str, Any] = {"engine": "like"}
+    fts: Dict[str, Any] = {"engine": "fts"}
+    return [
+        Case("service volumes", s.get_volumes),
+        Case("service books", lambda: s.get_books_by_volume(f["volume_id"])),
+        Case("service chapters", lambda: s.get_chapters_by_book(f["book_id"])),
+        Case("service verses", lambda: s.get_verses_by_chapter(f["chapter_id"])),
+        Case("service volumes json", s.get_volumes_json, cached=True),
+        Case(
+            "service books json",
+            lambda: s.get_books_by_volume_json(f["volume_id"]),
+            cached=True,
+        ),
+        Case(
+            "service chapters json",
+            lambda: s.get_chapters_by_book_json(f["book_id"]),
+            cached=True,
+        ),
+        Case(
+            "service verses json",
+            lambda: s.get_verses_by_chapter_json(f["chapter_id"]),
+            cached=True,
+        ),
+        Case("service navigation", s.navigation_tree),
+        Case(
+            "service search like narrow",
+            lambda: s.search_scriptures(NARROW_TERM, PAGE_SIZE, **like),
+            cached=True,
+        ),
+        Case(
+            "service search like broad",
+            lambda: s.search_scriptures(BROAD_TERM, PAGE_SIZE, **like),
+            cached=True,
+        ),
+        Case(
+            "service search fts narrow",
+            lambda: s.search_scriptures(NARROW_TERM, PAGE_SIZE, **fts),
+            cached=True,
+        ),
+        Case(
+            "service search fts broad",
+            lambda: s.search_scriptures(BROAD_TERM, PAGE_SIZE, **fts),
+            cached=True,
+        ),
+        Case(
+            "service search fts relevance",
+            lambda: s.search_scriptures(
+                BROAD_TERM, PAGE_SIZE, engine="fts", order="relevance"
+            ),
+            cached=True,
+        ),
+        Case(
+            "service search deep offset",
+            lambda: s.search_scriptures(BROAD_TERM, PAGE_SIZE, f["deep_offset"]),
+            cached=True,
+        ),
+        Case(
+            "service search deep cursor",
+            lambda: s.search_scriptures(BROAD_TERM, PAGE_SIZE, cursor=f["deep_cursor"]),
+            cached=True,
+        ),
+        Case(
+            "service search fields",
+            lambda: s.search_scriptures(
+                BROAD_TERM, PAGE_SIZE, fields=("verse_id", "scripture_text")
+            ),
+            cached=True,
+        ),
+        Case(
+            "service search facets",
+            lambda: s.search_with_facets(BROAD_TERM, ("volume", "book"), PAGE_SIZE),
+            cached=True,
+        ),
+        Case(
+            "service search counts",
+            lambda: s.get_search_counts_by_volume(BROAD_TERM),
+            cached=True,
+        ),
+        Case(
+            "service reference chapter",
+            lambda: s.get_scripture_by_reference(f["book_title"], f["chapter_number"]),
+            cached=True,
+        ),
+        Case(
+            "service reference verse",
+            lambda: s.get_scripture_by_reference(
+                f["book_title"], f["chapter_number"], 1
+            ),
+            cached=True,
+        ),
+        Case(
+            "service reference batch",
+            lambda: s.get_scriptures_by_references(f["references"]),
+        ),
+        Case("service passages", lambda: s.get_passages(f["passages"]), True),
+        Case(
+            "service verse ranges",
+            lambda: s.get_scriptures_by_verse_ranges(
+                [(f["middle_verse_id"], f["middle_verse_id"] + 20)]
+            ),
+        ),
+        Case(
+            "service verse range",
+            lambda: s.get_verse_range(f["middle_verse_id"], count=100),
+            cached=True,
+        ),
+        Case(
+            "service export book",
+            lambda: sum(len(rows) for rows in s.export_rows(book_id=f["book_id"])),
+        ),
+        Case("service random", s.get_random_scripture),
+        Case("service random 10", lambda: s.get_random_scriptures(10)),
+        Case("service random seeded", lambda: s.get_random_scripture(seed="x")),
+        Case(
+            "service lookup tables",
+            lambda: s.get_lookup_tables([f["volume_id"]], [f["book_id"]]),
+        ),
+    ]
+
+
+def route_cases(client: TestClient, f: Dict[str, Any]) -> List[Case]:
+    """Cases requesting every route through the ASGI app"""
+
+    def get(url: str, **params: Any) -> Callable[[], Any]:
+        def call() -> None:
+            response = client.get(url, params=params, headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+        return call
+
+    def post(url: str, body: Any) -> Callable[[], Any]:
+        def call() -> None:
+            response = client.post(url, json=body)
+            if response.status_code != 200:
+                raise RuntimeError(f"POST {url} returned {response.status_code}")
+
+        return call
+
+    # Admin routes are only mounted with an admin token, which they require
+    admin_token = get_settings().admin_token
+    headers = {"Authorization": f"Bearer {admin_token}"} if admin_token else {}
+    api = "/api/scriptures"
+    references = [
+        {"book_title": title, "chapter": chapter, "verse": verse}
+        for title, chapter, verse in f["references"]
+    ]
+    cases = [
+        Case("route root", get("/"), route="/"),
+        Case("route health", get("/health"), route="/health"),
+        Case("route metrics", get("/metrics"), route="/metrics"),
+        Case("route navigation", get(f"{api}/navigation"), route=f"{api}/navigation"),
+        Case("route volumes", get(f"{api}/volumes"), True, f"{api}/volumes"),
+        Case(
+            "route books",
+            get(f"{api}/volumes/{f['volume_id']}/books"),
+            True,
+            f"{api}/volumes/{{volume_id}}/books",
+        ),
+        Case(
+            "route chapters",
+            get(f"{api}/books/{f['book_id']}/chapters"),
+            True,
+            f"{api}/books/{{book_id}}/chapters",
+        ),
+        Case(
+            "route chapter verses",
+            get(f"{api}/chapters/{f['chapter_id']}/verses"),
+            True,
+            f"{api}/chapters/{{chapter_id}}/verses",
+        ),
+        Case(
+            "route verse range",
+            get(f"{api}/verses", from_verse_id=f["middle_verse_id"], count=100),
+            True,
+            f"{api}/verses",
+        ),
+        Case(
+            "route search narrow",
+            get(f"{api}/search", q=NARROW_TERM, limit=PAGE_SIZE),
+            True,
+            f"{api}/search",
+        ),
+        Case(
+            "route search broad",
+            get(f"{api}/search", q=BROAD_TERM, limit=PAGE_SIZE),
+            True,
+            f"{api}/search",
+        ),
+        Case(
+            "route search fts",
+            get(f"{api}/search", q=BROAD_TERM, limit=PAGE_SIZE, engine="fts"),
+            True,
+            f"{api}/search",
+        ),
+        Case(
+            "route search deep offset",
+            get(
+                f"{api}/search", q=BROAD_TERM, limit=PAGE_SIZE, offset=f["deep_offset"]
+            ),
+            True,
+            f"{api}/search",
+        ),
+        Case(
+            "route search deep cursor",
+            get(
+                f"{api}/search", q=BROAD_TERM, limit=PAGE_SIZE, cursor=f["deep_cursor"]
+            ),
+            True,
+            f"{api}/search",
+        ),
+        Case(
+            "route search compact",
+            get(f"{api}/search", q=BROAD_TERM, limit=PAGE_SIZE, format="compact"),
+            True,
+            f"{api}/search",
+        ),
+        Case(
+            "route search facets",
+            get(f"{api}/search", q=BROAD_TERM, limit=PAGE_SIZE, facets="volume,book"),
+            True,
+            f"{api}/search",
+        ),
+        Case(
+            "route search volumes",
+            get(f"{api}/search/volumes", q=BROAD_TERM),
+            True,
+            f"{api}/search/volumes",
+        ),
+        Case(
+            "route reference",
+            get(f"{api}/reference/{f['book_title']}/{f['chapter_number']}"),
+            True,
+            f"{api}/reference/{{book_title}}/{{chapter}}",
+        ),
+        Case(
+            "route reference batch",
+            post(f"{api}/reference/batch", {"references": references}),
+            True,
+            f"{api}/reference/batch",
+        ),
+        Case(
+            "route passages",
+            get(f"{api}/passages", q=f["passages"]),
+            True,
+            f"{api}/passages",
+        ),
+        Case(
+            "route export book",
+            get(f"{api}/export", book_id=f["book_id"]),
+            route=f"{api}/export",
+        ),
+        Case("route random", get(f"{api}/random"), route=f"{api}/random"),
+        Case("route random 10", get(f"{api}/random", count=10), route=f"{api}/random"),
+    ]
+    if admin_token:
+        cases.append(
+            Case(
+                "route slow queries",
+                get("/debug/slow-queries"),
+                route="/debug/slow-queries",
+            )
+        )
+    return cases
+
+
+def uncovered_routes(cases: Sequence[Case]) -> Set[str]:
+    """App routes (outside the docs) that no case requests"""
+    covered = {case.route for case in cases}
+    routes = {route.path for route in app.routes if isinstance(route, APIRoute)}
+    return routes - covered
+
+
+def run(
+    service: DatabaseService,
+    cases: Sequence[Case],
+    number: int,
+    pattern: Optional[str] = None,
+) -> Dict[str, float]:
+    """Time every case (warm, plus cold when cached): microseconds per call"""
+    results: Dict[str, float] = {}
+    for case in cases:
+        if pattern and not re.search(pattern, case.name):
+            continue
+        results[f"{case.name} [warm]"] = measure(case.call, number) * 1e6
+        if case.cached:
+            results[f"{case.name} [cold]"] = (
+                measure(case.call, number, lambda: reset_caches(service)) * 1e6
+            )
+    return results
+
+
+def compare(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float,
+    min_delta_us: float,
+) -> List[Tuple[str, float, Optional[float], bool]]:
+    """(name, now, baseline, regressed) per case
+
+    A case regresses when it is more than tolerance slower than its baseline
+    and by more than min_delta_us, which keeps timer noise on microsecond
+    cases from failing the check.
+    """
+    rows = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        regressed = (
+            before is not None
+            and now > before * (1 + tolerance)
+            and now - before > min_delta_us
+        )
+        rows.append((name, now, before, regressed))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=30, help="Calls per case")
+    parser.add_argument("--filter", help="Only run cases matching this regex")
+    parser.add_argument(
+        "--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="Write results as baseline")
+    mode.add_argument(
+        "--check", action="store_true", help="Fail on regressions against baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown as a fraction (default: 0.25)",
+    )
+    parser.add_argument(
+        "--min-delta-us",
+        type=float,
+        default=50.0,
+        help="Ignore slowdowns smaller than this many µs (default: 50)",
+    )
+    args = parser.parse_args()
+    if args.check and not args.baseline.exists():
+        print(
+            f"No baseline at {args.baseline}; run `make bench-baseline` first",
+            file=sys.stderr,
+        )
+        sys.exit(EXIT_NO_BASELINE)
+
+    with TestClient(app) as client:
+        service = get_database_service()
+        fixture = load_fixture(service)
+        cases = service_cases(service, fixture) + route_cases(client, fixture)
+        for path in sorted(uncovered_routes(cases)):
+            print(f"warning: no benchmark case for route {path}")
+        results = run(service, cases, args.number, args.filter)
+        database_version = service.cache_validators().version
+
+    baseline: Dict[str, float] = {}
+    if args.baseline.exists() and not args.save:
+        stored = json.loads(args.baseline.read_text())
+        baseline = stored["results"]
+        if stored.get("database_version") != database_version:
+            print("warning: baseline was recorded against a different database")
+
+    rows = compare(results, baseline, args.tolerance, args.min_delta_us)
+    print(f"{len(results)} cases, median of {args.number} calls each")
+    print(f"{'case':<42} {'µs/call':>11} {'baseline':>11} {'change':>8}")
+    for name, now, before, regressed in rows:
+        if before is None:
+            print(f"{name:<42} {now:11.1f}")
+            continue
+        change = (now - before) / before * 100 if before else 0.0
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<42} {now:11.1f} {before:11.1f} {change:+7.1f}%{flag}")
+
+    if args.save:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "database_version": database_version,
+                    "number": args.number,
+                    "results": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"Baseline saved to {args.baseline}")
+    elif args.check:
+        regressions = [row[0] for row in rows if row[3]]
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.tolerance:.0%}")
+            sys.exit(EXIT_REGRESSION)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
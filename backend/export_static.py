@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Static API export for CDN offload.
+
+Pre-renders every immutable API response (navigation, volumes, books,
+chapters, verses and whole-chapter references) into a directory tree that
+mirrors the live URL layout. Each URL is a directory holding index.json plus
+precompressed index.json.br / .zst / .gz variants, so a CDN can serve all
+reading traffic and leave the API for search and random.
+
+Usage (from backend/):
+    python export_static.py [output_dir] [--encodings gzip,br]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from app.services.database import DatabaseService
+from app.services.static_export import STATIC_INDEX, export_static_api
+from app.utils.compression import ENCODINGS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "output_dir", nargs="?", default="static", help="Output directory"
+    )
+    parser.add_argument(
+        "--encodings",
+        default=",".join(ENCODINGS),
+        help=f"Comma-separated encodings to precompress (available: "
+        f"{', '.join(ENCODINGS)}; empty for none)",
+    )
+    args = parser.parse_args()
+    encodings = [name.strip() for name in args.encodings.split(",") if name.strip()]
+
+    output_dir = Path(args.output_dir)
+    started = time.perf_counter()
+    try:
+        pages = export_static_api(DatabaseService(), output_dir, encodings)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ Wrote {pages} pages ({STATIC_INDEX}"
+        f"{' + ' + ', '.join(encodings) if encodings else ''}) "
+        f"to {output_dir} in {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
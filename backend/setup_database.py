@@ -5,9 +5,12 @@ This script ensures the SQLite database file is available in the correct locatio
 """
 
 import shutil
+import sqlite3
 import sys
 from pathlib import Path
 
+from app.services.search import build_search_index
+
 
 def find_database():
     """Find the database file in various possible locations."""
@@ -90,6 +93,17 @@ def setup_database():
         print("❌ Database setup failed!")
         sys.exit(1)
 
+    # Build the FTS5 search index here; the app only opens the database
+    # read-only and falls back to LIKE search without it
+    conn = sqlite3.connect(db_dest)
+    try:
+        if build_search_index(conn):
+            print("✅ Search index ready")
+        else:
+            print("⚠️  Search index unavailable (FTS5 missing?), using LIKE search")
+    finally:
+        conn.close()
+
 
 if __name__ == "__main__":
     setup_database()
@@ -0,0 +1,15 @@
+import pytest
+
+from app.services.database import DatabaseService
+from app.utils.environment import settings
+
+
+@pytest.fixture
+def services(monkeypatch):
+    """SQLite and in-memory corpus services, closed after the test"""
+    sqlite_service = DatabaseService()
+    monkeypatch.setattr(settings, "corpus_engine", "memory")
+    memory_service = DatabaseService()
+    yield sqlite_service, memory_service
+    sqlite_service.close()
+    memory_service.close()
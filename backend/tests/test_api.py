@@ -1,7 +1,46 @@
+import sys
+
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.models.scripture import Scripture, ScriptureResponse
+from app.routes import admin, scriptures
+from app.services import database
+from app.services.cache import TTLCache
+from app.services.database import (
+    DatabaseService,
+    QueryTimeoutError,
+    get_database_service,
+)
+from app.services.pool import ConnectionPool, PoolTimeoutError
+from app.services.query_log import SlowQueryLog, query_shape
+from app.services.rows import (
+    SCRIPTURE_COLUMNS,
+    SCRIPTURE_FIELD_PRESETS,
+    build_scripture,
+)
+from app.services.serialization import models_json, rows_json
+from app.services.static_export import STATIC_INDEX, export_static_api
+from app.utils.compression import ENCODINGS, Payload, negotiate
+from app.utils.environment import get_settings, settings
+from app.utils.http_cache import corpus_validators
+from app.utils.metrics import DB_METHOD_LATENCY, DB_ROWS, REQUEST_LATENCY, Histogram
+from app.utils.profiling import (
+    ALLOCATION_TRACKER,
+    REQUEST_PROFILER,
+    ProfilingMiddleware,
+)
+from benchmarks import suite
+from benchmarks.suite import (
+    compare,
+    load_fixture,
+    route_cases,
+    run,
+    service_cases,
+    uncovered_routes,
+)
 
 
 @pytest.fixture
@@ -114,6 +153,207 @@ class TestScriptureEndpoints:
         assert "book_id" in data
 
 
+class TestSearchEngine:
+    """Test FTS5 search engine and relevance ordering"""
+
+    def test_fts_search(self, client):
+        """Test fts engine returns matching verses"""
+        response = client.get("/api/scriptures/search?q=love&engine=fts&limit=10")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] > 0
+        for scripture in data["scriptures"]:
+            assert "love" in scripture["scripture_text"].lower()
+
+    def test_fts_search_canonical_order(self, client):
+        """Test fts results default to canonical verse order"""
+        response = client.get("/api/scriptures/search?q=lord&engine=fts&limit=20")
+        assert response.status_code == 200
+        verse_ids = [s["verse_id"] for s in response.json()["scriptures"]]
+        assert verse_ids == sorted(verse_ids)
+
+    def test_fts_search_relevance_order(self, client):
+        """Test relevance ordering returns the same match set"""
+        canonical = client.get("/api/scriptures/search?q=faith&engine=fts").json()
+        ranked = client.get(
+            "/api/scriptures/search?q=faith&engine=fts&order=relevance"
+        ).json()
+        assert ranked["total"] == canonical["total"]
+
+    def test_fts_volume_filter(self, client):
+        """Test fts search honours the volume filter"""
+        response = client.get("/api/scriptures/search?q=lord&engine=fts&volume_id=1")
+        assert response.status_code == 200
+        for scripture in response.json()["scriptures"]:
+            assert scripture["volume_id"] == 1
+
+    def test_fts_volume_counts(self, client):
+        """Test fts volume counts add up to the search total"""
+        total = client.get("/api/scriptures/search?q=lord&engine=fts").json()["total"]
+        response = client.get("/api/scriptures/search/volumes?q=lord&engine=fts")
+        assert response.status_code == 200
+        assert sum(item["count"] for item in response.json()) == total
+
+    def test_runtime_never_writes_database(self):
+        """Test warm-up and fts searches leave the database file untouched"""
+        import hashlib
+
+        service = DatabaseService()
+        before = hashlib.sha256(service.db_path.read_bytes()).hexdigest()
+        service.warm_up()
+        service.search_scriptures("lord", engine="fts")
+        service.close()
+        assert hashlib.sha256(service.db_path.read_bytes()).hexdigest() == before
+
+    def test_missing_index_falls_back_to_like(self, monkeypatch, caplog):
+        """Test fts searches use LIKE, with a warning, when there is no index"""
+        checks = []
+
+        def has_search_index(conn):
+            checks.append(conn)
+            return False
+
+        monkeypatch.setattr(database, "has_search_index", has_search_index)
+        service = database.DatabaseService()
+        service.search_scriptures("lord", engine="like")
+        assert checks == []
+        with caplog.at_level("WARNING", logger="fast_scriptures.database"):
+            fts = service.search_scriptures("lord", engine="fts")
+            service.search_scriptures("faith", engine="fts")
+        assert fts == service.search_scriptures("lord", engine="like")
+        assert len(checks) == 1
+        assert "No FTS5 search index" in caplog.text
+        service.close()
+
+    def test_relevance_requires_fts(self, client):
+        """Test relevance ordering is rejected for the like engine"""
+        response = client.get("/api/scriptures/search?q=love&order=relevance")
+        assert response.status_code == 400
+
+    def test_invalid_engine(self, client):
+        """Test unknown search engine is rejected"""
+        response = client.get("/api/scriptures/search?q=love&engine=bogus")
+        assert response.status_code == 422
+
+
+class TestSearchPagination:
+    """Test keyset (cursor) pagination of search results"""
+
+    def _walk(self, client, url):
+        verse_ids = []
+        response = client.get(url).json()
+        while True:
+            verse_ids += [s["verse_id"] for s in response["scriptures"]]
+            if response["next_cursor"] is None:
+                return verse_ids, response["total"]
+            response = client.get(f"{url}&cursor={response['next_cursor']}").json()
+
+    def test_cursor_matches_offset_pages(self, client):
+        """Test cursor page equals the equivalent offset page"""
+        first = client.get("/api/scriptures/search?q=lord&limit=5").json()
+        assert first["next_cursor"] is not None
+        by_cursor = client.get(
+            f"/api/scriptures/search?q=lord&limit=5&cursor={first['next_cursor']}"
+        ).json()
+        by_offset = client.get("/api/scriptures/search?q=lord&limit=5&offset=5").json()
+        assert by_cursor["scriptures"] == by_offset["scriptures"]
+
+    def test_cursor_walks_all_results(self, client):
+        """Test following cursors visits every match exactly once"""
+        for engine in ("like", "fts"):
+            verse_ids, total = self._walk(
+                client, f"/api/scriptures/search?q=faith&limit=100&engine={engine}"
+            )
+            assert len(verse_ids) == total
+            assert len(set(verse_ids)) == total
+
+    def test_cursor_relevance_order(self, client):
+        """Test cursors page through relevance-ranked results"""
+        verse_ids, total = self._walk(
+            client,
+            "/api/scriptures/search?q=faith&limit=50&engine=fts&order=relevance",
+        )
+        assert len(set(verse_ids)) == total
+
+    def test_last_page_has_no_cursor(self, client):
+        """Test the final page returns no next cursor"""
+        total = client.get("/api/scriptures/search?q=love").json()["total"]
+        response = client.get(f"/api/scriptures/search?q=love&offset={total - 1}")
+        assert response.json()["next_cursor"] is None
+
+    def test_invalid_cursor(self, client):
+        """Test malformed cursors are rejected"""
+        response = client.get("/api/scriptures/search?q=love&cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    def test_cursor_page_plan(self):
+        """Test cursor pages seek without a sort and reuse the total"""
+        service = DatabaseService()
+        query_log = service.query_log
+        assert query_log is not None
+        query_log.threshold = 0.0
+        first, total, cursor = service.search_scriptures("lord", limit=5)
+        page, page_total, _ = service.search_scriptures("lord", limit=5, cursor=cursor)
+        assert page_total == total
+        assert page[0].verse_id > first[-1].verse_id
+
+        entries = query_log.entries()
+        assert sum("COUNT(*)" in entry["sql"] for entry in entries) == 1
+        seek = next(entry for entry in entries if "verse_id > ?" in entry["sql"])
+        assert not any("TEMP B-TREE" in line for line in seek["plan"])
+        service.close()
+
+    def test_cursor_with_offset(self, client):
+        """Test cursor and offset cannot be combined"""
+        first = client.get("/api/scriptures/search?q=lord&limit=5").json()
+        response = client.get(
+            f"/api/scriptures/search?q=lord&offset=5&cursor={first['next_cursor']}"
+        )
+        assert response.status_code == 400
+
+
+class TestFacetedSearch:
+    """Test single-pass faceted search"""
+
+    def test_facets_match_separate_queries(self, client):
+        """Test faceted results agree with /search and /search/volumes"""
+        plain = client.get("/api/scriptures/search?q=lord&limit=10").json()
+        volumes = client.get("/api/scriptures/search/volumes?q=lord").json()
+        response = client.get("/api/scriptures/search?q=lord&limit=10&facets=volume")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == plain["total"]
+        assert data["scriptures"] == plain["scriptures"]
+        assert data["next_cursor"] == plain["next_cursor"]
+        assert [(f["title"], f["count"]) for f in data["facets"]["volume"]] == [
+            (v["volume"], v["count"]) for v in volumes
+        ]
+        assert data["facets"]["book"] is None
+
+    def test_book_facets_respect_volume_filter(self, client):
+        """Test book counts are limited to the filtered volume"""
+        data = client.get(
+            "/api/scriptures/search?q=lord&volume_id=1&facets=volume,book"
+        ).json()
+        assert sum(f["count"] for f in data["facets"]["book"]) == data["total"]
+        assert sum(f["count"] for f in data["facets"]["volume"]) >= data["total"]
+
+    def test_facets_with_fts_relevance_cursor(self, client):
+        """Test faceted fts pages follow relevance cursors"""
+        url = "/api/scriptures/search?q=faith&engine=fts&order=relevance&facets=book"
+        first = client.get(f"{url}&limit=5").json()
+        plain = client.get(
+            "/api/scriptures/search?q=faith&engine=fts&order=relevance&limit=10"
+        ).json()
+        second = client.get(f"{url}&limit=5&cursor={first['next_cursor']}").json()
+        assert first["scriptures"] + second["scriptures"] == plain["scriptures"]
+
+    def test_unknown_facet(self, client):
+        """Test unknown facet names are rejected"""
+        response = client.get("/api/scriptures/search?q=love&facets=chapter")
+        assert response.status_code == 400
+
+
 class TestErrorHandling:
     """Test error handling"""
 
@@ -174,3 +414,1326 @@ class TestPerformance:
 
         assert response.status_code == 200
         assert (end_time - start_time) < 2.0  # Should respond within 2 seconds
+
+
+class TestConnectionPool:
+    """Test the read-only connection pool"""
+
+    def test_health_reports_pool_stats(self, client):
+        """Test health endpoint exposes pool counters"""
+        data = client.get("/health").json()
+        pool = data["database_pool"]
+        assert pool["open"] <= pool["max_size"]
+        assert pool["in_use"] == 0
+
+    def test_connections_are_reused(self, client):
+        """Test repeated requests reuse pooled connections"""
+        client.get("/api/scriptures/volumes")
+        before = client.get("/health").json()["database_pool"]
+        for _ in range(5):
+            client.get("/api/scriptures/volumes")
+        after = client.get("/health").json()["database_pool"]
+        assert after["open"] == before["open"]
+        assert after["checkouts"] > before["checkouts"]
+
+    def test_connections_are_read_only(self):
+        """Test pooled connections reject writes"""
+        import sqlite3
+
+        with get_database_service().get_connection() as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM volumes")
+
+    def test_pool_timeout(self):
+        """Test checkout fails once the bounded pool is exhausted"""
+        pool = ConnectionPool(get_database_service().db_path, max_size=1, timeout=0.01)
+        with pool.connection():
+            with pytest.raises(PoolTimeoutError):
+                pool.acquire()
+        assert pool.stats()["timeouts"] == 1
+        pool.close()
+
+
+class TestAsyncExecution:
+    """Test off-loop database execution with timeouts and cancellation"""
+
+    @staticmethod
+    def _endless_query(service):
+        with service.get_connection() as conn:
+            return conn.execute(
+                "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+                "SELECT COUNT(*) FROM c"
+            ).fetchone()
+
+    def test_run_returns_result(self):
+        """Test run() returns the wrapped method's result"""
+        import asyncio
+
+        service = get_database_service()
+        volumes = asyncio.run(service.run(service.get_volumes))
+        assert volumes == service.get_volumes()
+
+    def test_run_timeout_interrupts_query(self):
+        """Test timed-out queries are interrupted and release their connection"""
+        import asyncio
+        import time
+
+        service = get_database_service()
+        with pytest.raises(QueryTimeoutError):
+            asyncio.run(service.run(self._endless_query, service, timeout=0.05))
+
+        deadline = time.time() + 2.0
+        while service.pool_stats()["in_use"] and time.time() < deadline:
+            time.sleep(0.01)
+        assert service.pool_stats()["in_use"] == 0
+
+    def test_connection_outside_run_is_not_cancellable(self):
+        """Test direct (synchronous) calls are unaffected by cancellation"""
+        service = get_database_service()
+        with service.get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM volumes").fetchone()[0] > 0
+
+
+class TestMemoryCorpus:
+    """Test the in-memory corpus engine against SQLite"""
+
+    def test_navigation_matches_sqlite(self, services):
+        """Test volumes, books, chapters and verses match the SQLite engine"""
+        sqlite_service, memory_service = services
+        assert memory_service.get_volumes() == sqlite_service.get_volumes()
+        for volume in sqlite_service.get_volumes():
+            books = sqlite_service.get_books_by_volume(volume.id)
+            assert memory_service.get_books_by_volume(volume.id) == books
+            book = books[0]
+            chapters = sqlite_service.get_chapters_by_book(book.id)
+            assert memory_service.get_chapters_by_book(book.id) == chapters
+            chapter = chapters[-1]
+            assert memory_service.get_verses_by_chapter(
+                chapter.id
+            ) == sqlite_service.get_verses_by_chapter(chapter.id)
+        assert memory_service.get_verses_by_chapter(99999) == []
+
+    def test_reference_matches_sqlite(self, services):
+        """Test reference lookups match the SQLite engine"""
+        sqlite_service, memory_service = services
+        book = sqlite_service.get_books_by_volume(2)[0].book_title
+        for verse in (None, 1, 3, 999):
+            assert memory_service.get_scripture_by_reference(
+                book, 1, verse
+            ) == sqlite_service.get_scripture_by_reference(book, 1, verse)
+        assert memory_service.get_scripture_by_reference("Nonexistent", 1) == []
+
+    def test_random_respects_lds_filter(self, services):
+        """Test random selection honours include_lds"""
+        _, memory_service = services
+        for _ in range(20):
+            scripture = memory_service.get_random_scripture(include_lds=False)
+            assert scripture.volume_id in (1, 2)
+
+    def test_memory_report(self, services):
+        """Test the memory footprint report covers every structure"""
+        sqlite_service, memory_service = services
+        report = memory_service.corpus_stats()
+        assert sqlite_service.corpus_stats() is None
+        assert report["verses"] > 0
+        assert (
+            report["total_bytes"]
+            == sum(value for key, value in report.items() if key.endswith("_bytes"))
+            - report["total_bytes"]
+        )
+
+
+class TestRandomSelection:
+    """Test batch, seeded and per-volume random selection"""
+
+    def test_seed_is_deterministic(self, client):
+        """Test the same seed returns the same verse"""
+        url = "/api/scriptures/random?include_lds=true&seed=2025-01-05"
+        first = client.get(url).json()
+        second = client.get(url).json()
+        assert first["verse_id"] == second["verse_id"]
+
+    def test_count_returns_distinct_verses(self, client):
+        """Test count=N samples without replacement"""
+        response = client.get("/api/scriptures/random?count=25&include_lds=true")
+        assert response.status_code == 200
+        verse_ids = [s["verse_id"] for s in response.json()]
+        assert len(verse_ids) == 25
+        assert len(set(verse_ids)) == 25
+
+    def test_seeded_batch_is_deterministic(self, client):
+        """Test seeded batches repeat exactly"""
+        url = "/api/scriptures/random?count=5&seed=lesson-12"
+        assert client.get(url).json() == client.get(url).json()
+
+    def test_volume_filter(self, client):
+        """Test volume_id restricts the pool"""
+        response = client.get("/api/scriptures/random?count=10&volume_id=3")
+        assert response.status_code == 200
+        assert {s["volume_id"] for s in response.json()} == {3}
+
+    def test_unknown_volume(self, client):
+        """Test an empty pool returns 404"""
+        response = client.get("/api/scriptures/random?volume_id=99999")
+        assert response.status_code == 404
+
+    def test_memory_engine_matches_sqlite_seed(self, services):
+        """Test seeded picks agree between the SQLite and memory engines"""
+        sqlite_service, memory_service = services
+        assert memory_service.get_random_scriptures(
+            5, include_lds=True, seed="x"
+        ) == sqlite_service.get_random_scriptures(5, include_lds=True, seed="x")
+
+
+class TestHttpCaching:
+    """Test ETag / Last-Modified validators and conditional requests"""
+
+    def test_validators_on_read_endpoints(self, client):
+        """Test corpus and search responses carry cache validators"""
+        for url in (
+            "/api/scriptures/volumes",
+            "/api/scriptures/books/1/chapters",
+            "/api/scriptures/search?q=love",
+        ):
+            response = client.get(url)
+            assert response.headers["etag"].startswith('W/"')
+            assert "last-modified" in response.headers
+            assert "max-age=" in response.headers["cache-control"]
+
+    def test_if_none_match_returns_304(self, client):
+        """Test a matching ETag short-circuits with 304"""
+        etag = client.get("/api/scriptures/volumes").headers["etag"]
+        response = client.get(
+            "/api/scriptures/volumes/1/books", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_if_modified_since_returns_304(self, client):
+        """Test an up-to-date If-Modified-Since short-circuits with 304"""
+        last_modified = client.get("/api/scriptures/volumes").headers["last-modified"]
+        response = client.get(
+            "/api/scriptures/volumes", headers={"If-Modified-Since": last_modified}
+        )
+        assert response.status_code == 304
+
+    def test_stale_etag_returns_200(self, client):
+        """Test a different ETag gets the full response"""
+        response = client.get(
+            "/api/scriptures/volumes", headers={"If-None-Match": '"stale"'}
+        )
+        assert response.status_code == 200
+        assert len(response.json()) > 0
+
+    def test_etag_changes_with_release(self):
+        """Test a new app version or build id yields new validators"""
+        db_path = get_database_service().db_path
+        old = corpus_validators(db_path, "1.0.0+")
+        assert corpus_validators(db_path, "1.0.0+").etag == old.etag
+        assert corpus_validators(db_path, "1.1.0+").etag != old.etag
+        assert corpus_validators(db_path, "1.0.0+abc123").etag != old.etag
+
+    def test_build_id_setting_changes_etag(self, monkeypatch):
+        """Test BUILD_ID feeds the ETag served by the app"""
+        service = DatabaseService()
+        before = service.cache_validators().etag
+        monkeypatch.setattr(settings, "build_id", "deploy-2")
+        rebuilt = DatabaseService()
+        assert rebuilt.cache_validators().etag != before
+        service.close()
+        rebuilt.close()
+
+    def test_vary_only_when_encoding_matters(self, client):
+        """Test small bodies and their 304s carry no Vary: Accept-Encoding"""
+        url = "/api/scriptures/reference/John/3?verse=16&fields=verse_id"
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert "accept-encoding" not in response.headers.get("vary", "").lower()
+        cached = client.get(url, headers={"If-None-Match": response.headers["etag"]})
+        assert cached.status_code == 304
+        assert "accept-encoding" not in cached.headers.get("vary", "").lower()
+
+    def test_random_is_not_cacheable(self, client):
+        """Test random verses carry no validators"""
+        response = client.get("/api/scriptures/random")
+        assert "etag" not in response.headers
+
+
+class TestResultCache:
+    """Test the TTL/LRU result cache"""
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first"""
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL"""
+        now = [0.0]
+        cache = TTLCache(max_entries=10, ttl=5, clock=lambda: now[0])
+        cache.set("a", 1)
+        now[0] = 4.9
+        assert cache.get("a") == (True, 1)
+        now[0] = 5.0
+        assert cache.get("a") == (False, None)
+        assert cache.stats()["expirations"] == 1
+
+    def test_disabled_cache(self):
+        """Test max_entries=0 never stores values"""
+        cache = TTLCache(max_entries=0, ttl=60)
+        assert cache.get_or_compute("a", lambda: 1) == 1
+        assert cache.stats()["size"] == 0
+
+    def test_repeat_search_skips_database(self):
+        """Test repeated and case-variant searches are served from the cache"""
+        service = DatabaseService()
+        first = service.search_scriptures("Faith", limit=5)
+        checkouts = service.pool_stats()["checkouts"]
+        assert service.search_scriptures("faith", limit=5) == first
+        assert service.pool_stats()["checkouts"] == checkouts
+        assert service.result_cache_stats()["hits"] == 1
+        service.close()
+
+    def test_reference_cache_normalizes_verse(self):
+        """Test verse=0 and verse=None share a cache entry"""
+        service = DatabaseService()
+        book = service.get_books_by_volume(1)[0].book_title
+        whole = service.get_scripture_by_reference(book, 1)
+        assert service.get_scripture_by_reference(book, 1, 0) == whole
+        assert service.result_cache_stats()["hits"] == 1
+        service.close()
+
+
+class TestChapterPayloadCache:
+    """Test pre-serialized chapter payloads"""
+
+    def test_payload_matches_model_path(self):
+        """Test raw chapter JSON equals the validated Verse response"""
+        import json
+
+        service = DatabaseService()
+        payload = service.get_verses_by_chapter_json(1)
+        expected = [verse.model_dump() for verse in service.get_verses_by_chapter(1)]
+        assert json.loads(payload.body) == expected
+        service.close()
+
+    def test_payload_rendered_once(self):
+        """Test repeated chapter reads reuse the rendered bytes"""
+        service = DatabaseService()
+        first = service.get_verses_by_chapter_json(2)
+        checkouts = service.pool_stats()["checkouts"]
+        assert service.get_verses_by_chapter_json(2) is first
+        assert service.pool_stats()["checkouts"] == checkouts
+        service.close()
+
+    def test_endpoint_keeps_cache_headers(self, client):
+        """Test the raw response still carries validators and JSON type"""
+        response = client.get("/api/scriptures/chapters/1/verses")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["etag"].startswith('W/"')
+        assert response.json()[0]["chapter_id"] == 1
+
+
+class TestRowMapping:
+    """Test unvalidated row mapping and direct JSON serialization"""
+
+    def test_builders_match_validated_models(self):
+        """Test model_construct rows equal validated models"""
+        with get_database_service().get_connection() as conn:
+            row = conn.execute("SELECT * FROM scriptures LIMIT 1").fetchone()
+        expected = Scripture(**dict(zip(SCRIPTURE_COLUMNS, row)))
+        assert build_scripture(row).model_dump() == expected.model_dump()
+
+    def test_rows_json_matches_model_json(self):
+        """Test JSON written from rows equals pydantic serialization"""
+        import json
+
+        with get_database_service().get_connection() as conn:
+            rows = conn.execute("SELECT * FROM scriptures LIMIT 20").fetchall()
+        assert json.loads(rows_json(SCRIPTURE_COLUMNS, rows)) == json.loads(
+            models_json(Scripture, [build_scripture(row) for row in rows])
+        )
+
+    def test_search_response_schema(self, client):
+        """Test the raw search response still validates as ScriptureResponse"""
+        response = client.get("/api/scriptures/search?q=love&limit=5&facets=volume")
+        assert response.headers["content-type"] == "application/json"
+        parsed = ScriptureResponse.model_validate(response.json())
+        assert len(parsed.scriptures) <= 5
+        assert parsed.facets is not None
+
+
+class TestFieldProjection:
+    """Test fields= projection on Scripture endpoints"""
+
+    def test_search_fields(self, client):
+        """Test search returns only the selected fields"""
+        response = client.get(
+            "/api/scriptures/search?q=love&limit=5&fields=verse_id,scripture_text"
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] > 0
+        for scripture in data["scriptures"]:
+            assert list(scripture) == ["verse_id", "scripture_text"]
+
+    def test_projection_matches_full_rows(self, client):
+        """Test projected values equal the full response values"""
+        compact = SCRIPTURE_FIELD_PRESETS["compact"]
+        full = client.get("/api/scriptures/search?q=love&limit=10&engine=fts").json()
+        projected = client.get(
+            "/api/scriptures/search?q=love&limit=10&engine=fts&fields=compact"
+        ).json()
+        assert projected["total"] == full["total"]
+        assert projected["next_cursor"] == full["next_cursor"]
+        assert projected["scriptures"] == [
+            {field: s[field] for field in compact} for s in full["scriptures"]
+        ]
+
+    def test_projected_cursor_pagination(self, client):
+        """Test cursors from projected pages walk the same results"""
+        url = "/api/scriptures/search?q=love&limit=5&order=relevance&engine=fts"
+        page = client.get(f"{url}&fields=verse_id").json()
+        full = client.get(url).json()
+        assert page["next_cursor"] == full["next_cursor"]
+        next_page = client.get(
+            f"{url}&fields=verse_id&cursor={page['next_cursor']}"
+        ).json()
+        next_full = client.get(f"{url}&cursor={full['next_cursor']}").json()
+        assert [s["verse_id"] for s in next_page["scriptures"]] == [
+            s["verse_id"] for s in next_full["scriptures"]
+        ]
+
+    def test_facets_with_fields(self, client):
+        """Test facets are unaffected by the projection"""
+        response = client.get(
+            "/api/scriptures/search?q=love&facets=volume&fields=compact"
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["facets"]["volume"]
+        assert "volume_long_title" not in data["scriptures"][0]
+
+    def test_reference_fields(self, client):
+        """Test reference lookups honour the projection"""
+        response = client.get(
+            "/api/scriptures/reference/John/3?verse=16&fields=verse_short_title"
+        )
+        assert response.status_code == 200
+        assert response.json() == [{"verse_short_title": "John 3:16"}]
+
+    def test_random_fields(self, client):
+        """Test random verses honour the projection"""
+        single = client.get("/api/scriptures/random?seed=x&fields=verse_id").json()
+        assert list(single) == ["verse_id"]
+        batch = client.get(
+            "/api/scriptures/random?count=3&seed=x&fields=compact"
+        ).json()
+        assert len(batch) == 3
+        assert "book_lds_url" not in batch[0]
+
+    def test_all_preset_returns_full_model(self, client):
+        """Test fields=all returns the same payload as no selector"""
+        url = "/api/scriptures/reference/John/3?verse=16"
+        assert client.get(f"{url}&fields=all").json() == client.get(url).json()
+
+    def test_unknown_field(self, client):
+        """Test unknown fields are rejected"""
+        response = client.get("/api/scriptures/search?q=love&fields=verse_id,nope")
+        assert response.status_code == 400
+        assert "nope" in response.json()["detail"]
+
+    def test_memory_engine_projection(self, services):
+        """Test the in-memory corpus applies the same projection"""
+        sqlite_service, memory_service = services
+        fields = ("verse_id", "verse_short_title")
+        assert memory_service.get_scripture_by_reference(
+            "John", 3, fields=fields
+        ) == sqlite_service.get_scripture_by_reference("John", 3, fields=fields)
+
+
+class TestCompactFormat:
+    """Test format=compact responses with volume/book lookup tables"""
+
+    @staticmethod
+    def expand(data):
+        """Rebuild full Scripture dicts from a compact payload"""
+        volumes = {volume["id"]: volume for volume in data["volumes"]}
+        books = {book["id"]: book for book in data["books"]}
+        expanded = []
+        for row in data["rows"]:
+            item = dict(zip(data["columns"], row))
+            volume = volumes[item["volume_id"]]
+            book = books[item["book_id"]]
+            for key, value in volume.items():
+                if key != "id":
+                    item[key] = value
+            for key, value in book.items():
+                if key not in ("id", "volume_id"):
+                    item[key] = value
+            expanded.append(item)
+        return expanded
+
+    def test_search_compact_matches_full(self, client):
+        """Test compact search carries the same verses and paging fields"""
+        url = "/api/scriptures/search?q=love&limit=20&facets=volume"
+        full = client.get(url).json()
+        compact = client.get(f"{url}&format=compact").json()
+        for key in ("total", "limit", "offset", "next_cursor", "facets"):
+            assert compact[key] == full[key]
+        assert len(compact["rows"]) == len(full["scriptures"])
+        for item, scripture in zip(self.expand(compact), full["scriptures"]):
+            assert item == {key: scripture[key] for key in item}
+
+    def test_lookup_tables_are_deduplicated(self, client):
+        """Test each referenced volume and book is listed exactly once"""
+        data = client.get(
+            "/api/scriptures/search?q=the&limit=100&format=compact"
+        ).json()
+        book_ids = [book["id"] for book in data["books"]]
+        assert book_ids == sorted(set(book_ids))
+        assert set(book_ids) == {row[2] for row in data["rows"]}
+        assert {volume["id"] for volume in data["volumes"]} == {
+            row[1] for row in data["rows"]
+        }
+
+    def test_reference_compact(self, client):
+        """Test chapter reads in compact form"""
+        full = client.get("/api/scriptures/reference/John/3").json()
+        compact = client.get("/api/scriptures/reference/John/3?format=compact").json()
+        assert len(compact["books"]) == 1
+        assert compact["books"][0]["book_title"] == "John"
+        expanded = self.expand(compact)
+        assert expanded == [{key: s[key] for key in expanded[0]} for s in full]
+
+    def test_compact_smaller_than_full(self, client):
+        """Test the compact payload is smaller than the full one"""
+        url = "/api/scriptures/search?q=the&limit=100"
+        full = client.get(url)
+        compact = client.get(f"{url}&format=compact")
+        assert len(compact.content) < len(full.content) / 2
+
+    def test_compact_rejects_fields(self, client):
+        """Test fields= cannot be combined with format=compact"""
+        response = client.get(
+            "/api/scriptures/search?q=love&format=compact&fields=verse_id"
+        )
+        assert response.status_code == 400
+
+    def test_invalid_format(self, client):
+        """Test unknown formats are rejected"""
+        response = client.get("/api/scriptures/search?q=love&format=tiny")
+        assert response.status_code == 422
+
+
+class TestCompression:
+    """Test response compression and precompressed corpus payloads"""
+
+    def test_negotiate(self):
+        """Test Accept-Encoding negotiation with q-values and wildcards"""
+        encodings = ("br", "zstd", "gzip")
+        assert negotiate(None, encodings) is None
+        assert negotiate("identity", encodings) is None
+        assert negotiate("gzip, deflate", encodings) == "gzip"
+        assert negotiate("gzip, br", encodings) == "br"
+        assert negotiate("gzip;q=1.0, br;q=0.5", encodings) == "gzip"
+        assert negotiate("br;q=0, *", encodings) == "zstd"
+        assert negotiate("gzip;q=0", encodings) is None
+        assert negotiate("br", ("gzip",)) is None
+
+    def test_dynamic_response_compressed(self, client):
+        """Test large search responses are gzip-compressed on the fly"""
+        response = client.get(
+            "/api/scriptures/search?q=the&limit=100",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert len(response.json()["scriptures"]) == 100
+
+    def test_identity_when_not_accepted(self, client):
+        """Test clients without Accept-Encoding get plain bodies"""
+        response = client.get(
+            "/api/scriptures/search?q=the&limit=100",
+            headers={"Accept-Encoding": "identity"},
+        )
+        assert "content-encoding" not in response.headers
+        assert "Accept-Encoding" in response.headers["vary"]
+
+    def test_small_response_not_compressed(self, client):
+        """Test responses under the size threshold are sent as-is"""
+        response = client.get(
+            "/api/scriptures/reference/John/3?verse=16&fields=verse_id",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert "content-encoding" not in response.headers
+
+    def test_chapter_payload_precompressed_once(self, client):
+        """Test chapter verses reuse one stored compressed variant"""
+        headers = {"Accept-Encoding": "gzip"}
+        first = client.get("/api/scriptures/chapters/1/verses", headers=headers)
+        assert first.headers["content-encoding"] == "gzip"
+        payload = get_database_service().get_verses_by_chapter_json(1)
+        variant = payload.variants["gzip"]
+        second = client.get("/api/scriptures/chapters/1/verses", headers=headers)
+        assert payload.variants["gzip"] is variant
+        assert second.content == first.content
+        assert int(second.headers["content-length"]) == len(variant)
+
+    def test_precompressed_payload_round_trip(self):
+        """Test every available encoding decodes back to the payload"""
+        import gzip
+
+        payload = Payload(b'{"text":"' + b"and it came to pass " * 100 + b'"}')
+        content, encoding = payload.select("gzip", minimum_size=1024)
+        assert encoding == "gzip"
+        assert gzip.decompress(content) == payload.body
+        assert payload.select("gzip", minimum_size=1 << 20) == (payload.body, None)
+        for name in ENCODINGS:
+            assert len(payload.encoded(name)) < len(payload.body)
+
+    def test_not_modified_is_not_compressed(self, client):
+        """Test conditional requests still answer 304 without a body"""
+        url = "/api/scriptures/chapters/1/verses"
+        etag = client.get(url).headers["etag"]
+        response = client.get(
+            url, headers={"If-None-Match": etag, "Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 304
+        assert "content-encoding" not in response.headers
+        assert "Accept-Encoding" in response.headers["vary"]
+
+    def test_warm_up_precompresses_hot_payloads(self):
+        """Test warm-up encodes the navigation tree ahead of any request"""
+        service = DatabaseService()
+        service.warm_up()
+        assert set(service.navigation_tree().variants) == set(ENCODINGS)
+        service.close()
+
+
+class TestBatchReference:
+    """Test the POST batch reference endpoint"""
+
+    url = "/api/scriptures/reference/batch"
+
+    def test_results_match_single_lookups(self, client):
+        """Test each batch item equals the single reference response"""
+        references = [
+            {"book_title": "John", "chapter": 3, "verse": 16},
+            {"book_title": "Alma", "chapter": 2},
+            {"book_title": "John", "chapter": 1, "verse": 1},
+        ]
+        response = client.post(self.url, json={"references": references})
+        assert response.status_code == 200
+        results = response.json()
+        assert [r["book_title"] for r in results] == ["John", "Alma", "John"]
+        for reference, result in zip(references, results):
+            single = client.get(
+                f"/api/scriptures/reference/{reference['book_title']}"
+                f"/{reference['chapter']}",
+                params={"verse": reference["verse"]} if "verse" in reference else {},
+            ).json()
+            assert result["scriptures"] == single
+            assert result["error"] is None
+
+    def test_per_item_errors(self, client):
+        """Test unknown references fail individually"""
+        response = client.post(
+            self.url,
+            json={
+                "references": [
+                    {"book_title": "Nowhere", "chapter": 1},
+                    {"book_title": "John", "chapter": 3, "verse": 16},
+                    {"book_title": "John", "chapter": 3, "verse": 999},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        errors = [result["error"] for result in response.json()]
+        assert errors == ["Reference not found", None, "Reference not found"]
+
+    def test_single_connection_checkout(self):
+        """Test a batch is resolved with one pooled connection checkout"""
+        service = DatabaseService()
+        service.reference_index()
+        checkouts = service.pool_stats()["checkouts"]
+        results = service.get_scriptures_by_references(
+            [("John", 3, 16), ("John", 3, None), ("Alma", 1, 2)] * 10
+        )
+        assert service.pool_stats()["checkouts"] == checkouts + 1
+        assert len(results) == 30
+        assert all(results)
+        service.close()
+
+    def test_batch_past_variable_limit(self, monkeypatch):
+        """Test batches past the bound-parameter limit are split into chunks"""
+        service = DatabaseService()
+        references = [("John", 3, 16), ("Nowhere", 1, None), ("Alma", 2, None)]
+        expected = service.get_scriptures_by_references(references)
+        # Connection.setlimit needs Python 3.11; lower the chunking bound instead
+        monkeypatch.setattr(database, "MAX_SQL_VARIABLES", 8)
+        results = service.get_scriptures_by_references(references * 5)
+        assert results == expected * 5
+        service.close()
+
+    def test_fields_projection(self, client):
+        """Test batch results honour fields="""
+        response = client.post(
+            f"{self.url}?fields=verse_short_title",
+            json={"references": [{"book_title": "John", "chapter": 3, "verse": 16}]},
+        )
+        assert response.json()[0]["scriptures"] == [{"verse_short_title": "John 3:16"}]
+
+    def test_memory_engine_matches_sqlite(self, services):
+        """Test the in-memory corpus resolves batches identically"""
+        sqlite_service, memory_service = services
+        references = [("John", 3, 16), ("Nowhere", 1, None), ("Alma", 2, None)]
+        assert memory_service.get_scriptures_by_references(
+            references
+        ) == sqlite_service.get_scriptures_by_references(references)
+
+    def test_batch_size_limit(self, client, monkeypatch):
+        """Test oversized batches are rejected"""
+        monkeypatch.setattr(settings, "max_batch_references", 2)
+        response = client.post(
+            self.url,
+            json={"references": [{"book_title": "John", "chapter": 1}] * 3},
+        )
+        assert response.status_code == 400
+
+    def test_invalid_body(self, client):
+        """Test malformed references are rejected"""
+        response = client.post(self.url, json={"references": [{"chapter": 1}]})
+        assert response.status_code == 422
+
+
+class TestPassages:
+    """Test citation parsing and the passages endpoint"""
+
+    @pytest.fixture
+    def index(self):
+
+        return get_database_service().reference_index()
+
+    def parse(self, index, text):
+        return [(r.reference, r.error) for r in index.parse(text)]
+
+    def test_parse_multi_citation(self, index):
+        """Test ranges, verse lists and whole chapters in one string"""
+        assert self.parse(index, "John 3:16-18; Alma 32:21,27; D&C 4") == [
+            ("John 3:16-18", None),
+            ("Alma 32:21", None),
+            ("Alma 32:27", None),
+            ("Doctrine and Covenants 4", None),
+        ]
+
+    def test_parse_abbreviations(self, index):
+        """Test short titles, missing periods, case and spacing"""
+        for text in ("1 Ne. 3:7", "1 Ne 3:7", "1ne 3:7", "1 NEPHI 3 : 7"):
+            assert self.parse(index, text) == [("1 Nephi 3:7", None)]
+
+    def test_parse_cross_chapter_range(self, index):
+        """Test a range spanning chapters resolves to contiguous verse ids"""
+        (reference,) = index.parse("Gen 1:20-2:3")
+        assert reference.reference == "Genesis 1:20-2:3"
+        first = index.chapters[(1, 2)].first
+        assert reference.end == first + 2
+        assert reference.start == index.chapters[(1, 1)].first + 19
+
+    def test_parse_carries_book(self, index):
+        """Test a citation without a book continues the previous book"""
+        assert self.parse(index, "John 3:16; 4:1") == [
+            ("John 3:16", None),
+            ("John 4:1", None),
+        ]
+
+    def test_parse_errors(self, index):
+        """Test unknown books and impossible references fail individually"""
+        assert self.parse(index, "Nowhere 1; 3:16; John 3:999; Matt 5:10-5") == [
+            ("Nowhere 1", "Unknown book: Nowhere"),
+            ("3:16", "Missing book"),
+            ("John 3:999", "Reference not found"),
+            ("Matthew 5:10-5", "Range ends before it starts"),
+        ]
+
+    def test_adversarial_input_fails_fast(self, index, client):
+        """Test long non-matching citations parse in linear time"""
+        import time
+
+        for text in ("a" + " " * 7000 + "!", "John " * 1400 + "!", "a" + " :" * 3500):
+            started = time.perf_counter()
+            (reference,) = index.parse(text)
+            assert time.perf_counter() - started < 0.1
+            assert reference.error is not None
+
+        response = client.get("/api/scriptures/passages", params={"q": "a" * 2001})
+        assert response.status_code == 422
+
+    def test_endpoint_matches_reference_lookup(self, client):
+        """Test passage verses equal the single reference endpoint"""
+        response = client.get(
+            "/api/scriptures/passages", params={"q": "John 3:16-18; D&C 4"}
+        )
+        assert response.status_code == 200
+        john, dc = response.json()
+        chapter = client.get("/api/scriptures/reference/John/3").json()
+        assert john["scriptures"] == chapter[15:18]
+        assert (
+            dc["scriptures"]
+            == client.get("/api/scriptures/reference/Doctrine and Covenants/4").json()
+        )
+        assert dc["end_verse_id"] - dc["start_verse_id"] + 1 == len(dc["scriptures"])
+
+    def test_single_scan(self):
+        """Test every range is fetched with one connection checkout"""
+        service = DatabaseService()
+        service.reference_index()
+        checkouts = service.pool_stats()["checkouts"]
+        passages = service.get_passages("John 3:16-18; Alma 32:21,27; D&C 4, 5")
+        assert service.pool_stats()["checkouts"] == checkouts + 1
+        assert [len(rows) > 0 for _, rows in passages] == [True] * 5
+        service.close()
+
+    def test_overlapping_ranges(self, client):
+        """Test overlapping citations each get their own verses"""
+        response = client.get(
+            "/api/scriptures/passages",
+            params={"q": "John 3:16-18; John 3:17", "fields": "verse_number"},
+        )
+        assert [r["scriptures"] for r in response.json()] == [
+            [{"verse_number": 16}, {"verse_number": 17}, {"verse_number": 18}],
+            [{"verse_number": 17}],
+        ]
+
+    def test_memory_engine_matches_sqlite(self, services):
+        """Test the in-memory corpus fetches the same ranges"""
+        sqlite_service, memory_service = services
+        text = "Gen 1:20-2:3; Alma 3-4; John 3:16"
+        expected = [rows for _, rows in sqlite_service.get_passages(text)]
+        assert [rows for _, rows in memory_service.get_passages(text)] == expected
+
+    def test_invalid_requests(self, client, monkeypatch):
+        """Test empty and oversized citation lists are rejected"""
+        response = client.get("/api/scriptures/passages", params={"q": " ; "})
+        assert response.status_code == 400
+
+        monkeypatch.setattr(settings, "max_batch_references", 2)
+        response = client.get(
+            "/api/scriptures/passages", params={"q": "John 1:1, 2, 3"}
+        )
+        assert response.status_code == 400
+
+
+class TestVerseRange:
+    """Test contiguous verse range reads"""
+
+    url = "/api/scriptures/verses"
+
+    def test_count_crosses_chapters(self, client):
+        """Test a count read continues into the next chapter"""
+        chapter = client.get("/api/scriptures/chapters/1/verses").json()
+        last_id = chapter[-1]["id"]
+        response = client.get(self.url, params={"from_verse_id": last_id, "count": 3})
+        assert response.status_code == 200
+        data = response.json()
+        verse_ids = [s["verse_id"] for s in data["scriptures"]]
+        assert verse_ids == [last_id, last_id + 1, last_id + 2]
+        assert (
+            data["scriptures"][1]["chapter_id"] != data["scriptures"][0]["chapter_id"]
+        )
+        assert data["next_verse_id"] == last_id + 3
+
+    def test_to_verse_id(self, client):
+        """Test an inclusive to_verse_id bound"""
+        data = client.get(
+            self.url, params={"from_verse_id": 10, "to_verse_id": 19}
+        ).json()
+        assert [s["verse_id"] for s in data["scriptures"]] == list(range(10, 20))
+        assert data["next_verse_id"] == 20
+
+    def test_next_verse_id_walks_corpus_end(self, client):
+        """Test a read that reaches the last verse has no next_verse_id"""
+        with get_database_service().get_connection() as conn:
+            (last_id,) = conn.execute("SELECT MAX(id) FROM verses").fetchone()
+        data = client.get(self.url, params={"from_verse_id": last_id - 10}).json()
+        assert data["next_verse_id"] is None
+        assert data["scriptures"][-1]["verse_id"] == last_id
+
+    def test_matches_reference_rows(self, client):
+        """Test range rows equal the reference endpoint's rows"""
+        chapter = client.get("/api/scriptures/reference/John/3").json()
+        data = client.get(
+            self.url,
+            params={
+                "from_verse_id": chapter[0]["verse_id"],
+                "count": len(chapter),
+            },
+        ).json()
+        assert data["scriptures"] == chapter
+
+    def test_fields_and_compact(self, client):
+        """Test projections and the compact format"""
+        data = client.get(
+            self.url, params={"from_verse_id": 1, "count": 2, "fields": "verse_id"}
+        ).json()
+        assert data["scriptures"] == [{"verse_id": 1}, {"verse_id": 2}]
+        compact = client.get(
+            self.url, params={"from_verse_id": 1, "count": 2, "format": "compact"}
+        ).json()
+        assert [row[0] for row in compact["rows"]] == [1, 2]
+        assert compact["next_verse_id"] == 3
+
+    def test_memory_engine_matches_sqlite(self, services):
+        """Test the in-memory corpus reads the same ranges"""
+        sqlite_service, memory_service = services
+        for args in ((1, None, 50), (2000, None, 100), (10, 40, None)):
+            assert memory_service.get_verse_range(
+                *args
+            ) == sqlite_service.get_verse_range(*args)
+
+    def test_invalid_ranges(self, client):
+        """Test conflicting or oversized ranges are rejected"""
+        for params in (
+            {"from_verse_id": 5, "to_verse_id": 9, "count": 2},
+            {"from_verse_id": 9, "to_verse_id": 5},
+            {"from_verse_id": 1, "to_verse_id": 5000},
+        ):
+            assert client.get(self.url, params=params).status_code == 400
+        assert client.get(self.url, params={"from_verse_id": 0}).status_code == 422
+
+
+class TestNavigationTree:
+    """Test the one-shot navigation tree endpoint"""
+
+    url = "/api/scriptures/navigation"
+
+    def test_tree_matches_navigation_endpoints(self, client):
+        """Test the tree equals walking volumes, books and chapters"""
+        response = client.get(self.url)
+        assert response.status_code == 200
+        tree = response.json()
+        assert tree["chapter_columns"] == ["id", "chapter_number", "verse_count"]
+
+        volumes = client.get("/api/scriptures/volumes").json()
+        assert [v["id"] for v in tree["volumes"]] == [v["id"] for v in volumes]
+        for volume in tree["volumes"]:
+            books = client.get(f"/api/scriptures/volumes/{volume['id']}/books").json()
+            assert [b["id"] for b in volume["books"]] == [b["id"] for b in books]
+            for book in volume["books"]:
+                chapters = client.get(
+                    f"/api/scriptures/books/{book['id']}/chapters"
+                ).json()
+                assert [c[:2] for c in book["chapters"]] == [
+                    [c["id"], c["chapter_number"]] for c in chapters
+                ]
+                assert book["chapter_count"] == len(chapters)
+
+    def test_verse_counts(self, client):
+        """Test chapter, book and volume verse counts add up"""
+        tree = client.get(self.url).json()
+        with get_database_service().get_connection() as conn:
+            (verses_total,) = conn.execute("SELECT COUNT(*) FROM verses").fetchone()
+        assert sum(volume["verse_count"] for volume in tree["volumes"]) == verses_total
+        book = tree["volumes"][0]["books"][0]
+        chapter_id, _, verse_count = book["chapters"][0]
+        verses = client.get(f"/api/scriptures/chapters/{chapter_id}/verses").json()
+        assert verse_count == len(verses)
+        assert book["verse_count"] == sum(c[2] for c in book["chapters"])
+
+    def test_built_once(self, client):
+        """Test the payload is precomputed and reused"""
+        service = get_database_service()
+        assert service.navigation_tree() is service.navigation_tree()
+
+    def test_versioned_url_is_immutable(self, client):
+        """Test ?v=<current version> is cached as immutable"""
+        tree = client.get(self.url).json()
+        response = client.get(self.url, params={"v": tree["version"]})
+        assert "immutable" in response.headers["cache-control"]
+        stale = client.get(self.url, params={"v": "stale"})
+        assert "immutable" not in stale.headers["cache-control"]
+        assert stale.headers["etag"] == f'W/"{tree["version"]}"'
+
+
+class TestExport:
+    """Test the streaming NDJSON/CSV export endpoint"""
+
+    url = "/api/scriptures/export"
+
+    def test_ndjson_matches_reference(self, client):
+        """Test NDJSON lines are the same objects /reference returns"""
+        import json
+
+        book_id = client.get("/api/scriptures/volumes/1/books").json()[0]["id"]
+        response = client.get(self.url, params={"book_id": book_id})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert (
+            f"scriptures-book-{book_id}.ndjson"
+            in response.headers["content-disposition"]
+        )
+        assert "etag" in response.headers
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert {row["book_id"] for row in rows} == {book_id}
+        assert [row["verse_id"] for row in rows] == sorted(r["verse_id"] for r in rows)
+
+        first = rows[0]
+        reference = client.get(
+            f"/api/scriptures/reference/{first['book_title']}/"
+            f"{first['chapter_number']}",
+            params={"verse": first["verse_number"]},
+        ).json()
+        assert reference == [first]
+
+    def test_csv_with_fields(self, client):
+        """Test CSV export writes a header and honours fields="""
+        import csv
+        import io
+
+        response = client.get(
+            self.url,
+            params={
+                "format": "csv",
+                "volume_id": 1,
+                "fields": "volume_id,verse_id,scripture_text",
+            },
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == ["volume_id", "verse_id", "scripture_text"]
+        assert len(rows) > 1
+        assert all(len(row) == 3 and row[0] == "1" for row in rows[1:])
+
+    def test_full_export_counts_all_verses(self, client):
+        """Test an unfiltered export streams every verse"""
+        response = client.get(self.url, params={"fields": "verse_id"})
+        with get_database_service().get_connection() as conn:
+            (total,) = conn.execute("SELECT COUNT(*) FROM verses").fetchone()
+        assert len(response.text.splitlines()) == total
+
+    def test_invalid_parameters(self, client):
+        """Test unknown formats and fields are rejected"""
+        assert client.get(self.url, params={"format": "xml"}).status_code == 422
+        assert client.get(self.url, params={"fields": "nope"}).status_code == 400
+
+    def test_batches_use_dedicated_connection(self, client):
+        """Test rows are fetched in batches without holding a pool connection"""
+        service = get_database_service()
+        checkouts = service.pool.stats()["checkouts"]
+        batches = service.export_rows(volume_id=1, fields=("verse_id",), batch_size=7)
+        sizes = [len(rows) for rows in batches]
+        assert max(sizes) == 7 and sizes[-1] <= 7
+        assert service.pool.stats()["checkouts"] == checkouts
+
+    def test_streamed_export_compressed(self, client):
+        """Test streamed exports are gzip-compressed chunk by chunk"""
+        response = client.get(
+            self.url,
+            params={"volume_id": 1},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert len(response.text.splitlines()) > 0
+
+
+class TestStaticExport:
+    """Test the static API export for CDN offload"""
+
+    def test_files_match_live_responses(self, client, tmp_path):
+        """Test exported files mirror the URL layout and live bodies"""
+        import gzip
+
+        pages = export_static_api(get_database_service(), tmp_path, ["gzip"])
+        assert pages == len(list(tmp_path.rglob(STATIC_INDEX)))
+
+        book = client.get("/api/scriptures/volumes/1/books").json()[0]
+        chapter = client.get(f"/api/scriptures/books/{book['id']}/chapters").json()[0]
+        urls = [
+            "/api/scriptures/navigation",
+            "/api/scriptures/volumes",
+            "/api/scriptures/volumes/1/books",
+            f"/api/scriptures/books/{book['id']}/chapters",
+            f"/api/scriptures/chapters/{chapter['id']}/verses",
+            f"/api/scriptures/reference/{book['book_title']}/"
+            f"{chapter['chapter_number']}",
+        ]
+        for url in urls:
+            directory = tmp_path / url.lstrip("/")
+            body = (directory / STATIC_INDEX).read_bytes()
+            assert body == client.get(url).content
+            variant = (directory / f"{STATIC_INDEX}.gz").read_bytes()
+            assert gzip.decompress(variant) == body
+
+    def test_every_chapter_exported(self, tmp_path):
+        """Test each chapter has verses and reference pages"""
+        service = get_database_service()
+        pages = export_static_api(service, tmp_path, [])
+        with service.get_connection() as conn:
+            counts = conn.execute(
+                "SELECT (SELECT COUNT(*) FROM volumes), (SELECT COUNT(*) FROM books),"
+                " (SELECT COUNT(*) FROM chapters)"
+            ).fetchone()
+        volumes, books, chapters = counts
+        assert pages == 2 + volumes + books + 2 * chapters
+        assert not list(tmp_path.rglob("*.gz"))
+
+    def test_unknown_encoding_rejected(self, tmp_path):
+        """Test unsupported encodings fail before writing anything"""
+        with pytest.raises(ValueError):
+            export_static_api(get_database_service(), tmp_path, ["deflate"])
+        assert not list(tmp_path.iterdir())
+
+
+class TestMetrics:
+    """Test the Prometheus /metrics endpoint"""
+
+    def test_route_latency_by_template(self, client):
+        """Test requests are recorded per route template, not raw path"""
+        route = "/api/scriptures/chapters/{chapter_id}/verses"
+        before = REQUEST_LATENCY.count("GET", route, "200")
+        client.get("/api/scriptures/chapters/1/verses")
+        client.get("/api/scriptures/chapters/2/verses")
+        assert REQUEST_LATENCY.count("GET", route, "200") == before + 2
+
+        body = client.get("/metrics").text
+        assert (
+            'scriptures_http_request_duration_seconds_bucket{method="GET",'
+            f'route="{route}",status="200",le="+Inf"}}'
+        ) in body
+        assert "/chapters/1/verses" not in body
+
+    def test_db_method_time_and_rows(self, client):
+        """Test DatabaseService methods record time and rows returned"""
+        calls = DB_METHOD_LATENCY.count("get_scripture_by_reference")
+        rows = DB_ROWS.value("get_scripture_by_reference")
+        verses = client.get("/api/scriptures/reference/John/3").json()
+        assert DB_METHOD_LATENCY.count("get_scripture_by_reference") == calls + 1
+        assert DB_ROWS.value("get_scripture_by_reference") == rows + len(verses)
+
+    def test_exposition_format(self, client):
+        """Test the text format, cache ratios and pool gauges"""
+        client.get("/api/scriptures/reference/John/3")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert "# TYPE scriptures_http_request_duration_seconds histogram" in body
+        assert "# TYPE scriptures_http_requests_in_flight gauge" in body
+        assert 'scriptures_cache_hit_ratio{cache="result"}' in body
+        assert 'scriptures_db_pool_connections{state="idle"}' in body
+        assert "scriptures_http_requests_in_flight 1" in body
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts, sum and count for a standalone histogram"""
+        histogram = Histogram("test_seconds", "Test", ("op",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, 'a"b')
+        lines = histogram.samples()
+        assert lines[:3] == [
+            'test_seconds_bucket{op="a\\"b",le="0.1"} 1',
+            'test_seconds_bucket{op="a\\"b",le="1.0"} 3',
+            'test_seconds_bucket{op="a\\"b",le="+Inf"} 4',
+        ]
+        assert lines[-1] == 'test_seconds_count{op="a\\"b"} 4'
+
+
+class TestSlowQueryLog:
+    """Test slow statement capture with EXPLAIN QUERY PLAN"""
+
+    def test_query_shape(self):
+        """Test generated placeholder lists collapse to one shape"""
+        assert query_shape("SELECT *\n  FROM t WHERE id IN (?,?,?)") == (
+            "SELECT * FROM t WHERE id IN (?, ...)"
+        )
+        assert query_shape("VALUES (?, ?, ?), (?, ?, ?)") == "VALUES (?, ...), ..."
+        assert query_shape(
+            "WHERE verse_id BETWEEN ? AND ? OR verse_id BETWEEN ? AND ?"
+        ) == ("WHERE verse_id BETWEEN ? AND ? OR ...")
+
+    def test_records_plan_and_params(self, tmp_path):
+        """Test statements over the threshold are logged with their plan"""
+        log_file = tmp_path / "slow.log"
+        query_log = SlowQueryLog(threshold_ms=0, log_file=str(log_file))
+        pool = ConnectionPool(
+            get_database_service().db_path, max_size=1, query_log=query_log
+        )
+        with pool.connection() as conn:
+            conn.execute(
+                "SELECT verse_id FROM scriptures WHERE scripture_text LIKE ?",
+                ("%light%",),
+            ).fetchall()
+            conn.execute("SELECT id FROM verses WHERE id IN (?,?)", (1, 2)).fetchall()
+        pool.close()
+
+        recent = query_log.entries()
+        like = next(e for e in recent if "LIKE" in e["sql"])
+        assert like["params"] == ["%light%"]
+        assert any("SCAN" in line for line in like["plan"])
+        by_id = next(e for e in recent if "IN (?, ...)" in e["sql"])
+        assert any("USING INTEGER PRIMARY KEY" in line for line in by_id["plan"])
+        assert {s["sql"] for s in query_log.shapes()} >= {like["sql"], by_id["sql"]}
+        assert "slow query" in log_file.read_text()
+
+    def test_fast_statements_ignored(self):
+        """Test statements under the threshold are not recorded"""
+        query_log = SlowQueryLog(threshold_ms=60_000)
+        pool = ConnectionPool(
+            get_database_service().db_path, max_size=1, query_log=query_log
+        )
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM volumes").fetchone()[0] > 0
+        pool.close()
+        assert query_log.entries() == []
+
+    def test_debug_endpoint(self, client, monkeypatch):
+        """Test the debug endpoint needs the admin token and hides params"""
+        # Not mounted without an admin token
+        assert client.get("/debug/slow-queries").status_code == 404
+
+        query_log = get_database_service().query_log
+        monkeypatch.setattr(query_log, "threshold", 0.0)
+        client.get("/api/scriptures/search", params={"q": "secret term"})
+        monkeypatch.setattr(get_settings(), "admin_token", "test-admin-token")
+        debug = FastAPI()
+        debug.include_router(admin.debug_router)
+        debug_client = TestClient(debug)
+
+        assert debug_client.get("/debug/slow-queries").status_code == 401
+        response = debug_client.get(
+            "/debug/slow-queries",
+            headers={"Authorization": "Bearer test-admin-token"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {"threshold_ms", "shapes", "recent"}
+        assert data["recent"]
+        assert all("params" not in entry for entry in data["recent"])
+        assert "secret term" not in response.text
+
+
+class TestBenchmarkSuite:
+    """Test the benchmark suite still covers and runs every case"""
+
+    def test_every_case_runs(self, client):
+        """Test each service and route case succeeds, covering every route"""
+        service = get_database_service()
+        fixture = load_fixture(service)
+        cases = service_cases(service, fixture) + route_cases(client, fixture)
+        assert uncovered_routes(cases) == set()
+        results = run(service, cases, number=1)
+        assert "route search broad [cold]" in results
+        assert all(value > 0 for value in results.values())
+
+    def test_compare_flags_regressions(self):
+        """Test slowdowns past both tolerance and noise floor regress"""
+        rows = compare(
+            {"slow": 400.0, "noisy": 20.0, "new": 5.0, "fast": 90.0},
+            {"slow": 100.0, "noisy": 10.0, "fast": 100.0},
+            tolerance=0.25,
+            min_delta_us=50.0,
+        )
+        flagged = {name for name, _, _, regressed in rows if regressed}
+        assert flagged == {"slow"}
+        assert ("new", 5.0, None, False) in rows
+
+    def test_check_without_baseline(self, monkeypatch, tmp_path, capsys):
+        """Test --check stops with exit code 2 when no baseline exists"""
+        missing = tmp_path / "baselines.json"
+        monkeypatch.setattr(
+            sys, "argv", ["suite", "--check", "--baseline", str(missing)]
+        )
+        with pytest.raises(SystemExit) as exc:
+            suite.main()
+        assert exc.value.code == suite.EXIT_NO_BASELINE
+        assert "make bench-baseline" in capsys.readouterr().err
+
+
+class TestProfiling:
+    """Test the admin-guarded cProfile and tracemalloc endpoints"""
+
+    token = "test-admin-token"
+
+    @pytest.fixture
+    def admin_client(self, monkeypatch):
+        """App with profiling mounted, as main does when it is enabled"""
+        monkeypatch.setattr(get_settings(), "admin_token", self.token)
+        profiled = FastAPI()
+        profiled.add_middleware(ProfilingMiddleware, profiler=REQUEST_PROFILER)
+        profiled.include_router(admin.router)
+        profiled.include_router(scriptures.router)
+        yield TestClient(profiled)
+        REQUEST_PROFILER.disarm()
+        ALLOCATION_TRACKER.stop()
+
+    @property
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def test_disabled_by_default(self, client):
+        """Test the default app does not mount the admin endpoints"""
+        assert client.get("/admin/profile").status_code == 404
+
+    def test_requires_admin_token(self, admin_client):
+        """Test missing or wrong tokens are rejected"""
+        assert admin_client.get("/admin/profile").status_code == 401
+        wrong = {"Authorization": "Bearer nope"}
+        assert admin_client.get("/admin/profile", headers=wrong).status_code == 401
+
+    def test_profiles_next_matching_requests(self, admin_client):
+        """Test only the next N matching requests are profiled"""
+        armed = admin_client.post(
+            "/admin/profile",
+            params={"route": r"/reference/", "count": 2},
+            headers=self.headers,
+        )
+        assert armed.json()["pending"] == 2
+        admin_client.get("/api/scriptures/volumes")
+        for _ in range(3):
+            admin_client.get("/api/scriptures/reference/John/3")
+
+        report = admin_client.get(
+            "/admin/profile", params={"limit": 50}, headers=self.headers
+        ).json()
+        assert report["profiled"] == 2 and report["pending"] == 0
+        assert report["paths"] == ["/api/scriptures/reference/John/3"] * 2
+        functions = " ".join(row["function"] for row in report["functions"])
+        assert "get_scripture_by_reference" in functions
+
+        text = admin_client.get(
+            "/admin/profile", params={"format": "text"}, headers=self.headers
+        )
+        assert "function calls" in text.text
+
+    def test_invalid_pattern(self, admin_client):
+        """Test a bad route regex is a 400"""
+        response = admin_client.post(
+            "/admin/profile", params={"route": "("}, headers=self.headers
+        )
+        assert response.status_code == 400
+
+    def test_allocation_hotspots(self, admin_client):
+        """Test tracemalloc diffs against the baseline snapshot"""
+        url = "/admin/allocations"
+        assert admin_client.get(url, headers=self.headers).status_code == 409
+        admin_client.post(url, headers=self.headers)
+        kept = [bytearray(1024) for _ in range(200)]
+        data = admin_client.get(url, headers=self.headers).json()
+        assert data["traced_bytes"] > 0
+        assert any(
+            "test_api.py" in hotspot["location"] and hotspot["size_diff"] > 0
+            for hotspot in data["hotspots"]
+        )
+        del kept
+        admin_client.delete(url, headers=self.headers)
+        assert admin_client.get(url, headers=self.headers).status_code == 409
@@ -3,22 +3,89 @@
 Scripture App Monitoring Script
 
 This script provides local monitoring capabilities for the FastAPI backend,
-including warm-up testing and performance metrics collection.
+including warm-up testing and performance metrics collection, and a load mode
+(--load) that drives concurrent traffic and reports latency percentiles.
 """
 
+import asyncio
 import json
+import random
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
 import requests
 
+# Relative weight of each request type in load mode
+LOAD_MIX = {"search": 4, "reference": 3, "chapter": 2, "random": 1}
+
+# Narrow and broad terms, so load covers cheap and expensive searches
+SEARCH_TERMS = ("faith", "charity", "repent", "light", "love", "the", "and")
+
+# Used when the navigation tree is unavailable
+FALLBACK_TARGETS = {
+    "reference": [
+        "/api/scriptures/reference/John/3",
+        "/api/scriptures/reference/Alma/32",
+        "/api/scriptures/reference/1%20Nephi/3",
+    ],
+    "chapter": [f"/api/scriptures/chapters/{i}/verses" for i in range(1, 51)],
+}
+
+PERCENTILES = (50, 90, 99)
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse "search=4,reference=3" into request type weights"""
+    mix: Dict[str, int] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in LOAD_MIX:
+            raise ValueError(
+                f"Unknown request type: {name} (choose from {', '.join(LOAD_MIX)})"
+            )
+        mix[name] = int(weight) if weight else 1
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("Request mix needs at least one positive weight")
+    return mix
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize_samples(samples: List[Tuple[float, bool]], seconds: float) -> Dict:
+    """Requests, errors, throughput and latency percentiles (ms) for samples"""
+    latencies = sorted(elapsed * 1000 for elapsed, ok in samples if ok)
+    errors = sum(1 for _, ok in samples if not ok)
+    summary: Dict[str, Any] = {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / seconds if seconds else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+        "max_ms": latencies[-1] if latencies else 0.0,
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = percentile(latencies, p)
+    return summary
+
 
 class ScriptureMonitor:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
         self.session = requests.Session()
+        # One session per load worker thread; Session is not thread-safe
+        self._local = threading.local()
 
     def log(self, message: str, level: str = "INFO"):
         """Log messages with timestamp"""
@@ -134,6 +201,182 @@ class ScriptureMonitor:
 
         return results
 
+    def load_targets(self) -> Dict[str, List[str]]:
+        """Endpoint paths per request type, from the navigation tree if possible"""
+        targets: Dict[str, List[str]] = {
+            "search": [
+                f"/api/scriptures/search?q={term}&limit=20" for term in SEARCH_TERMS
+            ],
+            "random": ["/api/scriptures/random"],
+            "reference": [],
+            "chapter": [],
+        }
+        try:
+            response = self.session.get(
+                f"{self.base_url}/api/scriptures/navigation", timeout=30
+            )
+            response.raise_for_status()
+            for volume in response.json()["volumes"]:
+                for book in volume["books"]:
+                    title = quote(book["book_title"])
+                    for chapter_id, chapter_number, _ in book["chapters"]:
+                        targets["chapter"].append(
+                            f"/api/scriptures/chapters/{chapter_id}/verses"
+                        )
+                        targets["reference"].append(
+                            f"/api/scriptures/reference/{title}/{chapter_number}"
+                        )
+        except (requests.RequestException, KeyError, ValueError) as e:
+            self.log(
+                f"Navigation tree unavailable, using fixed targets: {e}", "WARNING"
+            )
+            for name, paths in FALLBACK_TARGETS.items():
+                targets[name] = list(paths)
+        return targets
+
+    def _timed_get(self, path: str) -> Tuple[float, bool]:
+        """GET a path on this thread's session: (seconds, succeeded)"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        start_time = time.perf_counter()
+        try:
+            response = session.get(f"{self.base_url}{path}", timeout=30)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start_time, ok
+
+    async def _load_worker(
+        self,
+        executor: ThreadPoolExecutor,
+        deadline: float,
+        mix: Dict[str, int],
+        targets: Dict[str, List[str]],
+        rng: random.Random,
+        samples: Dict[str, List[Tuple[float, bool]]],
+    ):
+        """Issue requests back to back until the deadline"""
+        loop = asyncio.get_running_loop()
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            path = rng.choice(targets[name])
+            samples[name].append(
+                await loop.run_in_executor(executor, self._timed_get, path)
+            )
+
+    async def _run_load(
+        self,
+        concurrency: int,
+        duration: float,
+        mix: Dict[str, int],
+        targets: Dict[str, List[str]],
+        seed: Optional[int],
+    ) -> Tuple[Dict[str, List[Tuple[float, bool]]], float]:
+        """Run concurrency workers for duration seconds; returns samples, time"""
+        samples: Dict[str, List[Tuple[float, bool]]] = {name: [] for name in mix}
+        rng = random.Random(seed)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            started = time.perf_counter()
+            deadline = started + duration
+            await asyncio.gather(
+                *(
+                    self._load_worker(
+                        executor,
+                        deadline,
+                        mix,
+                        targets,
+                        random.Random(rng.random()),
+                        samples,
+                    )
+                    for _ in range(concurrency)
+                )
+            )
+            elapsed = time.perf_counter() - started
+        return samples, elapsed
+
+    def run_load_test(
+        self,
+        concurrency: int = 10,
+        duration: float = 30.0,
+        mix: Optional[Dict[str, int]] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Drive concurrent traffic and summarize throughput and latency"""
+        mix = {name: w for name, w in (mix or LOAD_MIX).items() if w > 0}
+        targets = self.load_targets()
+        self.log(
+            f"Load test: {concurrency} workers for {duration:g}s, mix "
+            + ", ".join(f"{name}={weight}" for name, weight in mix.items())
+        )
+        samples, elapsed = asyncio.run(
+            self._run_load(concurrency, duration, mix, targets, seed)
+        )
+        everything = [sample for values in samples.values() for sample in values]
+        return {
+            "mode": "load",
+            "timestamp": datetime.now().isoformat(),
+            "base_url": self.base_url,
+            "concurrency": concurrency,
+            "duration": elapsed,
+            "mix": mix,
+            "total": summarize_samples(everything, elapsed),
+            "endpoints": {
+                name: summarize_samples(values, elapsed)
+                for name, values in samples.items()
+            },
+        }
+
+    def print_load_results(
+        self, results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None
+    ):
+        """Print a per-endpoint latency table, with changes against a baseline"""
+        print("\n" + "=" * 78)
+        print("SCRIPTURE APP LOAD TEST RESULTS")
+        print("=" * 78)
+        print(f"Timestamp: {results['timestamp']}")
+        print(f"Base URL: {results['base_url']}")
+        print(
+            f"Concurrency: {results['concurrency']}  "
+            f"Duration: {results['duration']:.1f}s"
+        )
+        print("-" * 78)
+        print(
+            f"{'endpoint':<10} {'reqs':>7} {'rps':>8} {'err%':>6} "
+            f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (ms)"
+        )
+        rows = list(results["endpoints"].items()) + [("total", results["total"])]
+        for name, stats in rows:
+            print(
+                f"{name:<10} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} "
+                f"{stats['error_rate'] * 100:>6.2f} {stats['p50_ms']:>8.1f} "
+                f"{stats['p90_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+                f"{stats['max_ms']:>8.1f}"
+            )
+
+        if baseline:
+            print("-" * 78)
+            print(f"Compared with baseline from {baseline.get('timestamp')}:")
+            before_rows = dict(baseline.get("endpoints", {}))
+            before_rows["total"] = baseline.get("total", {})
+            for name, stats in rows:
+                before = before_rows.get(name)
+                if not before:
+                    continue
+                changes = []
+                for key, label in (
+                    ("throughput_rps", "rps"),
+                    ("p50_ms", "p50"),
+                    ("p99_ms", "p99"),
+                ):
+                    if before.get(key):
+                        change = (stats[key] - before[key]) / before[key] * 100
+                        changes.append(f"{label} {change:+.1f}%")
+                print(f"  {name:<10} {'  '.join(changes)}")
+        print("=" * 78)
+
     def print_results(self, results: Dict[str, Any]):
         """Print formatted test results"""
         print("\n" + "=" * 60)
@@ -270,11 +513,62 @@ def main():
     parser.add_argument("--grafana-url", help="Grafana Cloud metrics URL")
     parser.add_argument("--grafana-username", help="Grafana Cloud username")
     parser.add_argument("--grafana-api-key", help="Grafana Cloud API key")
+    parser.add_argument(
+        "--load", action="store_true", help="Run a concurrent load test instead"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="Load test workers (default: 10)"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=30.0,
+        help="Load test duration in seconds (default: 30)",
+    )
+    parser.add_argument(
+        "--mix",
+        default=",".join(f"{name}={weight}" for name, weight in LOAD_MIX.items()),
+        help="Request type weights (default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int, help="Random seed for the request mix")
+    parser.add_argument(
+        "--compare", help="Baseline load test JSON (from --output) to compare with"
+    )
+    parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=0.01,
+        help="Fail the load test above this error rate (default: 0.01)",
+    )
 
     args = parser.parse_args()
 
     monitor = ScriptureMonitor(args.url)
 
+    if args.load:
+        try:
+            mix = parse_mix(args.mix)
+            baseline = None
+            if args.compare:
+                with open(args.compare) as f:
+                    baseline = json.load(f)
+            results = monitor.run_load_test(
+                args.concurrency, args.duration, mix, args.seed
+            )
+        except KeyboardInterrupt:
+            print("\nLoad test interrupted by user")
+            sys.exit(1)
+        except (OSError, ValueError) as e:
+            print(f"Load test failed: {e}")
+            sys.exit(1)
+
+        monitor.print_load_results(results, baseline)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"Results saved to {args.output}")
+        sys.exit(0 if results["total"]["error_rate"] <= args.max_error_rate else 1)
+
     try:
         results = monitor.run_full_test_suite(warm_up=args.warm_up)
         success = monitor.print_results(results)